@@ -1,172 +1,312 @@
-from typing import Any, Callable, Mapping, Optional, Tuple
+import tempfile
+from copy import copy
+from dataclasses import replace
+from typing import Callable, List, Mapping, Optional, Tuple, Union
 
-import numpy as np
 import polars as pl
+from joblib import Parallel, delayed
+from typing_extensions import Literal
 
 from functime.base import Forecaster
-from functime.forecasting._reduction import make_direct_reduction, make_reduction
+from functime.base._ipc import _decategorize, _read_splits, _write_splits
+from functime.base.model import _cast_entity, _split_dtype
+from functime.base.transformer import _unfitted
+from functime.conformal import _bootstrap, make_sketch
 
 
-def _residualize_autoreg(
+def _residuals(forecaster: Forecaster, split: int) -> pl.DataFrame:
+    # In-sample residuals retained by `fit(..., residualize=True)`
+    y_resid = forecaster.state.artifacts.get("y_resid")
+    if y_resid is None:
+        raise ValueError(f"`{forecaster.name}` does not support residualization.")
+    return y_resid.pipe(forecaster._reset_string_cache).with_columns(
+        pl.lit(split).alias("split")
+    )
+
+
+def _unfitted_copy(forecaster: Forecaster, keep_state: bool = False) -> Forecaster:
+    """Copy of `forecaster` that can be fitted independently (e.g. in another thread or process).
+
+    If `keep_state`, the fitted state (regressors and lags) is kept and only transformers are reset.
+    """
+    forecaster = copy(forecaster)
+    if not keep_state:
+        forecaster.state = None
+    forecaster.target_transform = _unfitted(forecaster.target_transform)
+    forecaster.feature_transform = _unfitted(forecaster.feature_transform)
+    return forecaster
+
+
+def _align_to_test(y_pred: pl.DataFrame, y_test: pl.DataFrame, i: int) -> pl.DataFrame:
+    entity_col, time_col = y_pred.columns[:2]
+    # Coerce split column names back into original names
+    y_pred = y_pred.select(y_pred.columns[:3]).with_columns(pl.lit(i).alias("split"))
+    # Coerce time column to y_test timestamps
+    y_test = y_test.lazy().sort([entity_col, time_col]).collect()
+    return y_pred.sort([entity_col, time_col]).with_columns(y_test.get_column(time_col))
+
+
+def _test_horizon(y_test: pl.DataFrame) -> int:
+    entity_col = y_test.columns[0]
+    return int(
+        y_test.lazy()
+        .select(pl.count() / pl.col(entity_col).n_unique())
+        .collect(streaming=True)
+        .item()
+    )
+
+
+def _backtest_fold(
+    forecaster: Forecaster,
+    i: int,
     y_train: pl.DataFrame,
-    strategy: str,
-    lags: int,
-    max_horizons: int,
-    artifacts: Mapping[str, Any],
+    y_test: pl.DataFrame,
     X_train: Optional[pl.DataFrame] = None,
-) -> pl.DataFrame:
-    y_train = y_train.lazy().collect(streaming=True)
-    idx_cols = y_train.columns[:2]
-
-    def _score_recursive(regressor):
-        X_y_train = make_reduction(lags=lags, y=y_train, X=X_train)
-        X_cp_train = X_y_train.select(pl.all().exclude(target_col))
-        y_pred_arr = regressor.predict(X_cp_train)
-        # Check if censored model
-        if isinstance(y_pred_arr, Tuple):
-            y_pred_arr, _ = y_pred_arr  # forecast, probabilities
-        y_pred_cp = X_cp_train.select(idx_cols).with_columns(
-            pl.lit(y_pred_arr).alias("y_pred")
-        )
-        y_resids = y_pred_cp.join(
-            y_train.rename({target_col: "y_train"}), on=idx_cols, how="left"
-        ).select(*idx_cols, (pl.col("y_train") - pl.col("y_pred")).alias("y_resid"))
-        return y_resids
-
-    def _score_direct(regressors):
-        X_y_train = make_direct_reduction(
-            lags=lags, max_horizons=max_horizons, y=y_train, X=X_train
+    X_test: Optional[pl.DataFrame] = None,
+    residualize: bool = True,
+) -> Tuple[pl.DataFrame, Optional[pl.DataFrame], Forecaster]:
+    # Forecast
+    forecaster = forecaster.fit(y=y_train, X=X_train, residualize=residualize)
+    y_pred = forecaster.predict(fh=_test_horizon(y_test), X=X_test)
+    y_pred = _align_to_test(y_pred, y_test, i)
+    y_resid = _residuals(forecaster, split=i) if residualize else None
+    # Fitted regressors are reused by folds that are not refitted
+    return y_pred, y_resid, _unfitted_copy(forecaster, keep_state=True)
+
+
+def _backtest_update(
+    forecaster: Forecaster,
+    splits: Mapping[int, Tuple[pl.DataFrame, ...]],
+) -> List[pl.DataFrame]:
+    """Forecast several folds with one fitted forecaster in a single batched `predict`.
+
+    Each (entity, split) pair becomes a pseudo-entity: the lag state of the forecaster is
+    rolled to the cutoff of every pair at once with `Forecaster.update`.
+    """
+    y_train = next(iter(splits.values()))[0]
+    entity_col, time_col = y_train.columns[:2]
+    y_multi = pl.concat(
+        [
+            split[0].lazy().with_columns(pl.lit(i).alias("split"))
+            for i, split in splits.items()
+        ]
+    ).collect()
+    pseudo_entities = (
+        y_multi.select([entity_col, "split"])
+        .unique(maintain_order=True)
+        .with_row_count("__pseudo")
+    )
+
+    def _to_pseudo(df: pl.DataFrame) -> pl.DataFrame:
+        return df.join(pseudo_entities, on=[entity_col, "split"]).select(
+            [pl.col("__pseudo").alias(entity_col), *df.columns[1:-1]]
         )
-        y_preds_cp = []
-        for i in range(max_horizons):
-            selected_lags = range(i + 1, lags + i + 1)
-            feature_cols = [f"{target_col}__lag_{j}" for j in selected_lags]
-            if X_train is not None:
-                feature_cols += X_train.columns[2:]
-            X_cp_train = X_y_train.select([*idx_cols, *feature_cols])
-            y_pred_arr = regressors[i].predict(X_cp_train)
-            # Check if censored model
-            if isinstance(y_pred_arr, Tuple):
-                y_pred_arr, _ = y_pred_arr  # forecast, probabilities
-            y_preds_cp.append(y_pred_arr)
-        # NOTE: we just naively take the mean across all direct predictions
-        y_pred_arr = np.mean(y_preds_cp, axis=0)
-        # Get y target values that match up with X_y_train (entity, time) index
-        y_pred_cp = X_cp_train.select(idx_cols).with_columns(
-            pl.lit(y_pred_arr).alias("y_pred")
+
+    X_multi = None
+    if all(split[3] is not None for split in splits.values()):
+        X_multi = _to_pseudo(
+            pl.concat(
+                [
+                    split[3].lazy().with_columns(pl.lit(i).alias("split"))
+                    for i, split in splits.items()
+                ]
+            ).collect()
         )
-        y_resid = y_pred_cp.join(
-            y_train.rename({target_col: "y_train"}), on=idx_cols, how="left"
-        ).select(*idx_cols, (pl.col("y_train") - pl.col("y_pred")).alias("y_resid"))
-        return y_resid
-
-    target_col = y_train.columns[-1]
-    if strategy == "ensemble":
-        y_resid_recursive = _score_recursive(artifacts["recursive"]["regressor"])
-        y_resid_direct = _score_direct(artifacts["direct"]["regressors"])
-        y_resid = (
-            y_resid_recursive.join(
-                y_resid_direct, on=idx_cols, how="inner", suffix="__direct"
-            )
-            .with_columns((pl.col("y_resid") - pl.col("y_resid__direct")) / 2)
-            .drop("y_resid__direct")
+    fhs = {i: _test_horizon(split[1]) for i, split in splits.items()}
+    y_pred = (
+        forecaster.update(_to_pseudo(y_multi))
+        .predict(fh=max(fhs.values()), X=X_multi)
+        .rename({entity_col: "__pseudo"})
+        .join(pseudo_entities, on="__pseudo")
+    )
+    y_preds = []
+    for i, split in splits.items():
+        y_pred_split = (
+            y_pred.filter(pl.col("split") == i)
+            .select([entity_col, time_col, y_pred.columns[2]])
+            .sort([entity_col, time_col])
+            .groupby(entity_col, maintain_order=True)
+            .head(fhs[i])
         )
-    elif strategy == "recursive":
-        y_resid = _score_recursive(artifacts["regressor"])
-    else:
-        y_resid = _score_direct(artifacts["regressors"])
+        y_preds.append(_align_to_test(y_pred_split, split[1], i))
+    return y_preds
+
 
-    return y_resid
+def _backtest_fold_ipc(
+    forecaster: Forecaster,
+    i: int,
+    paths: Mapping[str, Optional[str]],
+    residualize: bool = True,
+) -> Tuple[pl.DataFrame, Optional[pl.DataFrame], Forecaster]:
+    # Runs in a worker process: splits are memory-mapped from Arrow IPC files
+    # written by the parent, instead of pickled through the executor
+    splits = _read_splits(paths)
+    y_pred, y_resid, forecaster = _backtest_fold(
+        forecaster=forecaster, i=i, residualize=residualize, **splits
+    )
+    # Categories are local to this process: return entities as strings
+    if y_resid is not None:
+        y_resid = _decategorize(y_resid)
+    return _decategorize(y_pred), y_resid, forecaster
 
 
-def _merge_autoreg_residuals(
+def backtest(
+    forecaster: Forecaster,
     y: pl.DataFrame,
-    y_resids: pl.DataFrame,
-    strategy: str,
-    lags: int,
-    max_horizons: int,
-    artifacts: Mapping[str, Any],
+    cv: Callable[[pl.DataFrame], Mapping[int, pl.DataFrame]],
     X: Optional[pl.DataFrame] = None,
-):
-    y_resid = _residualize_autoreg(
-        y_train=y,
-        X_train=X,
-        strategy=strategy,
-        lags=lags,
-        max_horizons=max_horizons,
-        artifacts=artifacts,
+    residualize: bool = True,
+    n_jobs: int = 1,
+    backend: Literal["threads", "processes"] = "threads",
+    refit: Union[bool, int] = True,
+) -> Tuple[pl.DataFrame, pl.DataFrame]:
+    """Return out-of-sample forecasts (and in-sample residuals) across cross-validation splits.
+
+    Parameters
+    ----------
+    forecaster : Forecaster
+        Forecaster to fit on each train split. A copy is fitted per split;
+        `forecaster` itself is refitted on the full `y` (and `X`).
+    y : pl.DataFrame
+        Panel DataFrame of observed values.
+    cv : Callable[[pl.DataFrame], Mapping[int, pl.DataFrame]]
+        Cross-validation splitter (e.g. `expanding_window_split`).
+    X : Optional[pl.DataFrame]
+        Panel DataFrame of exogenous features.
+    residualize : bool
+        If True, also return in-sample residuals of each refitted split and of the full refit.
+    n_jobs : int
+        Number of splits fitted concurrently. If -1, use all CPUs. Defaults to 1 (sequential).
+    backend : str
+        Executor used if `n_jobs` is not 1:\n
+        - "threads": splits share memory; best for forecasters that release the GIL
+        (e.g. Polars, NumPy, LightGBM)
+        - "processes": splits are written once to Arrow IPC files and memory-mapped by
+        worker processes; best for pure Python regressors
+    refit : Union[bool, int]
+        Whether to refit the forecaster on each split:\n
+        - True: refit on every split (default)
+        - False: fit on the first split only
+        - int k: refit on every k-th split
+
+        Splits that are not refitted reuse the regressors of the last refitted split:
+        their lags are rolled to each cutoff with `Forecaster.update` and all of them
+        are forecasted in one batched `predict`. `target_transform` is re-estimated per split.
+
+    Returns
+    -------
+    y_preds : pl.DataFrame
+        Forecasts of every split with column `split`, in split order.
+    y_resids : pl.DataFrame
+        Residuals of every refitted split with column `split`, in split order. Only returned if `residualize`.
+        A quantile sketch (see `functime.conformal.make_sketch`) of these residuals, bootstrapped
+        across splits as in `Forecaster.conformalize`, is also kept in
+        `forecaster.state.artifacts["y_resid_sketch"]`.
+    """
+    return _backtest(
+        forecaster=forecaster,
+        y=y,
+        cv=cv,
+        X=X,
+        residualize=residualize,
+        n_jobs=n_jobs,
+        backend=backend,
+        refit=refit,
     )
-    last_split = y_resids.get_column("split").max() + 1
-    y_resid = y_resid.with_columns(pl.lit(last_split).alias("split"))
-    y_resids = pl.concat([y_resids, y_resid])
-    return y_resids
 
 
-def backtest(
+def _backtest(
     forecaster: Forecaster,
     y: pl.DataFrame,
     cv: Callable[[pl.DataFrame], Mapping[int, pl.DataFrame]],
     X: Optional[pl.DataFrame] = None,
     residualize: bool = True,
+    n_jobs: int = 1,
+    backend: Literal["threads", "processes"] = "threads",
+    refit: Union[bool, int] = True,
 ) -> Tuple[pl.DataFrame, pl.DataFrame]:
-    pl.enable_string_cache(True)
-    entity_col, time_col = y.columns[:2]
+    # Categorical entities are forecasted as strings and cast back once at the end
+    entity_col = y.columns[0]
+    entity_dtype = y.schema[entity_col]
+    split_dtype = _split_dtype(entity_dtype)
+    y_full, X_full = y, X
+    y = _cast_entity(y, split_dtype)
+    X = X if X is None else _cast_entity(X, split_dtype)
     y_splits = cv(y)
     X_splits = X if X is None else cv(X)
-    y_preds = []
-    y_resids = []
-    for i in range(len(y_splits)):
-        y_train, y_test = y_splits[i]
-        fh = int(
-            y_test.lazy()
-            .select(pl.count() / pl.col(entity_col).n_unique())
-            .collect(streaming=True)
-            .item()
-        )
-        if X is None:
-            X_train, X_test = None, None
-        else:
-            X_train, X_test = X_splits[i]
-        # Forecast
-        forecaster = forecaster.fit(y=y_train, X=X_train)
-        y_pred = forecaster.predict(fh=fh, X=X_test)
-        # Coerce split column names back into original names
-        y_pred = y_pred.select(y_pred.columns[:3]).with_columns(
-            pl.lit(i).alias("split")
-        )
-        # Coerce time column to y_test timestamps
-        y_test = y_test.sort([entity_col, time_col]).collect()
-        y_pred = y_pred.sort([entity_col, time_col]).with_columns(
-            y_test.get_column(time_col)
-        )
-        # Append results
-        y_preds.append(y_pred)
-        if residualize:
-            # Residuals
-            y_resid = _residualize_autoreg(
-                y_train=y_train,
-                X_train=X_train,
-                strategy=forecaster.state.strategy,
-                lags=forecaster.lags,
-                max_horizons=forecaster.max_horizons,
-                artifacts=forecaster.state.artifacts,
+    n_splits = len(y_splits)
+    if backend not in ("threads", "processes"):
+        raise ValueError(f"Unknown backend: {backend}")
+    if isinstance(refit, bool):
+        refit_every = 1 if refit else n_splits
+    elif refit >= 1:
+        refit_every = refit
+    else:
+        raise ValueError(f"`refit` must be a bool or a positive integer: {refit}")
+    refit_splits = range(0, n_splits, refit_every)
+    if backend == "threads" or n_jobs == 1:
+        # Each split fits its own copy: forecasters keep fitted state and string caches
+        tasks = [
+            delayed(_backtest_fold)(
+                _unfitted_copy(forecaster),
+                i,
+                *y_splits[i],
+                *(X_splits[i] if X is not None else (None, None)),
+                residualize=residualize,
             )
-            y_resid = y_resid.with_columns(pl.lit(i).alias("split"))
-            y_resids.append(y_resid)
+            for i in refit_splits
+        ]
+        results = Parallel(n_jobs=n_jobs, prefer="threads")(tasks)
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = {
+                i: _write_splits(
+                    tmp_dir, i, y_splits[i], X_splits[i] if X is not None else None
+                )
+                for i in refit_splits
+            }
+            tasks = [
+                delayed(_backtest_fold_ipc)(
+                    _unfitted_copy(forecaster), i, paths[i], residualize=residualize
+                )
+                for i in refit_splits
+            ]
+            results = Parallel(n_jobs=n_jobs, prefer="processes")(tasks)
 
-    y_preds = pl.concat(y_preds)
-    full_forecaster = forecaster.fit(y=y, X=X)
+    y_preds = {i: y_pred for i, (y_pred, _, _) in zip(refit_splits, results)}
+    # Forecast the remaining splits with the regressors of the preceding refitted split
+    update_tasks = [
+        delayed(_backtest_update)(
+            fitted,
+            {
+                j: (
+                    *y_splits[j],
+                    *(X_splits[j] if X is not None else (None, None)),
+                )
+                for j in range(i + 1, min(i + refit_every, n_splits))
+            },
+        )
+        for i, (_, _, fitted) in zip(refit_splits, results)
+        if refit_every > 1 and i + 1 < n_splits
+    ]
+    for y_preds_updated in Parallel(n_jobs=n_jobs, prefer="threads")(update_tasks):
+        y_preds.update({y_pred["split"][0]: y_pred for y_pred in y_preds_updated})
+    y_preds = _cast_entity(
+        pl.concat([y_preds[i] for i in range(n_splits)]), entity_dtype
+    )
+    # Refit on the original frames: the fitted state keeps the caller's entity dtype
+    forecaster = forecaster.fit(y=y_full, X=X_full, residualize=residualize)
     if residualize:
-        y_resids = _merge_autoreg_residuals(
-            y=y,
-            X=X,
-            y_resids=pl.concat(y_resids),
-            strategy=full_forecaster.state.strategy,
-            lags=forecaster.lags,
-            max_horizons=forecaster.max_horizons,
-            artifacts=full_forecaster.state.artifacts,
+        y_resids = [
+            *[y_resid for _, y_resid, _ in results],
+            _cast_entity(_residuals(forecaster, split=n_splits), split_dtype),
+        ]
+        # Keep a mergeable summary of the residual distribution with the fitted forecaster
+        # from the residuals bootstrapped across splits, as in `Forecaster.conformalize`
+        sketch = make_sketch(_bootstrap(pl.concat(y_resids).lazy()).collect())
+        forecaster.state = replace(
+            forecaster.state,
+            artifacts={**forecaster.state.artifacts, "y_resid_sketch": sketch},
         )
-        pl.enable_string_cache(False)
-        return y_preds, y_resids
-    pl.enable_string_cache(False)
+        return y_preds, _cast_entity(pl.concat(y_resids), entity_dtype)
     return y_preds
@@ -1,5 +1,5 @@
 from functime.base.forecaster import Forecaster
 from functime.base.metric import metric
-from functime.base.transformer import Transformer, transformer
+from functime.base.transformer import Transformer, pipeline, transformer
 
-__all__ = ["Forecaster", "Transformer", "transformer", "metric"]
+__all__ = ["Forecaster", "Transformer", "pipeline", "transformer", "metric"]
@@ -0,0 +1,47 @@
+import os
+from typing import Mapping, Optional, Tuple
+
+import polars as pl
+
+
+def _decategorize(df: pl.DataFrame) -> pl.DataFrame:
+    # Categories are local to a process: categoricals cross process boundaries as strings
+    return df.with_columns(pl.col(pl.Categorical).cast(pl.Utf8))
+
+
+def _write_splits(
+    tmp_dir: str,
+    i: int,
+    y_split: Tuple[pl.LazyFrame, pl.LazyFrame],
+    X_split: Optional[Tuple[pl.LazyFrame, pl.LazyFrame]] = None,
+) -> Mapping[str, Optional[str]]:
+    """Write the train / test frames of split `i` as Arrow IPC files in `tmp_dir`.
+
+    Returns the path of each frame (None if absent), to be read with `_read_splits`
+    in worker processes instead of pickling frames through the executor.
+    """
+    frames = {
+        "y_train": y_split[0],
+        "y_test": y_split[1],
+        "X_train": X_split[0] if X_split else None,
+        "X_test": X_split[1] if X_split else None,
+    }
+    paths = {}
+    for name, frame in frames.items():
+        if frame is None:
+            paths[name] = None
+            continue
+        path = os.path.join(tmp_dir, f"{name}_{i}.arrow")
+        _decategorize(frame.lazy().collect()).write_ipc(path)
+        paths[name] = path
+    return paths
+
+
+def _read_splits(
+    paths: Mapping[str, Optional[str]]
+) -> Mapping[str, Optional[pl.DataFrame]]:
+    """Memory-map the frames written by `_write_splits`."""
+    return {
+        name: pl.read_ipc(path, memory_map=True) if path else None
+        for name, path in paths.items()
+    }
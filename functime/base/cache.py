@@ -0,0 +1,256 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Any, List, Mapping, Optional, Tuple
+
+import numpy as np
+import polars as pl
+
+from functime.base.model import ModelState
+from functime.base.transformer import (
+    Transformer,
+    _collect_fitted,
+    _iter_transformers,
+)
+
+# Cached value: transformed DataFrame and the fitted state of the transformer
+# (and of any nested transformers, e.g. pipeline steps) in traversal order
+CACHE_VALUE = Tuple[pl.DataFrame, List[Optional[ModelState]]]
+
+
+class _UnstableParam(Exception):
+    # Raised for parameters without a canonical serialization: such transformers are not cached
+    pass
+
+
+def _canonical(value: Any) -> str:
+    """Return a canonical serialization of a transformer parameter.
+
+    Unlike `repr`, the serialization is never truncated (e.g. large arrays are hashed)
+    and never depends on object identity (e.g. default `object.__repr__`).
+    """
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return f"{type(value).__name__}:{value!r}"
+    if isinstance(value, Transformer):
+        return _transformer_key(value)
+    if isinstance(value, (list, tuple)):
+        items = ",".join(_canonical(v) for v in value)
+        return f"{type(value).__name__}[{items}]"
+    if isinstance(value, Mapping):
+        items = sorted((_canonical(k), _canonical(v)) for k, v in value.items())
+        return "dict{" + ",".join(f"{k}:{v}" for k, v in items) + "}"
+    if isinstance(value, (date, datetime)):
+        return f"{type(value).__name__}:{value.isoformat()}"
+    if isinstance(value, timedelta):
+        return f"timedelta:{value.total_seconds()!r}"
+    if isinstance(value, np.ndarray):
+        digest = hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()
+        return f"ndarray:{value.dtype}:{value.shape}:{digest}"
+    if isinstance(value, pl.Series):
+        return f"Series:{fingerprint(value.to_frame())}"
+    if isinstance(value, (pl.DataFrame, pl.LazyFrame)):
+        return f"DataFrame:{fingerprint(value.lazy().collect())}"
+    qualname = getattr(value, "__qualname__", None)
+    if callable(value) and qualname and "<" not in qualname:
+        # Module-level functions and classes (not lambdas or closures)
+        return f"callable:{value.__module__}.{qualname}"
+    raise _UnstableParam(type(value).__name__)
+
+
+def _transformer_key(transformer: Transformer) -> str:
+    transf = transformer.transf
+    params = _canonical(dict(transformer.params))
+    return f"{transf.__module__}.{transf.__qualname__}({params})"
+
+
+def fingerprint(X: pl.DataFrame) -> str:
+    """Content hash of a DataFrame: schema, shape, and row hashes."""
+    h = hashlib.sha256()
+    h.update(pl.__version__.encode())
+    h.update(repr(list(X.schema.items())).encode())
+    h.update(repr(X.shape).encode())
+    if X.height > 0:
+        h.update(X.hash_rows(seed=0).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class TransformCache:
+    """Content-addressed cache of transformer outputs.
+
+    Keys hash the transformer (function and a canonical serialization of its parameters)
+    with a fingerprint of the input DataFrame. Transformers with parameters that cannot
+    be serialized canonically (e.g. lambdas, arbitrary objects) are applied without
+    caching. Entries hold the transformed DataFrame and the fitted state of the
+    transformer, so that `invert` and `transform_new` keep working after a cache hit.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of entries held in memory. Least recently used entries are evicted first.
+        If 0, the in-memory cache is disabled. Defaults to 32.
+    cache_dir : Optional[str]
+        Directory to persist entries as Arrow IPC files (fitted states are pickled alongside).
+        Defaults to None (memory only).
+    """
+
+    def __init__(self, maxsize: int = 32, cache_dir: Optional[str] = None):
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self._entries: "OrderedDict[str, CACHE_VALUE]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Guards entries and counters, e.g. for backtest splits fitted in threads
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def _read(self, key: str) -> Optional[CACHE_VALUE]:
+        path = self._path(key)
+        if not os.path.exists(f"{path}.pkl"):
+            return None
+        with open(f"{path}.pkl", "rb") as f:
+            states = pickle.load(f)
+        X_new = pl.read_ipc(f"{path}.arrow", memory_map=False)
+        return X_new, [_load_state(state, path) for state in states]
+
+    def _write(self, key: str, value: CACHE_VALUE):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        X_new, states = value
+        X_new.write_ipc(f"{path}.arrow")
+        states = [_dump_state(state, f"{path}.{i}") for i, state in enumerate(states)]
+        # Write the index file last: entries are only visible once complete
+        with open(f"{path}.pkl", "wb") as f:
+            pickle.dump(states, f)
+
+    def get(self, key: str) -> Optional[CACHE_VALUE]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            elif self.cache_dir is not None:
+                value = self._read(key)
+                if value is not None:
+                    self._put_memory(key, value)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def _put_memory(self, key: str, value: CACHE_VALUE):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def put(self, key: str, value: CACHE_VALUE):
+        with self._lock:
+            self._put_memory(key, value)
+            if self.cache_dir is not None:
+                self._write(key, value)
+
+    def transform(self, transformer: Transformer, X: pl.DataFrame) -> pl.DataFrame:
+        """Apply `transformer` to `X`, reusing the cached output and state if available."""
+        # The output and the fitted state are evaluated in one pass
+        if self.maxsize <= 0 and self.cache_dir is None:
+            return _collect_fitted([transformer], X.lazy().pipe(transformer))
+        try:
+            transformer_key = _transformer_key(transformer)
+        except _UnstableParam:
+            # Parameters cannot be keyed reliably: never cache
+            return _collect_fitted([transformer], X.lazy().pipe(transformer))
+        key = hashlib.sha256(f"{transformer_key}:{fingerprint(X)}".encode()).hexdigest()
+        transformers = list(_iter_transformers(transformer))
+        value = self.get(key)
+        if value is None:
+            X_new = _collect_fitted([transformer], X.lazy().pipe(transformer))
+            value = X_new, [t.state for t in transformers]
+            self.put(key, value)
+        else:
+            X_new, states = value
+            for t, state in zip(transformers, states):
+                t.state = state
+                t._collected = True
+        return X_new
+
+
+def _dump_state(state: Optional[ModelState], path: str) -> Optional[ModelState]:
+    # Replace frames in artifacts by the paths of their IPC files
+    if state is None:
+        return None
+    artifacts = {}
+    for k, v in state.artifacts.items():
+        if isinstance(v, (pl.DataFrame, pl.LazyFrame)):
+            file = f"{path}.{len(artifacts)}.arrow"
+            v.lazy().collect().write_ipc(file)
+            v = _IPCFile(os.path.basename(file), isinstance(v, pl.LazyFrame))
+        artifacts[k] = v
+    return ModelState(entity=state.entity, time=state.time, artifacts=artifacts)
+
+
+def _load_state(state: Optional[ModelState], path: str) -> Optional[ModelState]:
+    if state is None:
+        return None
+    cache_dir = os.path.dirname(path)
+    artifacts = {}
+    for k, v in state.artifacts.items():
+        if isinstance(v, _IPCFile):
+            df = pl.read_ipc(os.path.join(cache_dir, v.name), memory_map=False)
+            v = df.lazy() if v.lazy else df
+        artifacts[k] = v
+    return ModelState(entity=state.entity, time=state.time, artifacts=artifacts)
+
+
+class _IPCFile:
+    def __init__(self, name: str, lazy: bool):
+        self.name = name
+        self.lazy = lazy
+
+
+# Disabled by default: fingerprinting inputs and holding transformed frames in memory
+# are only worth it when the same data is transformed repeatedly (see `set_transform_cache`)
+_TRANSFORM_CACHE = TransformCache(maxsize=0)
+
+
+def get_transform_cache() -> TransformCache:
+    """Return the process-wide transform cache used by `Forecaster`."""
+    return _TRANSFORM_CACHE
+
+
+def set_transform_cache(maxsize: int = 32, cache_dir: Optional[str] = None):
+    """Replace the process-wide transform cache used by `Forecaster`.
+
+    The process-wide cache is disabled until configured, e.g. with `set_transform_cache()`.
+    Pass `maxsize=0` without `cache_dir` to disable it again.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of entries held in memory. If 0, in-memory caching is disabled.
+    cache_dir : Optional[str]
+        Directory to persist entries as Arrow IPC files. Defaults to None (memory only).
+    """
+    global _TRANSFORM_CACHE
+    _TRANSFORM_CACHE = TransformCache(maxsize=maxsize, cache_dir=cache_dir)
+
+
+def cached_transform(transformer: Transformer, X: Any) -> pl.LazyFrame:
+    """Apply `transformer` to `X` through the process-wide transform cache."""
+    X = X.lazy().collect()
+    return _TRANSFORM_CACHE.transform(transformer, X).lazy()
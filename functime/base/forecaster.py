@@ -1,11 +1,21 @@
-from dataclasses import dataclass
+from copy import copy
+from dataclasses import dataclass, replace
 from typing import Callable, List, Mapping, Optional, Tuple, TypeVar, Union
 
 import polars as pl
 from typing_extensions import Literal, ParamSpec
 
-from functime.base.model import Model, ModelState
-from functime.base.transformer import Transformer
+from functime.base.cache import cached_transform, fingerprint
+from functime.base.model import (
+    Model,
+    ModelState,
+    _cast_entity,
+    _enforce_string_cache,
+    _reset_string_cache,
+    _set_string_cache,
+    _split_dtype,
+)
+from functime.base.transformer import Transformer, _iter_transformers, _unfitted
 from functime.ranges import make_future_ranges
 
 # The parameters of the Model
@@ -16,6 +26,10 @@ R = Tuple[TypeVar("fit", bound=Callable), TypeVar("predict", bound=Callable)]
 FORECAST_STRATEGIES = Optional[Literal["direct", "recursive", "naive"]]
 DF_TYPE = Union[pl.LazyFrame, pl.DataFrame]
 
+# Artifacts holding residuals of the fitted data: dropped when the state is rolled by `update`
+_CONFORMAL_CACHE = "__conformal"
+_RESIDUAL_ARTIFACTS = ("y_resid", "y_resid_sketch", _CONFORMAL_CACHE)
+
 
 SUPPORTED_FREQ = [
     "1i",
@@ -39,6 +53,64 @@ class ForecastState(ModelState):
     target_schema: Mapping[str, pl.DataType]
     strategy: Optional[str] = "naive"
     features: Optional[List[str]] = None
+    # Integer codes of the entities seen in `fit`
+    entity_col_dtype: Optional[pl.DataType] = None
+    string_cache: Optional[Mapping[Union[int, str], int]] = None
+    inv_string_cache: Optional[Mapping[int, Union[int, str]]] = None
+    # Fitted feature transform, reapplied to future features with `transform_new`
+    feature_transform: Optional[Transformer] = None
+
+
+def _categorical_features(transformer: Transformer) -> List[str]:
+    """Names of numeric-coded categorical columns reported by fitted feature transformers."""
+    categorical_cols = []
+    for transf in _iter_transformers(transformer):
+        if transf.state is not None:
+            categorical_cols += transf.state.artifacts.get("categorical_cols", [])
+    return categorical_cols
+
+
+def _target_steps(transformer: Transformer) -> List[Transformer]:
+    """Steps of a target transform in order, with pipelines flattened."""
+    if transformer.transf.__name__ == "pipeline":
+        return [s for step in transformer.params["steps"] for s in _target_steps(step)]
+    return [transformer]
+
+
+def _invert_residuals(
+    target_transform: Transformer, y: pl.LazyFrame, y_resid: pl.DataFrame
+) -> pl.DataFrame:
+    """Return in-sample residuals in the scale of the inverted forecasts.
+
+    The fitted values `y - y_resid` and `y` are inverted through the fitted steps of
+    `target_transform` in reverse order. Inversion stops at `diff`, whose inverse accumulates
+    over time: one-step residuals of differences are already residuals of levels.
+    """
+    entity_col, time_col, target_col = y.columns[:3]
+    idx_cols = [entity_col, time_col]
+    y_true = (
+        y_resid.lazy()
+        .select(idx_cols)
+        .join(y.select([*idx_cols, target_col]), on=idx_cols, how="left")
+    )
+    y_hat = y_true.join(y_resid.lazy(), on=idx_cols, how="left").select(
+        [*idx_cols, (pl.col(target_col) - pl.col("y_resid")).alias(target_col)]
+    )
+    for step in reversed(_target_steps(target_transform)):
+        if step.transf.__name__ == "diff":
+            break
+        if step.is_invertible:
+            y_true, y_hat = step.invert(y_true), step.invert(y_hat)
+    return (
+        y_true.join(y_hat, on=idx_cols, how="left", suffix="__hat")
+        .select(
+            [
+                *idx_cols,
+                (pl.col(target_col) - pl.col(f"{target_col}__hat")).alias("y_resid"),
+            ]
+        )
+        .collect()
+    )
 
 
 class Forecaster(Model):
@@ -60,6 +132,10 @@ class Forecaster(Model):
         functime transformer to apply to `y` before fit. The transform is inverted at predict time.
     feature_transform : Optional[Transformer]
         functime transformer to apply to `X` before fit and predict.
+
+        Target and feature transforms go through the process-wide transform cache, which is
+        disabled until configured with `functime.base.cache.set_transform_cache`: identical
+        transforms over identical inputs are then computed once.
     **kwargs : Mapping[str, Any]
         Additional keyword arguments passed into underlying sklearn-compatible regressor.
     """
@@ -101,35 +177,69 @@ class Forecaster(Model):
     def name(self):
         return f"{self.__class__.__name__}(strategy={self.strategy})"
 
-    def _transform_X(self, y: DF_TYPE, X: Optional[DF_TYPE] = None):
-        # Feature transform
+    def _transform_X(
+        self,
+        y: DF_TYPE,
+        X: Optional[DF_TYPE] = None,
+        feature_transform: Optional[Transformer] = None,
+    ):
+        # Feature transform: fitted on a copy per call unless given
+        feature_transform = feature_transform or _unfitted(self.feature_transform)
         if X is None:
-            X_new = (
-                y.select(y.columns[:2])
-                .pipe(self.feature_transform)
-                .collect(streaming=True)
-                .lazy()
-            )
+            X_new = cached_transform(feature_transform, y.select(y.columns[:2]))
         else:
-            X_new = X.pipe(self.feature_transform).collect(streaming=True).lazy()
+            X_new = cached_transform(feature_transform, X)
         return X_new
 
-    def fit(self, y: DF_TYPE, X: Optional[DF_TYPE] = None):
+    def fit(
+        self,
+        y: DF_TYPE,
+        X: Optional[DF_TYPE] = None,
+        residualize: bool = False,
+        categorical_features: Optional[List[str]] = None,
+    ):
+        """Fit forecaster on panel `y` (and exogenous features `X`).
+
+        If `residualize`, in-sample residuals of the fitted regressor(s) are kept in
+        `state.artifacts["y_resid"]` (used by `backtest` without a second reduction pass).
+        Residuals are in the scale of the forecasts: fitted values are inverted through
+        `target_transform` before they are subtracted from `y`.
+        `categorical_features` names integer-coded columns of `X` to treat as categorical,
+        in addition to those reported by `feature_transform` (see `add_calendar_effects`).
+        """
+        # Entity codes and transforms are fitted per call: the forecaster
+        # is only updated once its new state is complete
+        target_transform = _unfitted(self.target_transform)
         # Prepare y
-        target_transform = self.target_transform
-        y: pl.LazyFrame = self._set_string_cache(y.lazy().collect()).lazy()
+        y, entity_col_dtype, string_cache, inv_string_cache = _set_string_cache(
+            y.lazy().collect()
+        )
+        y = y.lazy()
         if target_transform is not None:
-            y = y.pipe(target_transform).collect(streaming=True).lazy()
+            y = cached_transform(target_transform, y)
         # Prepare X
         if X is not None:
             if X.columns[0] == y.columns[0]:
-                X = self._enforce_string_cache(X.lazy().collect())
+                X = _enforce_string_cache(X.lazy().collect(), string_cache)
             X = X.lazy()
         # Feature transform
+        categorical_features = list(categorical_features or [])
+        feature_transform = None
         if self.feature_transform is not None:
-            X = self._transform_X(X=X, y=y)
-        # Fit AR forecaster
-        artifacts = self._fit(y=y, X=X)
+            feature_transform = _unfitted(self.feature_transform)
+            X = self._transform_X(X=X, y=y, feature_transform=feature_transform)
+            categorical_features += _categorical_features(feature_transform)
+        # Fit AR forecaster: per-call options are passed down, never set on `self`
+        artifacts = self._fit(
+            y=y,
+            X=X,
+            residualize=residualize,
+            categorical_features=categorical_features or None,
+        )
+        if target_transform is not None and "y_resid" in artifacts:
+            artifacts["y_resid"] = _invert_residuals(
+                target_transform, y, artifacts["y_resid"]
+            )
         # Prepare artifacts
         cutoffs = y.groupby(y.columns[0]).agg(pl.col(y.columns[1]).max().alias("low"))
         artifacts["__cutoffs"] = cutoffs.collect(streaming=True)
@@ -141,16 +251,73 @@ class Forecaster(Model):
             target_schema=y.schema,
             strategy=self.strategy or "recursive",
             features=X.columns[2:] if X is not None else None,
+            entity_col_dtype=entity_col_dtype,
+            string_cache=string_cache,
+            inv_string_cache=inv_string_cache,
+            feature_transform=feature_transform,
         )
-        self.state = state
         self.target_transform = target_transform
+        self.state = state
         return self
 
+    def update(self, y: DF_TYPE) -> "Forecaster":
+        """Return a copy of the fitted forecaster with its state rolled to the end of `y`.
+
+        Regressors are not refitted: only the lagged target values and cutoffs are recomputed
+        from `y`, so that `predict` forecasts from the last timestamp of each entity in `y`.
+        `target_transform` is re-estimated on `y`. Entities in `y` may differ from the fitted entities.
+
+        Parameters
+        ----------
+        y : Union[pl.LazyFrame, pl.DataFrame]
+            Panel DataFrame of observed values up to the new cutoffs.
+
+        Returns
+        -------
+        forecaster : Forecaster
+            Updated copy of the forecaster. The forecaster itself is left unchanged.
+        """
+        from functime.forecasting._ar import roll_autoreg
+
+        state = self.state
+        if state is None:
+            raise ValueError("Must `.fit` forecaster before `.update`")
+        if "y_lag" not in state.artifacts and "recursive" not in state.artifacts:
+            raise ValueError(f"`{self.name}` does not support `update`")
+        forecaster = copy(self)
+        y, entity_col_dtype, string_cache, inv_string_cache = _set_string_cache(
+            y.lazy().collect()
+        )
+        y = y.lazy()
+        if self.target_transform is not None:
+            forecaster.target_transform = _unfitted(self.target_transform)
+            y = cached_transform(forecaster.target_transform, y)
+        artifacts = roll_autoreg(
+            {k: v for k, v in state.artifacts.items() if k not in _RESIDUAL_ARTIFACTS},
+            y=y,
+            lags=self.lags,
+            max_horizons=self.max_horizons,
+            strategy=state.strategy,
+        )
+        cutoffs = y.groupby(y.columns[0]).agg(pl.col(y.columns[1]).max().alias("low"))
+        artifacts["__cutoffs"] = cutoffs.collect(streaming=True)
+        forecaster.state = replace(
+            state,
+            artifacts=artifacts,
+            target_schema=y.schema,
+            entity_col_dtype=entity_col_dtype,
+            string_cache=string_cache,
+            inv_string_cache=inv_string_cache,
+        )
+        return forecaster
+
     def predict(self, fh: int, X: Optional[DF_TYPE] = None) -> pl.DataFrame:
 
         from functime.forecasting._ar import predict_autoreg
 
+        # Read the fitted state once: a concurrent `fit` replaces it as a whole
         state = self.state
+        target_transform = self.target_transform
         entity_col = state.entity
         time_col = state.time
         target_col = state.target
@@ -173,20 +340,21 @@ class Forecaster(Model):
             has_time = X.columns[1] == state.time
 
             if has_entity:
-                X = self._enforce_string_cache(X.lazy().collect()).lazy()
+                X = _enforce_string_cache(X.lazy().collect(), state.string_cache).lazy()
 
             if has_entity and not has_time:
                 X = future_ranges.lazy().join(X, on=entity_col, how="left")
             elif has_time and not has_entity:
                 X = future_ranges.lazy().join(X, on=time_col, how="left")
 
-        # Feature transform
-        if self.feature_transform is not None:
-            X = self._transform_X(
-                X=X, y=future_ranges.explode(pl.all().exclude(entity_col))
-            )
+        # Feature transform: fitted state (e.g. vocabularies) is reused on future features
+        if state.feature_transform is not None:
+            if X is None:
+                X = future_ranges.explode(pl.all().exclude(entity_col)).lazy()
+                X = X.select(X.columns[:2])
+            X = state.feature_transform.transform_new(X).collect().lazy()
 
-        y_pred_vals = predict_autoreg(self.state, fh=fh, X=X)
+        y_pred_vals = predict_autoreg(state, fh=fh, X=X)
         # BUG: Exploding list[date] errogenously casts
         # into integer series but only for LazyFrame explode
         y_pred = (
@@ -195,14 +363,19 @@ class Forecaster(Model):
             .explode(pl.all().exclude(entity_col))
         )
 
-        if self.target_transform is not None:
+        if target_transform is not None:
             y_pred = (
-                y_pred.with_columns(pl.col(time_col).cast(schema[time_col]))
-                .pipe(self.target_transform.invert)
-                .collect(streaming=True)
+                y_pred.with_columns(pl.col(time_col).cast(schema[time_col])).pipe(
+                    target_transform.invert
+                )
+                # Forecasts are small: inverse transforms (e.g. sort and
+                # cumsum over groups in `diff`) run on the default engine
+                .collect()
             )
 
-        y_pred = y_pred.pipe(self._reset_string_cache)
+        y_pred = _reset_string_cache(
+            y_pred, state.inv_string_cache, state.entity_col_dtype
+        )
         return y_pred
 
     def backtest(
@@ -214,6 +387,9 @@ class Forecaster(Model):
         n_splits: int = 5,
         window_size: int = 10,
         strategy: Literal["expanding", "sliding"] = "expanding",
+        n_jobs: int = 1,
+        backend: Literal["threads", "processes"] = "threads",
+        refit: Union[bool, int] = True,
     ):
         from functime.backtesting import backtest
         from functime.cross_validation import (
@@ -240,6 +416,9 @@ class Forecaster(Model):
             X=X,
             cv=cv,
             residualize=True,
+            n_jobs=n_jobs,
+            backend=backend,
+            refit=refit,
         )
         return y_preds, y_resids
 
@@ -256,30 +435,167 @@ class Forecaster(Model):
         window_size: int = 10,
         strategy: Literal["expanding", "sliding"] = "expanding",
         return_results: bool = False,
+        n_jobs: int = 1,
+        backend: Literal["threads", "processes"] = "threads",
+        refit: Union[bool, int] = True,
+        by_horizon: bool = False,
     ) -> pl.DataFrame:
-        from functime.conformal import conformalize
+        """Return prediction intervals of `fh` step forecasts from backtest residuals (EnbPI).
 
-        y_pred = self.predict(fh=fh, X=X_future)
-        y_preds, y_resids = self.backtest(
-            y=y,
-            X=X,
-            test_size=test_size,
-            step_size=step_size,
-            n_splits=n_splits,
-            window_size=window_size,
-            strategy=strategy,
+        If `by_horizon`, intervals are computed per forecast step from the out-of-sample errors
+        of the backtest splits (see `functime.conformal.conformalize`), else from the in-sample
+        residuals pooled over steps.
+
+        Residuals are cached in the forecaster state on first use: later calls with the same `y`
+        and backtest parameters (e.g. other `alphas`) and `predict_interval` skip the backtest.
+        The cache is invalidated by `fit` and `update`.
+        """
+        from functime.conformal import (
+            HORIZON_COL,
+            _bootstrap,
+            _with_horizon,
+            conformalize,
         )
-        y_pred = pl.concat(
-            [
-                y_pred,
-                y_preds.groupby(y_pred.columns[:2]).agg(
-                    pl.col(y_pred.columns[-1])
-                    .median()
-                    .cast(y_pred.schema[y_pred.columns[-1]])
+
+        params = {
+            "y": fingerprint(y.lazy().collect()),
+            "X": fingerprint(X.lazy().collect()) if X is not None else None,
+            "test_size": test_size,
+            "step_size": step_size,
+            "n_splits": n_splits,
+            "window_size": window_size,
+            "strategy": strategy,
+            "refit": refit,
+            "by_horizon": by_horizon,
+        }
+        cache = self.state.artifacts.get(_CONFORMAL_CACHE) if self.state else None
+        y_pred = self.predict(fh=fh, X=X_future)
+        entity_col, time_col, target_col = y_pred.columns[:3]
+        # Backtest residuals hold categorical entities as strings (see `backtest`)
+        entity_dtype = y_pred.schema[entity_col]
+        y_pred = _cast_entity(y_pred, _split_dtype(entity_dtype))
+        if cache is None or cache["params"] != params or return_results:
+            y_preds, y_resids = self.backtest(
+                y=y,
+                X=X,
+                test_size=test_size,
+                step_size=step_size,
+                n_splits=n_splits,
+                window_size=window_size,
+                strategy=strategy,
+                n_jobs=n_jobs,
+                backend=backend,
+                refit=refit,
+            )
+            if by_horizon:
+                # Out-of-sample errors, and forecast steps of each split
+                y_preds = _with_horizon(
+                    y_preds.lazy(), by=[entity_col, "split"]
+                ).collect()
+                y_resids = y_preds.join(
+                    y.lazy()
+                    .select(y.columns[:3])
+                    .collect()
+                    .pipe(_cast_entity, _split_dtype(entity_dtype)),
+                    on=[entity_col, time_col],
+                    suffix="__actual",
+                ).select(
+                    [
+                        entity_col,
+                        time_col,
+                        (pl.col(f"{target_col}__actual") - pl.col(target_col)).alias(
+                            "y_resid"
+                        ),
+                        "split",
+                        HORIZON_COL,
+                    ]
+                )
+                y_resid = y_resids
+            else:
+                y_resid = _bootstrap(
+                    y_resids.lazy().pipe(_cast_entity, _split_dtype(entity_dtype))
+                ).collect()
+            cache = {
+                "params": params,
+                "y_resid": y_resid,
+                # Median forecast across splits per timestamp
+                "y_pred": _cast_entity(y_preds, _split_dtype(entity_dtype))
+                .groupby(y_pred.columns[:2])
+                .agg(
+                    pl.col(target_col).median().cast(y_pred.schema[target_col]),
+                    # Backtest forecasts take the shortest step across splits
+                    *([pl.col(HORIZON_COL).min()] if by_horizon else []),
                 ),
-            ]
-        )
-        y_pred_qnts = conformalize(y_pred, y_resids, alphas=alphas)
+            }
+            self.state = replace(
+                self.state,
+                artifacts={**self.state.artifacts, _CONFORMAL_CACHE: cache},
+            )
+        if by_horizon:
+            y_pred = _with_horizon(y_pred.lazy(), by=[entity_col]).collect()
+        y_pred = pl.concat([y_pred, cache["y_pred"]])
+        y_pred_qnts = conformalize(
+            y_pred, cache["y_resid"], alphas=alphas, by_horizon=by_horizon
+        ).pipe(_cast_entity, entity_dtype)
         if return_results:
+            y_pred = _cast_entity(y_pred, entity_dtype)
             return y_pred, y_pred_qnts, y_preds, y_resids
         return y_pred_qnts
+
+    def predict_interval(
+        self,
+        fh: int,
+        alphas: Optional[List[float]] = None,
+        X: Optional[DF_TYPE] = None,
+    ) -> pl.DataFrame:
+        """Return prediction intervals of `fh` step forecasts from the cached residual distribution.
+
+        Costs one `predict` and a quantile lookup: residuals cached by `conformalize` are used
+        if available (with its `by_horizon`), else the residual sketch kept by `backtest`, which
+        is pooled over forecast steps. Only forecasts after the cutoff are returned, i.e. the rows of
+        `conformalize` past the end of `y`: with the same backtest parameters and `by_horizon=False`,
+        both paths give the same intervals as long as the sketch is uncompressed (at most about
+        `compression / 2` residual timestamps per entity), else approximately the same.
+
+        Parameters
+        ----------
+        fh : int
+            Number of periods to forecast (i.e. forecast horizon).
+        alphas : Optional[List[float]]
+            Quantile levels. Defaults to `[0.1, 0.9]`.
+        X : Optional[Union[pl.LazyFrame, pl.DataFrame]]
+            Exogenous features over the forecast horizon.
+
+        Returns
+        -------
+        y_pred_quantiles : pl.DataFrame
+            Panel with columns (entity, time, target, quantile), where quantile is in base 100.
+        """
+        from functime.conformal import conformalize, enbpi_sketch
+
+        state = self.state
+        artifacts = state.artifacts if state is not None else {}
+        if _CONFORMAL_CACHE not in artifacts and "y_resid_sketch" not in artifacts:
+            raise ValueError(
+                "Must `.conformalize` or `.backtest` forecaster before `.predict_interval`"
+            )
+        y_pred = self.predict(fh=fh, X=X)
+        # Cached residuals hold categorical entities as strings (see `backtest`)
+        entity_dtype = y_pred.schema[y_pred.columns[0]]
+        y_pred = _cast_entity(y_pred, _split_dtype(entity_dtype))
+        cache = artifacts.get(_CONFORMAL_CACHE)
+        if cache is not None:
+            y_pred_qnts = conformalize(
+                y_pred,
+                cache["y_resid"],
+                alphas=alphas,
+                by_horizon=cache["params"]["by_horizon"],
+            )
+        else:
+            y_pred_qnts = enbpi_sketch(
+                y_pred, artifacts["y_resid_sketch"], alphas=alphas or [0.1, 0.9]
+            ).with_columns(
+                # Make alpha base 100
+                (pl.col("quantile") * 100).cast(pl.Int16)
+            )
+        return _cast_entity(y_pred_qnts, entity_dtype)
@@ -4,17 +4,45 @@ from typing import Any, Mapping, Protocol, Union
 import polars as pl
 
 
+def _cast_entity(df: pl.DataFrame, dtype) -> pl.DataFrame:
+    entity_col = df.columns[0]
+    return df.with_columns(pl.col(entity_col).cast(dtype))
+
+
+def _split_dtype(dtype):
+    # Categoricals built separately only concatenate or join under the global string cache,
+    # which cannot be toggled safely while other threads use categoricals: use strings instead
+    return pl.Utf8 if dtype == pl.Categorical else dtype
+
+
+def _remap(df: pl.DataFrame, mapping: Mapping, return_dtype) -> pl.DataFrame:
+    # Replace values of the entity column by a join with the mapping (unknown values become null).
+    # Unlike `map_dict`, the join runs without Python callbacks and is safe to run in threads.
+    entity_col = df.columns[0]
+    remap = pl.DataFrame(
+        [
+            pl.Series(entity_col, list(mapping.keys())).cast(df.schema[entity_col]),
+            pl.Series("__remap", list(mapping.values())).cast(return_dtype),
+        ]
+    )
+    if isinstance(df, pl.LazyFrame):
+        remap = remap.lazy()
+    return (
+        df.join(remap, on=entity_col, how="left")
+        .with_columns(pl.col("__remap").alias(entity_col))
+        .drop("__remap")
+    )
+
+
 def _set_string_cache(df: pl.DataFrame):
     entity_col = df.columns[0]
-    entities = df.get_column(entity_col).unique()
+    entities = df.get_column(entity_col).unique(maintain_order=True)
     string_cache = {entity: i for i, entity in enumerate(entities)}
     entity_col_dtype = df.schema[entity_col]
     if entity_col_dtype == pl.Categorical:
         # Reset categorical to string type
         df = df.with_columns(pl.col(entity_col).cast(pl.Utf8))
-    df_new = df.with_columns(
-        pl.col(entity_col).map_dict(string_cache, return_dtype=pl.Int32)
-    )
+    df_new = _remap(df, string_cache, return_dtype=pl.Int32)
     inv_string_cache = {i: entity for entity, i in string_cache.items()}
     return df_new, entity_col_dtype, string_cache, inv_string_cache
 
@@ -26,17 +54,13 @@ def _enforce_string_cache(
     if df.schema[entity_col] == pl.Categorical:
         # Reset categorical to string type
         df = df.with_columns(pl.col(entity_col).cast(pl.Utf8))
-    return df.with_columns(
-        pl.col(entity_col).map_dict(string_cache, return_dtype=pl.Int32)
-    )
+    return _remap(df, string_cache, return_dtype=pl.Int32)
 
 
 def _reset_string_cache(
     df: pl.DataFrame, inv_string_cache: Mapping[int, Union[int, str]], return_dtype
 ) -> pl.DataFrame:
-    return df.with_columns(
-        pl.col(df.columns[0]).map_dict(inv_string_cache, return_dtype=return_dtype)
-    )
+    return _remap(df, inv_string_cache, return_dtype=return_dtype)
 
 
 class Regressor(Protocol):
@@ -68,20 +92,27 @@ class ModelState:
 
 
 class Model:
-    """A functime Model definition."""
+    """A functime Model definition.
+
+    Integer codes of entities are kept in the fitted state (see `_set_string_cache`)
+    rather than on the model, so that each `fit` publishes its encoding together with
+    its artifacts and concurrent calls do not share mutable encoding state.
+    """
 
     def __init__(self):
         self.state = None
-        self.entity_col_dtype = None
-        self.string_cache = {}
-        self.inv_string_cache = {}
-
-    def _set_string_cache(self, df: pl.DataFrame) -> pl.DataFrame:
-        df_new, entity_col_dtype, string_cache, inv_string_cache = _set_string_cache(df)
-        self.entity_col_dtype = entity_col_dtype
-        self.string_cache = string_cache
-        self.inv_string_cache = inv_string_cache
-        return df_new
+
+    @property
+    def entity_col_dtype(self):
+        return getattr(self.state, "entity_col_dtype", None)
+
+    @property
+    def string_cache(self) -> Mapping[Union[int, str], int]:
+        return getattr(self.state, "string_cache", None) or {}
+
+    @property
+    def inv_string_cache(self) -> Mapping[int, Union[int, str]]:
+        return getattr(self.state, "inv_string_cache", None) or {}
 
     def _enforce_string_cache(self, df: pl.DataFrame) -> pl.DataFrame:
         return _enforce_string_cache(df, self.string_cache)
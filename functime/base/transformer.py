@@ -1,6 +1,17 @@
+import importlib
 import inspect
 from functools import cached_property, wraps
-from typing import Callable, Tuple, TypeVar, Union
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import polars as pl
 from typing_extensions import ParamSpec
@@ -21,6 +32,8 @@ class Transformer:
         self.args = args
         self.kwargs = kwargs
         self.state = None
+        # Whether LazyFrames in the fitted state have been evaluated (see `_collect_fitted`)
+        self._collected = False
 
     @property
     def func(self):
@@ -42,33 +55,167 @@ class Transformer:
     def __call__(self, X: DF_TYPE):
         return self.transform(X)
 
+    def __getstate__(self):
+        # `transf` is shadowed by its `@transformer` wrapper at module level:
+        # pickle it by reference so transformers can be sent to worker processes
+        state = self.__dict__.copy()
+        state["transf"] = (self.transf.__module__, self.transf.__qualname__)
+        return state
+
+    def __setstate__(self, state):
+        module, qualname = state["transf"]
+        transf = getattr(importlib.import_module(module), qualname)
+        state["transf"] = getattr(transf, "__wrapped__", transf)
+        self.__dict__.update(state)
+
     @cached_property
     def is_invertible(self):
         return isinstance(self.func, Tuple)
 
+    def _fit(self, X: pl.LazyFrame) -> Mapping[str, Any]:
+        """Return the artifacts of the transform (i.e. `X_new` and fitted state)
+        without setting state. Artifacts may contain unevaluated LazyFrames.
+        """
+        transform = self.func[0] if self.is_invertible else self.func
+        return transform(X)
+
+    def _set_state(self, X: pl.LazyFrame, artifacts: Mapping[str, Any]):
+        self.state = ModelState(
+            entity=X.columns[0], time=X.columns[1], artifacts=artifacts
+        )
+        self._collected = False
+
     def transform(self, X: DF_TYPE) -> pl.LazyFrame:
+        # Fitted parameters stay lazy: they are evaluated with the output by the caller
+        # (see `_collect_fitted`) or once on first `invert` / `transform_new`
         X = X.lazy()
-        transform = self.func[0] if self.is_invertible else self.func
-        artifacts = transform(X)
-        state = ModelState(entity=X.columns[0], time=X.columns[1], artifacts=artifacts)
-        self.state = state
+        artifacts = self._fit(X)
+        self._set_state(X, artifacts)
         return artifacts["X_new"]
 
     def invert(self, X: DF_TYPE) -> pl.LazyFrame:
         if not self.is_invertible:
             raise ValueError("`invert` is not supported for this transformer.")
+        _collect_fitted([self])
         invert = self.func[1]
         return invert(state=self.state, X=X.lazy())
 
     def transform_new(self, X: DF_TYPE) -> pl.LazyFrame:
+        if not self.is_invertible:
+            # Stateless transformers are simply re-applied
+            return self.func(X.lazy())["X_new"]
+        if len(self.func) < 3:
+            raise ValueError("`transform_new` is not supported for this transformer.")
+        _collect_fitted([self])
         transform = self.func[2]
         X_new = transform(state=self.state, X=X.lazy())
         return X_new
 
 
+def _unfitted(obj: Any) -> Any:
+    """Fresh copies of transformers (including nested pipeline steps) without fitted state."""
+    if isinstance(obj, Transformer):
+        return Transformer(
+            obj.transf,
+            *[_unfitted(arg) for arg in obj.args],
+            **{k: _unfitted(v) for k, v in obj.kwargs.items()},
+        )
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_unfitted(x) for x in obj)
+    return obj
+
+
 def transformer(transf: Callable[P, R]):
     @wraps(transf)
     def _transformer(*args: P.args, **kwargs: P.kwargs) -> Transformer:
         return Transformer(transf, *args, **kwargs)
 
     return _transformer
+
+
+def _iter_transformers(transformer: Transformer) -> Iterator[Transformer]:
+    """Yield transformer and any transformers nested in its parameters."""
+    yield transformer
+    for param in transformer.params.values():
+        params = param if isinstance(param, (list, tuple)) else [param]
+        for p in params:
+            if isinstance(p, Transformer):
+                yield from _iter_transformers(p)
+
+
+def _collect_fitted(
+    transformers: List[Transformer], X_new: Optional[pl.LazyFrame] = None
+) -> Optional[pl.DataFrame]:
+    """Evaluate the LazyFrames in the fitted state of `transformers` (and of nested
+    transformers, e.g. pipeline steps) in one `pl.collect_all`.
+
+    Fitted parameters are replaced by lazy views over the collected DataFrames, so that
+    `invert` and `transform_new` never recompute them from the full history.
+    If `X_new` is given, it is collected in the same pass and returned.
+    """
+    pending = {}
+    for transformer in transformers:
+        for t in _iter_transformers(transformer):
+            if t.state is not None and not t._collected:
+                pending[id(t)] = t
+    pending = list(pending.values())
+    keys = [
+        (i, k)
+        for i, t in enumerate(pending)
+        for k, v in t.state.artifacts.items()
+        if k != "X_new" and isinstance(v, pl.LazyFrame)
+    ]
+    frames = [pending[i].state.artifacts[k] for i, k in keys]
+    if X_new is not None:
+        frames.append(X_new)
+    results = pl.collect_all(frames) if frames else []
+    artifacts = [dict(t.state.artifacts) for t in pending]
+    for (i, k), result in zip(keys, results):
+        artifacts[i][k] = result.lazy()
+    for t, t_artifacts in zip(pending, artifacts):
+        t.state = ModelState(
+            entity=t.state.entity, time=t.state.time, artifacts=t_artifacts
+        )
+        t._collected = True
+    if X_new is not None:
+        return results[-1]
+    return None
+
+
+@transformer
+def pipeline(steps: List[Transformer]):
+    """Chain transformers into a single transformer.
+
+    The lazy query plans of every step are composed: the fitted state (e.g. means, lambdas,
+    initial values) required by each step is evaluated in a single `pl.collect_all`,
+    together with the final output when applied by a `Forecaster`, else on first `invert`
+    or `transform_new`.
+    The pipeline can be used as a `target_transform` or `feature_transform` in any `Forecaster`.
+
+    Parameters
+    ----------
+    steps : List[Transformer]
+        functime transformers to apply in order.
+        `invert` applies the inverse of each invertible step in reverse order;
+        steps that are not invertible (e.g. `impute`) are skipped.
+    """
+
+    def transform(X: pl.LazyFrame) -> pl.LazyFrame:
+        X_new = X
+        for step in steps:
+            X_new = step.transform(X_new)
+        artifacts = {"X_new": X_new}
+        return artifacts
+
+    def invert(state: ModelState, X: pl.LazyFrame) -> pl.LazyFrame:
+        for step in reversed(steps):
+            if step.is_invertible:
+                X = step.invert(X)
+        return X
+
+    def transform_new(state: ModelState, X: pl.LazyFrame) -> pl.LazyFrame:
+        for step in steps:
+            X = step.transform_new(X)
+        return X
+
+    return transform, invert, transform_new
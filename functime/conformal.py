@@ -1,59 +1,160 @@
-from typing import List
+from typing import List, Optional, Sequence
 
+import numpy as np
 import polars as pl
 
+HORIZON_COL = "horizon"
+
+# Default compression of residual sketches: at most about `compression / 2` centroids per entity
+DEFAULT_COMPRESSION = 100
+
+
+def _with_horizon(df: pl.LazyFrame, by: Sequence[str]) -> pl.LazyFrame:
+    # 1-based forecast step of each timestamp within `by` groups (e.g. entity and split)
+    time_col = df.columns[1]
+    return df.with_columns(
+        pl.col(time_col).rank("ordinal").over(by).cast(pl.UInt32).alias(HORIZON_COL)
+    )
+
+
+def _attach_quantiles(
+    y_pred: pl.LazyFrame,
+    y_resid_quantiles: pl.LazyFrame,
+    quantile_cols: List[str],
+    by_horizon: bool = False,
+) -> pl.DataFrame:
+    entity_col, time_col, target_col = y_pred.columns[:3]
+    if by_horizon:
+        # Steps beyond the largest residual step use the quantiles of the largest step
+        y_pred = y_pred.sort(HORIZON_COL).join_asof(
+            y_resid_quantiles.sort(HORIZON_COL), on=HORIZON_COL, by=entity_col
+        )
+    else:
+        y_pred = y_pred.join(y_resid_quantiles, on=entity_col, how="left")
+    return (
+        y_pred.select(
+            [
+                entity_col,
+                time_col,
+                *[
+                    (pl.col(target_col) + pl.col(col)).alias(col)
+                    for col in quantile_cols
+                ],
+            ]
+        )
+        .melt(
+            id_vars=[entity_col, time_col],
+            value_vars=quantile_cols,
+            variable_name="quantile",
+            value_name=target_col,
+        )
+        .select([entity_col, time_col, target_col, pl.col("quantile").cast(pl.Float64)])
+        .sort([entity_col, time_col, "quantile"])
+        .collect()
+    )
+
 
 def enbpi(
     y_pred: pl.LazyFrame,
     y_resid: pl.LazyFrame,
     alphas: List[float],
+    by_horizon: bool = False,
 ) -> pl.DataFrame:
-    """Compute prediction intervals using ensemble batch prediction intervals (ENBPI)."""
-
-    # 1. Group residuals by entity
-    entity_col, time_col = y_pred.columns[:2]
-    y_resid_grouped = y_resid.collect().groupby(entity_col, maintain_order=True)
-
-    # 2. Forecast future prediction intervals: use constant residual quantile
-    y_pred_quantiles = []
-    for alpha in alphas:
-        y_pred_quantile = (
-            y_resid_grouped.quantile(alpha)
-            .select([entity_col, y_resid.columns[-1]])
-            .lazy()
-            .join(y_pred.lazy(), how="left", on=entity_col)
-            .select(
-                [
-                    entity_col,
-                    time_col,
-                    pl.col(y_pred.columns[-1]) + pl.col(y_resid.columns[-1]),
-                    pl.lit(alpha).alias("quantile"),
-                ]
-            )
-        )
-        y_pred_quantiles.append(y_pred_quantile)
+    """Compute prediction intervals using ensemble batch prediction intervals (ENBPI).
+
+    Residual quantiles for all `alphas` are computed in one grouped aggregation
+    and attached to `y_pred` with a single join. The query stays lazy until the final collect.
+    Quantiles are linearly interpolated between order statistics, as in `sketch_quantiles`.
 
-    y_pred_quantiles = (
-        pl.concat(y_pred_quantiles).sort([entity_col, time_col]).collect()
+    Parameters
+    ----------
+    y_pred : pl.LazyFrame
+        Panel of point forecasts with columns (entity, time, target).
+    y_resid : pl.LazyFrame
+        Panel of residuals with columns (entity, time, residual).
+    alphas : List[float]
+        Quantile levels, e.g. `[0.1, 0.9]`.
+    by_horizon : bool
+        If True, quantiles are computed per entity and forecast step, so that intervals widen with
+        the horizon. Steps are read from the "horizon" column if present, else ranked by time within
+        each entity (and split, if `y_resid` has a "split" column). Forecast steps beyond the largest
+        residual step use the quantiles of the largest step. Defaults to False (pooled over steps).
+
+    Returns
+    -------
+    y_pred_quantiles : pl.DataFrame
+        Panel with columns (entity, time, target, quantile) sorted by entity, time, and quantile.
+    """
+    y_pred = y_pred.lazy()
+    y_resid = y_resid.lazy()
+    entity_col, time_col, target_col = y_pred.columns[:3]
+    resid_col = y_resid.columns[2]
+    quantile_cols = [str(alpha) for alpha in alphas]
+    keys = [entity_col]
+    if by_horizon:
+        keys.append(HORIZON_COL)
+        if HORIZON_COL not in y_pred.columns:
+            y_pred = _with_horizon(y_pred, by=[entity_col])
+        if HORIZON_COL not in y_resid.columns:
+            by = [entity_col, "split"] if "split" in y_resid.columns else [entity_col]
+            y_resid = _with_horizon(y_resid, by=by)
+
+    # 1. Residual quantiles for every alpha in one aggregation
+    y_resid_quantiles = y_resid.groupby(keys).agg(
+        [
+            pl.col(resid_col).quantile(alpha, interpolation="linear").alias(col)
+            for alpha, col in zip(alphas, quantile_cols)
+        ]
+    )
+
+    # 2. Attach quantiles to forecasts in a single join
+    y_pred_quantiles = _attach_quantiles(
+        y_pred, y_resid_quantiles, quantile_cols, by_horizon=by_horizon
     )
     return y_pred_quantiles
 
 
+def _bootstrap(y_resids: pl.LazyFrame) -> pl.LazyFrame:
+    # Aggregate bootstrapped residuals: median across splits per timestamp
+    return y_resids.groupby(y_resids.columns[:2]).agg(
+        pl.col(y_resids.columns[2]).median()
+    )
+
+
 def conformalize(
     y_pred: pl.DataFrame,
     y_resids: pl.DataFrame,
-    alphas: List[float],
+    alphas: Optional[List[float]] = None,
+    by_horizon: bool = False,
 ) -> pl.DataFrame:
-    """Compute prediction intervals using ensemble batch prediction intervals (ENBPI)."""
+    """Compute prediction intervals using ensemble batch prediction intervals (ENBPI).
+
+    Parameters
+    ----------
+    y_pred : pl.DataFrame
+        Panel of point forecasts with columns (entity, time, target).
+    y_resids : pl.DataFrame
+        Panel of residuals across backtest splits with columns (entity, time, residual, split).
+    alphas : Optional[List[float]]
+        Quantile levels. Defaults to `[0.1, 0.9]`.
+    by_horizon : bool
+        If False, residuals are bootstrapped (median across splits per timestamp) and pooled per entity.
+        If True, quantiles are computed per entity and forecast step: `y_resids` should then hold
+        out-of-sample errors of each split, so that the k-th timestamp of an entity in a split
+        is its k-step-ahead error. Defaults to False.
 
+    Returns
+    -------
+    y_pred_quantiles : pl.DataFrame
+        Panel with columns (entity, time, target, quantile), where quantile is in base 100.
+    """
+
+    alphas = alphas or [0.1, 0.9]
     y_pred = y_pred.lazy()
     y_resids = y_resids.lazy()
 
-    # Aggregate bootstrapped residuals
-    y_resid = y_resids.groupby(y_pred.columns[:2]).agg(
-        pl.col(y_resids.columns[-2]).median()
-    )
-    y_pred_quantiles = enbpi(y_pred, y_resid, alphas)
+    y_resid = y_resids if by_horizon else _bootstrap(y_resids)
+    y_pred_quantiles = enbpi(y_pred, y_resid, alphas, by_horizon=by_horizon)
 
     # Make alpha base 100
     y_pred_quantiles = y_pred_quantiles.with_columns(
@@ -61,3 +162,161 @@ def conformalize(
     )
 
     return y_pred_quantiles
+
+
+def _scale(q: pl.Expr, compression: int) -> pl.Expr:
+    # t-digest k1 scale function: centroids are smaller (more accurate) in the tails
+    return compression / (2 * np.pi) * (2 * q - 1).arcsin() + compression / 4
+
+
+def _compress(
+    centroids: pl.LazyFrame, keys: List[str], compression: int
+) -> pl.LazyFrame:
+    # Merge adjacent centroids (sorted by mean) that fall into the same unit of the scale function
+    weight = pl.col("weight")
+    q = (weight.cumsum().over(keys) - weight / 2) / weight.sum().over(keys)
+    return (
+        centroids.sort([*keys, "mean"])
+        .with_columns(_scale(q, compression).floor().cast(pl.Int32).alias("__bin"))
+        .groupby([*keys, "__bin"])
+        .agg(
+            [
+                ((pl.col("mean") * weight).sum() / weight.sum()).alias("mean"),
+                weight.sum(),
+            ]
+        )
+        .select([*keys, "mean", "weight"])
+        .sort([*keys, "mean"])
+    )
+
+
+def make_sketch(
+    y_resid: pl.DataFrame,
+    compression: int = DEFAULT_COMPRESSION,
+    by_horizon: bool = False,
+) -> pl.DataFrame:
+    """Return mergeable quantile sketches (t-digest) of the residual distribution of each entity.
+
+    A sketch holds at most about `compression / 2` weighted centroids per entity, with smaller
+    centroids in the tails, so that tail quantiles stay accurate. Sketches of different folds,
+    processes, or days can be combined with `merge_sketches` without keeping raw residuals.
+
+    Parameters
+    ----------
+    y_resid : pl.DataFrame
+        Panel of residuals with columns (entity, time, residual, ...).
+    compression : int
+        Size parameter of the sketch. Higher is more accurate. Defaults to 100.
+    by_horizon : bool
+        If True, keep one sketch per entity and forecast step (see `enbpi`). Defaults to False.
+
+    Returns
+    -------
+    sketch : pl.DataFrame
+        DataFrame with columns (entity, [horizon], mean, weight) with one row per centroid.
+    """
+    y_resid = y_resid.lazy()
+    entity_col = y_resid.columns[0]
+    keys = [entity_col]
+    if by_horizon:
+        keys.append(HORIZON_COL)
+        if HORIZON_COL not in y_resid.columns:
+            by = [entity_col, "split"] if "split" in y_resid.columns else [entity_col]
+            y_resid = _with_horizon(y_resid, by=by)
+    centroids = y_resid.select(
+        [
+            *keys,
+            pl.col(y_resid.columns[2]).cast(pl.Float64).alias("mean"),
+            pl.lit(1.0).alias("weight"),
+        ]
+    )
+    return _compress(centroids, keys, compression).collect()
+
+
+def merge_sketches(
+    sketches: List[pl.DataFrame], compression: int = DEFAULT_COMPRESSION
+) -> pl.DataFrame:
+    """Merge residual sketches (see `make_sketch`) into one sketch per entity."""
+    keys = sketches[0].columns[:-2]
+    centroids = pl.concat([sketch.lazy() for sketch in sketches])
+    return _compress(centroids, keys, compression).collect()
+
+
+def sketch_quantiles(sketch: pl.DataFrame, alphas: List[float]) -> pl.DataFrame:
+    """Return residual quantiles of each entity estimated from its sketch.
+
+    Quantiles are linearly interpolated between centroid means, each placed at the quantile level of
+    its middle observation. A sketch of unit-weight centroids thus gives the same quantiles as `enbpi`.
+
+    Returns
+    -------
+    quantiles : pl.DataFrame
+        DataFrame with columns (entity, [horizon], *alphas) where quantile columns are named `str(alpha)`.
+    """
+    keys = sketch.columns[:-2]
+    weight = pl.col("weight")
+    # Level (rank - 1) / (n - 1) of the middle observation of each centroid
+    total = weight.sum().over(keys)
+    q = (
+        pl.when(total > 1)
+        .then((weight.cumsum().over(keys) - (weight + 1) / 2) / (total - 1))
+        .otherwise(0.5)
+    )
+    aggs = []
+    for i, alpha in enumerate(alphas):
+        is_lower, is_upper = pl.col("__q") <= alpha, pl.col("__q") >= alpha
+        aggs += [
+            pl.col("mean").filter(is_lower).last().alias(f"__lo_{i}"),
+            pl.col("__q").filter(is_lower).last().alias(f"__lo_q_{i}"),
+            pl.col("mean").filter(is_upper).first().alias(f"__hi_{i}"),
+            pl.col("__q").filter(is_upper).first().alias(f"__hi_q_{i}"),
+        ]
+    quantiles = []
+    for i, alpha in enumerate(alphas):
+        lo, lo_q = pl.col(f"__lo_{i}"), pl.col(f"__lo_q_{i}")
+        hi, hi_q = pl.col(f"__hi_{i}"), pl.col(f"__hi_q_{i}")
+        # Quantiles beyond the outer centroids take the outer centroid means
+        quantile = (
+            pl.when(lo.is_null())
+            .then(hi)
+            .when(hi.is_null() | (hi_q == lo_q))
+            .then(lo)
+            .otherwise(lo + (hi - lo) * (alpha - lo_q) / (hi_q - lo_q))
+        )
+        quantiles.append(quantile.alias(str(alpha)))
+    return (
+        sketch.lazy()
+        .sort([*keys, "mean"])
+        .with_columns(q.alias("__q"))
+        .groupby(keys, maintain_order=True)
+        .agg(aggs)
+        .select([*keys, *quantiles])
+        .collect()
+    )
+
+
+def enbpi_sketch(
+    y_pred: pl.DataFrame,
+    sketch: pl.DataFrame,
+    alphas: List[float],
+) -> pl.DataFrame:
+    """Compute prediction intervals like `enbpi` from residual sketches instead of raw residuals.
+
+    If `sketch` has a "horizon" column (see `make_sketch`), quantiles are looked up per forecast step.
+
+    Returns
+    -------
+    y_pred_quantiles : pl.DataFrame
+        Panel with columns (entity, time, target, quantile) sorted by entity, time, and quantile.
+    """
+    y_pred = y_pred.lazy()
+    by_horizon = HORIZON_COL in sketch.columns
+    if by_horizon and HORIZON_COL not in y_pred.columns:
+        y_pred = _with_horizon(y_pred, by=[y_pred.columns[0]])
+    y_resid_quantiles = sketch_quantiles(sketch, alphas).lazy()
+    return _attach_quantiles(
+        y_pred,
+        y_resid_quantiles,
+        [str(alpha) for alpha in alphas],
+        by_horizon=by_horizon,
+    )
@@ -1,8 +1,49 @@
-from typing import Mapping, Optional, Tuple
+from typing import Callable, Mapping, Optional, Tuple
 
 import numpy as np
 import polars as pl
 
+_ROWS_LEFT = "__rows_left"
+
+
+def _with_rows_left(X: pl.LazyFrame) -> pl.LazyFrame:
+    # Number of rows from the end of each entity (1 for the last row), computed once
+    # so that every fold is a boolean mask over the same frame
+    entity_col = X.columns[0]
+    rows_left = pl.col(entity_col).cumcount(reverse=True).over(entity_col) + 1
+    return X.with_columns(rows_left.alias(_ROWS_LEFT))
+
+
+def _rows_between(
+    X: pl.LazyFrame, eager: bool
+) -> Callable[[int, Optional[int]], pl.LazyFrame]:
+    # Return a function of (lo, hi) that selects the rows `lo <= rows_left <= hi` of each entity
+    X = _with_rows_left(X)
+    if not eager:
+        # Folds are filters over one cached plan
+        X = X.cache()
+        rows_left = pl.col(_ROWS_LEFT)
+
+        def rows(lo: int, hi: Optional[int] = None) -> pl.LazyFrame:
+            mask = rows_left >= lo if hi is None else rows_left.is_between(lo, hi)
+            return X.filter(mask).drop(_ROWS_LEFT)
+
+        return rows
+
+    # Sorted by position from the end (time-major), every fold is a contiguous range of rows:
+    # folds are zero-copy slices of one collected frame. Rows of each entity stay in time order.
+    entity_col = X.columns[0]
+    X = X.collect().sort([_ROWS_LEFT, entity_col], descending=[True, False])
+    neg_rows_left = -X.get_column(_ROWS_LEFT).cast(pl.Int64).to_numpy()
+    X = X.drop(_ROWS_LEFT)
+
+    def rows(lo: int, hi: Optional[int] = None) -> pl.DataFrame:
+        start = 0 if hi is None else np.searchsorted(neg_rows_left, -hi, side="left")
+        end = np.searchsorted(neg_rows_left, -lo, side="right")
+        return X.slice(int(start), int(end - start))
+
+    return rows
+
 
 def train_test_split(
     test_size: int, eager: bool = False
@@ -15,6 +56,8 @@ def train_test_split(
         Number of test samples.
     eager : bool
         If True, evaluate immediately and returns tuple of train-test `DataFrame`.
+        Both are zero-copy slices of the panel sorted time-major (by position from the end of
+        each entity, then by entity): rows of each entity stay in time order.
 
     Returns
     -------
@@ -23,20 +66,9 @@ def train_test_split(
     """
 
     def split(X: pl.LazyFrame) -> pl.LazyFrame:
-        X = X.lazy()  # Defensive
-        entity_col = X.columns[0]
-        train_split = (
-            X.groupby(entity_col)
-            .agg(pl.all().slice(0, pl.count() - test_size))
-            .explode(pl.all().exclude(entity_col))
-        )
-        test_split = (
-            X.groupby(entity_col)
-            .agg(pl.all().slice(-1 * test_size, test_size))
-            .explode(pl.all().exclude(entity_col))
-        )
-        if eager:
-            train_split, test_split = pl.collect_all([train_split, test_split])
+        rows = _rows_between(X.lazy(), eager=eager)
+        train_split = rows(test_size + 1)
+        test_split = rows(1, test_size)
         return train_split, test_split
 
     return split
@@ -48,32 +80,22 @@ def _window_split(
     n_splits: int,
     step_size: int,
     window_size: Optional[int] = None,
+    eager: bool = False,
 ) -> Mapping[int, Tuple[pl.LazyFrame, pl.LazyFrame]]:
-    X = X.lazy()  # Defensive
     backward_steps = np.arange(1, n_splits) * step_size + test_size
     cutoffs = np.flip(np.concatenate([np.array([test_size]), backward_steps]))
-    entity_col = X.columns[0]
-    if window_size:
-        # Sliding window CV
-        train_exprs = [
-            pl.all().slice(pl.count() - cutoff - window_size, window_size)
-            for cutoff in cutoffs
-        ]
-    else:
-        # Expanding window CV
-        train_exprs = [pl.all().slice(0, pl.count() - cutoff) for cutoff in cutoffs]
-
-    test_exprs = [pl.all().slice(-cutoffs[i], test_size) for i in range(n_splits)]
-    train_test_exprs = zip(train_exprs, test_exprs)
+    # Scan and index the panel once: folds are filters (lazy) or slices (eager) of one frame
+    rows = _rows_between(X.lazy(), eager=eager)
     splits = {}
-    for i, train_test_expr in enumerate(train_test_exprs):
-        train_expr, test_expr = train_test_expr
-        train_split = (
-            X.groupby(entity_col).agg(train_expr).explode(pl.all().exclude(entity_col))
-        )
-        test_split = (
-            X.groupby(entity_col).agg(test_expr).explode(pl.all().exclude(entity_col))
-        )
+    for i, cutoff in enumerate(cutoffs):
+        cutoff = int(cutoff)
+        if window_size:
+            # Sliding window CV
+            train_split = rows(cutoff + 1, cutoff + window_size)
+        else:
+            # Expanding window CV
+            train_split = rows(cutoff + 1)
+        test_split = rows(cutoff - test_size + 1, cutoff)
         splits[i] = train_split, test_split
     return splits
 
@@ -105,6 +127,8 @@ def expanding_window_split(
         Step size between windows.
     eager : bool, default=False
         If True return DataFrames. Otherwise, return LazyFrames.
+        Eager folds are zero-copy slices of the panel sorted time-major (by position from the end
+        of each entity, then by entity): rows of each entity stay in time order.
 
     Returns
     -------
@@ -114,10 +138,7 @@ def expanding_window_split(
     """
 
     def split(X: pl.LazyFrame) -> pl.LazyFrame:
-        splits = _window_split(X, test_size, n_splits, step_size)
-        if eager:
-            splits = {i: pl.collect_all(s) for i, s in splits.items()}
-        return splits
+        return _window_split(X, test_size, n_splits, step_size, eager=eager)
 
     return split
 
@@ -154,6 +175,8 @@ def sliding_window_split(
         Window size for training.
     eager : bool, default=False
         If True return DataFrames. Otherwise, return LazyFrames.
+        Eager folds are zero-copy slices of the panel sorted time-major (by position from the end
+        of each entity, then by entity): rows of each entity stay in time order.
 
     Returns
     -------
@@ -163,9 +186,8 @@ def sliding_window_split(
     """
 
     def split(X: pl.LazyFrame) -> pl.LazyFrame:
-        splits = _window_split(X, test_size, n_splits, step_size, window_size)
-        if eager:
-            splits = {i: pl.collect_all(s) for i, s in splits.items()}
-        return splits
+        return _window_split(
+            X, test_size, n_splits, step_size, window_size, eager=eager
+        )
 
     return split
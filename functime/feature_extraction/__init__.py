@@ -1,15 +1,22 @@
 from .calendar import (
     add_calendar_effects,
+    add_holiday_distances,
     add_holiday_effects,
     make_future_calendar_effects,
     make_future_holiday_effects,
 )
-from .fourier import add_fourier_terms
+from .fourier import add_fourier_terms, make_future_fourier_terms
+from .future import make_future_features
+from .tsfeatures import tsfeatures
 
 __all__ = [
     "add_calendar_effects",
+    "add_holiday_distances",
     "add_holiday_effects",
     "add_fourier_terms",
     "make_future_calendar_effects",
+    "make_future_features",
+    "make_future_fourier_terms",
     "make_future_holiday_effects",
+    "tsfeatures",
 ]
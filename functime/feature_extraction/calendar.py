@@ -1,11 +1,30 @@
-from typing import List, Optional
+import os
+import tempfile
+from functools import lru_cache
+from typing import List, Mapping, Optional, Tuple
 
+import holidays
+import numpy as np
 import polars as pl
 from holidays import country_holidays
 from typing_extensions import Literal
 
 from functime.base import transformer
-from functime.ranges import make_future_ranges
+from functime.base.cache import get_transform_cache
+from functime.base.model import ModelState
+from functime.feature_extraction.future import make_future_features
+from functime.preprocessing import _dummy_exprs, _fit_vocabulary
+
+# Known categories of calendar effects (year is learnt from the data)
+CALENDAR_CATEGORIES = {
+    "minute": range(0, 60),
+    "hour": range(0, 24),
+    "day": range(1, 32),
+    "weekday": range(1, 8),
+    "week": range(1, 54),
+    "month": range(1, 13),
+    "quarter": range(1, 5),
+}
 
 
 @transformer
@@ -14,6 +33,7 @@ def add_calendar_effects(
         Literal["minute", "hour", "day", "weekday", "week", "month", "quarter", "year"]
     ],
     as_dummies: bool = False,
+    encoding: Literal["categorical", "integer", "cyclical"] = "categorical",
 ):
     """Extract calendar effects from time column, returns calendar effects as categorical columns.
 
@@ -30,86 +50,301 @@ def add_calendar_effects(
         - "quarter"
         - "year"
     as_dummies : bool
-        Returns calendar effects as columns of one-hot-encoded dummies.
+        Returns calendar effects as columns of one-hot-encoded dummies (`{attr}_{value}`).
+        Dummies are lazy expressions over every possible value of the calendar effect,
+        so the same columns are returned for any time range (e.g. at fit and predict).
+        Years are learnt at fit: `transform_new` encodes years unseen at fit as all zeros.
+    encoding : str
+        How calendar effects are returned if not `as_dummies`:\n
+        - "categorical": string-cast categorical columns (requires a global string cache to combine frames)
+        - "integer": integer-coded columns (Int32), numeric end to end, declared as categorical
+        - "cyclical": `{attr}_sin` and `{attr}_cos` columns that encode the position of the calendar effect
+        in its cycle (e.g. December is close to January); "year" is integer-coded.
+
+        The names of integer-coded categorical columns (i.e. "integer" encoding, except "year")
+        are stored in the transformer state under `categorical_cols`. The `lightgbm` and `xgboost`
+        forecasters treat them as native categorical features: this is opt-in, as "categorical"
+        columns keep their previous handling (native in `lightgbm`, physical codes in `xgboost`).
+        Defaults to "categorical".
     """
 
-    def transform(X: pl.LazyFrame) -> pl.LazyFrame:
+    def _cyclical(attr: str, value: pl.Expr) -> List[pl.Expr]:
+        categories = CALENDAR_CATEGORIES[attr]
+        phase = 2 * np.pi * (value - categories.start) / len(categories)
+        return [np.sin(phase).alias(f"{attr}_sin"), np.cos(phase).alias(f"{attr}_cos")]
+
+    def _effects(X: pl.LazyFrame) -> Tuple[pl.LazyFrame, List[str]]:
         time_col = pl.col(X.columns[1])
-        X_new = X.with_columns(
-            [
-                getattr(time_col.dt, attr)()
-                .alias(attr)
-                .cast(pl.Utf8)
-                .cast(pl.Categorical)
+        values = {attr: getattr(time_col.dt, attr)().cast(pl.Int32) for attr in attrs}
+        if encoding == "integer" and not as_dummies:
+            X_new = X.with_columns(
+                [value.alias(attr) for attr, value in values.items()]
+            )
+            categorical_cols = [attr for attr in attrs if attr != "year"]
+        elif encoding == "cyclical" and not as_dummies:
+            X_new = X.with_columns(
+                [
+                    expr
+                    for attr, value in values.items()
+                    for expr in (
+                        _cyclical(attr, value)
+                        if attr in CALENDAR_CATEGORIES
+                        else [value.alias(attr)]
+                    )
+                ]
+            )
+            categorical_cols = []
+        else:
+            X_new = X.with_columns(
+                [
+                    value.alias(attr).cast(pl.Utf8).cast(pl.Categorical)
+                    for attr, value in values.items()
+                ]
+            )
+            # Categorical dtypes speak for themselves: native xgboost categoricals are opt-in
+            categorical_cols = []
+        return X_new, categorical_cols
+
+    def _encode(X: pl.LazyFrame, vocabulary: Mapping[str, List[str]]) -> pl.LazyFrame:
+        return X.select(
+            pl.all().exclude(attrs),
+            *[
+                expr
                 for attr in attrs
-            ]
+                for expr in _dummy_exprs(attr, vocabulary[attr], separator="_")
+            ],
         )
+
+    def transform(X: pl.LazyFrame) -> pl.LazyFrame:
+        X_new, categorical_cols = _effects(X)
+        vocabulary = None
         if as_dummies:
-            X_new = X_new.collect(streaming=True).to_dummies(columns=attrs).lazy()
-        artifacts = {"X_new": X_new}
+            vocabulary = {
+                attr: [str(x) for x in CALENDAR_CATEGORIES[attr]]
+                for attr in attrs
+                if attr in CALENDAR_CATEGORIES
+            }
+            # Years are learnt once at fit: unseen years are encoded as all zeros
+            vocabulary.update(
+                _fit_vocabulary(X_new, [a for a in attrs if a not in vocabulary])
+            )
+            X_new = _encode(X_new, vocabulary)
+            categorical_cols = []
+        artifacts = {
+            "X_new": X_new,
+            "categorical_cols": categorical_cols,
+            "vocabulary": vocabulary,
+        }
         return artifacts
 
-    return transform
+    def invert(state: ModelState, X: pl.LazyFrame) -> pl.LazyFrame:
+        return NotImplemented
+
+    def transform_new(state: ModelState, X: pl.LazyFrame) -> pl.LazyFrame:
+        X_new, _ = _effects(X)
+        if as_dummies:
+            X_new = _encode(X_new, state.artifacts["vocabulary"])
+        return X_new
+
+    return transform, invert, transform_new
+
+
+def _holiday_calendar_path(country_code: str, start_year: int, end_year: int):
+    cache_dir = get_transform_cache().cache_dir
+    if cache_dir is None:
+        return None
+    name = f"holidays_{holidays.__version__}_{country_code}_{start_year}_{end_year}"
+    return os.path.join(cache_dir, f"{name}.arrow")
+
+
+@lru_cache(maxsize=128)
+def holiday_calendar(country_code: str, start_year: int, end_year: int) -> pl.DataFrame:
+    """Return holidays of a country between two years (inclusive) as a DataFrame.
+
+    Calendars are cached in memory per (country, years) and, if the transform cache has a
+    `cache_dir` (see `functime.base.cache.set_transform_cache`), persisted to disk as Arrow IPC.
+
+    Parameters
+    ----------
+    country_code : str
+        ISO-2 country code.
+    start_year : int
+        First year of the calendar.
+    end_year : int
+        Last year of the calendar.
+
+    Returns
+    -------
+    calendar : pl.DataFrame
+        DataFrame with columns `date` (sorted) and `holiday` (normalized lowercase label).
+    """
+    path = _holiday_calendar_path(country_code, start_year, end_year)
+    if path is not None and os.path.exists(path):
+        return pl.read_ipc(path, memory_map=False)
+    country = country_holidays(country_code, years=range(start_year, end_year + 1))
+    calendar = (
+        pl.DataFrame(
+            {"date": list(country.keys()), "holiday": list(country.values())},
+            schema={"date": pl.Date, "holiday": pl.Utf8},
+        )
+        .with_columns(
+            pl.col("holiday")
+            .str.to_lowercase()
+            .str.replace_all("'", "")
+            .str.replace_all("-", "")
+            .str.replace_all(" ", "_")
+        )
+        .sort("date")
+    )
+    if path is not None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename: concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        try:
+            calendar.write_ipc(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return calendar
+
+
+def _year_range(X: pl.LazyFrame, time_col: str) -> Tuple[int, int]:
+    bounds = X.select(
+        [
+            pl.col(time_col).min().dt.year().alias("start"),
+            pl.col(time_col).max().dt.year().alias("end"),
+        ]
+    ).collect()
+    return bounds.get_column("start")[0], bounds.get_column("end")[0]
 
 
 @transformer
 def add_holiday_effects(country_codes: List[str], as_dummies: bool = False):
     """Extract holiday effects from time column for specified ISO-2 country codes and frequency.
 
+    Holiday labels are joined on the date of the time column from precomputed holiday calendars
+    (see `holiday_calendar`).
+
     Parameters
     ----------
     country_codes : List[str]
         A list of ISO-2 country codes.
     as_dummies : bool
-        Returns calendar effects as columns of one-hot-encoded dummies.
+        Returns calendar effects as columns of one-hot-encoded dummies. Dummies cover every
+        holiday in the calendars of the years seen at fit; holidays unseen at fit are
+        encoded as all zeros by `transform_new`.
     """
 
+    holiday_cols = [f"holiday__{code}" for code in country_codes]
+
+    def _effects(X: pl.LazyFrame, start_year: int, end_year: int) -> pl.LazyFrame:
+        time_col = X.columns[1]
+        X_new = X.with_columns(pl.col(time_col).cast(pl.Date).alias("__date"))
+        for code, col in zip(country_codes, holiday_cols):
+            calendar = holiday_calendar(code, start_year, end_year).lazy()
+            X_new = X_new.join(
+                calendar.select(
+                    [
+                        pl.col("date").alias("__date"),
+                        pl.col("holiday").cast(pl.Categorical).alias(col),
+                    ]
+                ),
+                how="left",
+                on="__date",
+            )
+        return X_new.drop("__date")
+
+    def _encode(X: pl.LazyFrame, vocabulary: Mapping[str, List[str]]) -> pl.LazyFrame:
+        return X.select(
+            pl.all().exclude(holiday_cols),
+            *[
+                expr
+                for col in holiday_cols
+                for expr in _dummy_exprs(col, vocabulary[col], separator="_")
+            ],
+        )
+
     def transform(X: pl.LazyFrame) -> pl.LazyFrame:
+        start_year, end_year = _year_range(X, X.columns[1])
+        X_new = _effects(X, start_year, end_year)
+        vocabulary = None
+        if as_dummies:
+            vocabulary = {
+                col: holiday_calendar(code, start_year, end_year)
+                .get_column("holiday")
+                .unique()
+                .sort()
+                .to_list()
+                for code, col in zip(country_codes, holiday_cols)
+            }
+            X_new = _encode(X_new, vocabulary)
+        artifacts = {"X_new": X_new, "vocabulary": vocabulary}
+        return artifacts
+
+    def invert(state: ModelState, X: pl.LazyFrame) -> pl.LazyFrame:
+        return NotImplemented
+
+    def transform_new(state: ModelState, X: pl.LazyFrame) -> pl.LazyFrame:
+        X_new = _effects(X, *_year_range(X, X.columns[1]))
+        if as_dummies:
+            X_new = _encode(X_new, state.artifacts["vocabulary"])
+        return X_new
+
+    return transform, invert, transform_new
 
-        # Get min and max timestamps
+
+@transformer
+def add_holiday_distances(country_codes: List[str]):
+    """Add number of days to the next holiday and since the last holiday for specified ISO-2 country codes.
+
+    Distances are computed with sorted (as-of) joins of the unique dates in the time column
+    against precomputed holiday calendars (see `holiday_calendar`). Returns columns
+    `holiday__{code}__days_to_next` and `holiday__{code}__days_since_last` (0 on holidays).
+
+    Parameters
+    ----------
+    country_codes : List[str]
+        A list of ISO-2 country codes.
+    """
+
+    def transform(X: pl.LazyFrame) -> pl.LazyFrame:
         time_col = X.columns[1]
-        timestamps = (
-            X.select(time_col)
-            .collect(streaming=True)
-            .get_column(time_col)
-            .unique()
-            .to_list()
+        start_year, end_year = _year_range(X, time_col)
+        dates = (
+            X.select(pl.col(time_col).cast(pl.Date).unique().alias("__date"))
+            .sort("__date")
+            .collect()
         )
-        min_ts, max_ts = min(timestamps), max(timestamps)
-        # Instantiate countries mapping
-        years = range(min_ts.year, max_ts.year + 1)
-        countries = [country_holidays(code, years=years) for code in country_codes]
-        # Add holiday effects and cast as categorical
-        holidays = []
-        for i, country in enumerate(countries):
-            labels = pl.Series(
-                values=[country.get(t) for t in timestamps],
-                name=f"holiday__{country_codes[i]}",
-            ).to_frame()
-            holidays.append(labels)
-        # Concat
-        holidays = (
-            pl.concat(holidays, how="horizontal")
-            .select(
-                pl.all()
-                .str.to_lowercase()
-                .str.replace_all("'", "")
-                .str.replace_all("-", "")
-                .str.replace_all(" ", "_")
-                .cast(pl.Categorical)
+        for code in country_codes:
+            # Pad calendar by one year to find holidays before / after the time range
+            calendar = holiday_calendar(code, start_year - 1, end_year + 1).select(
+                [pl.col("date").alias("__date"), pl.col("date").alias("__holiday")]
             )
-            .with_columns(
-                pl.Series(values=timestamps, name=time_col).cast(X.schema[time_col])
+            next_holiday, last_holiday = [
+                dates.join_asof(calendar, on="__date", strategy=strategy).get_column(
+                    "__holiday"
+                )
+                for strategy in ["forward", "backward"]
+            ]
+            dates = dates.with_columns(
+                [
+                    (next_holiday - pl.col("__date"))
+                    .dt.days()
+                    .cast(pl.Int32)
+                    .alias(f"holiday__{code}__days_to_next"),
+                    (pl.col("__date") - last_holiday)
+                    .dt.days()
+                    .cast(pl.Int32)
+                    .alias(f"holiday__{code}__days_since_last"),
+                ]
             )
-            .lazy()
+        X_new = (
+            X.with_columns(pl.col(time_col).cast(pl.Date).alias("__date"))
+            .join(dates.lazy(), how="left", on="__date")
+            .drop("__date")
         )
-        X_new = X.join(holidays, how="left", on=time_col)
-        if as_dummies:
-            X_new = (
-                X_new.collect(streaming=True)
-                .to_dummies(columns=holidays.columns[1:])
-                .lazy()
-            )
         artifacts = {"X_new": X_new}
         return artifacts
 
@@ -123,15 +358,10 @@ def make_future_calendar_effects(
     freq: Optional[str] = None,
 ):
     entity_col, time_col = idx.columns[:2]
-    cutoffs = idx.groupby(entity_col).agg(pl.col(time_col).max().alias("low"))
-    future_idx = make_future_ranges(
-        time_col=time_col,
-        cutoffs=cutoffs,
-        fh=fh,
-        freq=freq,
-    ).explode(time_col)
-    transf = add_calendar_effects(attrs)
-    return transf(future_idx)
+    cutoffs = idx.groupby(entity_col).agg(pl.col(time_col).max())
+    return make_future_features(
+        cutoffs, fh=fh, freq=freq, spec=[add_calendar_effects(attrs)]
+    )
 
 
 def make_future_holiday_effects(
@@ -141,12 +371,7 @@ def make_future_holiday_effects(
     freq: Optional[str] = None,
 ):
     entity_col, time_col = idx.columns[:2]
-    cutoffs = idx.groupby(entity_col).agg(pl.col(time_col).max().alias("low"))
-    future_idx = make_future_ranges(
-        time_col=time_col,
-        cutoffs=cutoffs,
-        fh=fh,
-        freq=freq,
-    ).explode(time_col)
-    transf = add_holiday_effects(country_codes)
-    return transf(future_idx)
+    cutoffs = idx.groupby(entity_col).agg(pl.col(time_col).max())
+    return make_future_features(
+        cutoffs, fh=fh, freq=freq, spec=[add_holiday_effects(country_codes)]
+    )
@@ -1,11 +1,71 @@
+from typing import List, Optional, Union
+
 import numpy as np
 import polars as pl
 
 from functime.base import transformer
+from functime.feature_extraction.future import make_future_features
+from functime.offsets import _strip_freq_alias
+
+# Number of seconds per offset alias
+_OFFSET_SECONDS = {"s": 1, "m": 60, "h": 3_600, "d": 86_400, "w": 604_800}
+# Offset aliases shorter than a second, counted in their own unit since the epoch
+_SUBSECOND_ALIASES = {"ms", "us", "ns"}
+
+
+def _is_temporal(dtype: pl.DataType) -> bool:
+    return dtype == pl.Date or dtype == pl.Datetime
+
+
+def _floor_div(x: pl.Expr, n: int) -> pl.Expr:
+    # Exact floor division of Int64 epochs: `//` goes through Float64, which rounds
+    # values beyond 2**53 (e.g. nanoseconds). Splits `x` on a multiple of `n` so that
+    # every division is of an exact multiple with a quotient below 2**53.
+    d = n * 10**9
+
+    def _mod(x: pl.Expr, n: int) -> pl.Expr:
+        # `%` keeps the sign of `x`
+        return (x % n + n) % n
+
+    high = ((x - _mod(x, d)) / d).cast(pl.Int64) * 10**9
+    low = ((_mod(x, d) - _mod(x, n)) / n).cast(pl.Int64)
+    return high + low
+
+
+def _period_index(time_col: str, dtype: pl.DataType, freq: Optional[str]) -> pl.Expr:
+    """Absolute period index of each timestamp given the offset alias `freq`.
+
+    The index does not depend on where a time-series starts, so the Fourier terms of
+    future timestamps line up with the terms of the history.
+    """
+    time = pl.col(time_col)
+    if not _is_temporal(dtype):
+        # Integer time index
+        offset_n = _strip_freq_alias(freq)[0] if freq else 1
+        return time // offset_n
+    offset_n, offset_alias = _strip_freq_alias(freq)
+    if offset_alias == "i":
+        raise ValueError(
+            f"Integer offset alias {freq!r} given for the {dtype} column {time_col!r}"
+        )
+    if offset_alias == "mo":
+        return (time.dt.year() * 12 + time.dt.month() - 1) // offset_n
+    if offset_alias == "q":
+        return (time.dt.year() * 4 + time.dt.quarter() - 1) // offset_n
+    if offset_alias == "y":
+        return time.dt.year() // offset_n
+    if offset_alias in _SUBSECOND_ALIASES:
+        return _floor_div(time.dt.epoch(offset_alias), offset_n)
+    seconds = time.cast(pl.Datetime("ms")).dt.epoch("s")
+    return seconds // (offset_n * _OFFSET_SECONDS[offset_alias])
 
 
 @transformer
-def add_fourier_terms(sp: int, K: int):
+def add_fourier_terms(
+    sp: Union[float, List[float]],
+    K: Union[int, List[int]],
+    freq: Optional[str] = None,
+):
     """Fourier features for time series seasonality.
 
     Fourier Series terms can be used as explanatory variables for the cases of multiple
@@ -13,34 +73,66 @@ def add_fourier_terms(sp: int, K: int):
 
     The implementation is based on the Fourier function from the R [forecast package](https://pkg.robjhyndman.com/forecast/reference/fourier.html).
 
+    The phase of each term is computed from the time column itself (the integer index or
+    the date / datetime given `freq`), so terms are consistent across frames: e.g. terms
+    of future timestamps continue the terms of the history (see `make_future_fourier_terms`).
+    Terms `cos_{sp}_{k}` and `sin_{sp}_{k}` are added to the existing columns.
+
     Parameters
     ----------
-    sp: int
-        Seasonal period.
-    K : int
-        Maximum order(s) of Fourier terms.
+    sp: Union[float, List[float]]
+        Seasonal period(s), e.g. `[24, 168, 8766]` for daily, weekly and yearly seasonality of hourly data.
+    K : Union[int, List[int]]
+        Maximum order(s) of Fourier terms for each seasonal period.
         Must be less than `sp`.
+    freq : Optional[str]
+        Offset alias of the time column (e.g. "1h", "1d", "1mo"): an integer followed by
+        one of "ns", "us", "ms", "s", "m", "h", "d", "w", "mo", "q", "y", or "i"
+        (integer time columns only).
+        Required for date / datetime time columns to compute absolute phases.
+        If None, phases restart at zero for each entity in the frame (legacy behaviour).
     """
 
-    if K > sp:
+    sps = sp if isinstance(sp, (list, tuple)) else [sp]
+    Ks = K if isinstance(K, (list, tuple)) else [K] * len(sps)
+    if len(sps) != len(Ks):
+        raise ValueError("`sp` and `K` must have the same length")
+    if any(k > p for p, k in zip(sps, Ks)):
         raise ValueError("`K` must be less than `sp`")
 
     def transform(X: pl.LazyFrame) -> pl.LazyFrame:
         entity_col, time_col = X.columns[:2]
-        cos_terms = [
-            np.cos(2 * np.pi * k * pl.col("fourier_coef")).alias(f"cos_{sp}_{k}")
-            for k in range(1, K + 1)
-        ]
-        sin_terms = [
-            np.sin(2 * np.pi * k * pl.col("fourier_coef")).alias(f"sin_{sp}_{k}")
-            for k in range(1, K + 1)
-        ]
-        X_new = X.with_columns(
-            (pl.col(time_col).arg_sort().mod(sp).over(entity_col) / sp).alias(
-                "fourier_coef"
-            )
-        ).select([entity_col, time_col, *cos_terms, *sin_terms])
+        dtype = X.schema[time_col]
+        if freq is None and _is_temporal(dtype):
+            index = pl.col(time_col).arg_sort().over(entity_col)
+        else:
+            index = _period_index(time_col, dtype, freq)
+        terms = []
+        for p, k_max in zip(sps, Ks):
+            phase = 2 * np.pi * (index % p) / p
+            terms += [
+                np.cos(k * phase).alias(f"cos_{p}_{k}") for k in range(1, k_max + 1)
+            ]
+            terms += [
+                np.sin(k * phase).alias(f"sin_{p}_{k}") for k in range(1, k_max + 1)
+            ]
+        X_new = X.with_columns(terms)
         artifacts = {"X_new": X_new}
         return artifacts
 
     return transform
+
+
+def make_future_fourier_terms(
+    idx: pl.DataFrame,
+    sp: Union[float, List[float]],
+    K: Union[int, List[int]],
+    fh: int,
+    freq: str,
+):
+    """Return Fourier terms over the `fh` periods after the last timestamp of each entity in `idx`."""
+    entity_col, time_col = idx.columns[:2]
+    cutoffs = idx.groupby(entity_col).agg(pl.col(time_col).max())
+    return make_future_features(
+        cutoffs, fh=fh, freq=freq, spec=[add_fourier_terms(sp=sp, K=K, freq=freq)]
+    )
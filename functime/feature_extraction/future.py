@@ -0,0 +1,49 @@
+from typing import List, Optional
+
+import polars as pl
+
+from functime.base import Transformer
+from functime.ranges import make_future_ranges
+
+
+def make_future_features(
+    cutoffs: pl.DataFrame,
+    fh: int,
+    freq: Optional[str],
+    spec: List[Transformer],
+) -> pl.LazyFrame:
+    """Return deterministic features (e.g. calendar, holiday, Fourier terms) over the forecast horizon.
+
+    The future (entity, time) index is built once from `cutoffs`, then every transformer in `spec`
+    is applied to it in a single lazy query plan. The result is aligned with the future ranges
+    of `Forecaster.predict` and can be passed as `X` to `predict`.
+
+    Parameters
+    ----------
+    cutoffs : pl.DataFrame
+        DataFrame with columns (entity, time) containing the last timestamp of each entity,
+        e.g. `y.groupby(entity_col).agg(pl.col(time_col).max())`.
+    fh : int
+        Number of periods to forecast (i.e. forecast horizon).
+    freq : Optional[str]
+        Offset alias supported by Polars.
+    spec : List[Transformer]
+        Stateless feature transformers to apply to the future index in order,
+        e.g. `[add_calendar_effects(["month"]), add_fourier_terms(sp=12, K=3, freq="1mo")]`.
+
+    Returns
+    -------
+    X_future : pl.LazyFrame
+        Panel LazyFrame with columns (entity, time, *features).
+    """
+    entity_col, time_col = cutoffs.columns[:2]
+    future_idx = make_future_ranges(
+        time_col=time_col,
+        cutoffs=cutoffs.select([entity_col, pl.col(time_col).alias("low")]),
+        fh=fh,
+        freq=freq,
+    ).explode(time_col)
+    X_future = future_idx.lazy()
+    for transf in spec:
+        X_future = X_future.pipe(transf)
+    return X_future
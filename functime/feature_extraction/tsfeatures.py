@@ -0,0 +1,245 @@
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import polars as pl
+
+# Features computed from Polars expressions in a single groupby
+_EXPR_FEATURES = [
+    "length",
+    "mean",
+    "var",
+    "x_acf1",
+    "x_acf10",
+    "diff1_acf1",
+    "diff1_acf10",
+    "seas_acf1",
+    "crossing_points",
+    "flat_spots",
+    "lumpiness",
+    "stability",
+    "trend_strength",
+    "seasonal_strength",
+    "adi",
+    "cv2",
+]
+
+# Features computed with batched NumPy over series of the same length
+_ARRAY_FEATURES = ["entropy"]
+
+TSFEATURES = _EXPR_FEATURES + _ARRAY_FEATURES
+
+
+def _lag(expr: pl.Expr, k: int, entity_col: str) -> pl.Expr:
+    # Shift over the whole panel (sorted by entity and time) and mask values from other entities.
+    # Cheaper than `shift(k).over(entity_col)` or shifts within a groupby.
+    return pl.when(pl.col(entity_col).shift(k) == pl.col(entity_col)).then(
+        expr.shift(k)
+    )
+
+
+def _acf(name: str, lags: List[int]) -> Dict[int, pl.Expr]:
+    # Autocorrelations from the precomputed lagged cross-products of the demeaned series
+    denom = (pl.col(name) ** 2).sum()
+    return {k: pl.col(f"{name}_{k}").sum() / denom for k in lags}
+
+
+def _sum_of_squares(exprs: List[pl.Expr]) -> pl.Expr:
+    return pl.sum_horizontal([expr**2 for expr in exprs])
+
+
+def _flat_spots(x: pl.Expr, n_bins: int = 10) -> pl.Expr:
+    # Longest run of observations within the same of `n_bins` equal-width intervals
+    bins = ((x - x.min()) / (x.max() - x.min()) * n_bins).floor().clip(0, n_bins - 1)
+    return bins.rle().struct.field("lengths").max()
+
+
+def _feature_exprs(x: pl.Expr, sp: int) -> Dict[str, pl.Expr]:
+    acf = _acf("__x", lags=list(range(1, 11)))
+    diff_acf = _acf("__diff", lags=list(range(1, 11)))
+    trend = pl.col("__trend")
+    seasonal = pl.col("__seasonal")
+    remainder = x - trend - seasonal
+    is_tile = pl.col("__is_tile")
+    nonzero = x.filter(x != 0)
+    return {
+        "length": x.count(),
+        "mean": x.mean(),
+        "var": x.var(),
+        "x_acf1": acf[1],
+        "x_acf10": _sum_of_squares(list(acf.values())),
+        "diff1_acf1": diff_acf[1],
+        "diff1_acf10": _sum_of_squares(list(diff_acf.values())),
+        "seas_acf1": _acf("__x", lags=[sp])[sp] if sp > 1 else pl.lit(None),
+        "crossing_points": pl.col("__is_crossing").sum(),
+        "flat_spots": _flat_spots(x),
+        "lumpiness": pl.col("__tile_var").filter(is_tile).var(),
+        "stability": pl.col("__tile_mean").filter(is_tile).var(),
+        "trend_strength": (1 - remainder.var() / (x - seasonal).var()).clip_min(0),
+        "seasonal_strength": (
+            (1 - remainder.var() / (x - trend).var()).clip_min(0)
+            if sp > 1
+            else pl.lit(None)
+        ),
+        "adi": x.count() / nonzero.count(),
+        "cv2": (nonzero.std() / nonzero.mean()) ** 2,
+    }
+
+
+def _prepare(y: pl.LazyFrame, features: List[str], sp: int, width: int) -> pl.LazyFrame:
+    """Add the intermediate columns required by `features` in vectorized passes over the panel."""
+    entity_col, time_col, target_col = y.columns
+    x = pl.col(target_col)
+    needs = set(features)
+    acf_lags = {
+        "__x": [k for k in range(1, 11) if needs & {"x_acf1", "x_acf10"}]
+        + ([sp] if sp > 1 and "seas_acf1" in needs else []),
+        "__diff": [k for k in range(1, 11) if needs & {"diff1_acf1", "diff1_acf10"}],
+    }
+    y = y.with_columns(
+        pl.col(time_col).cumcount().over(entity_col).alias("__t"),
+        (x - x.mean().over(entity_col)).alias("__x"),
+        (x - _lag(x, 1, entity_col)).alias("__diff"),
+    ).with_columns(
+        (pl.col("__diff") - pl.col("__diff").mean().over(entity_col)).alias("__diff")
+    )
+    lagged = [
+        (pl.col(name) * _lag(pl.col(name), k, entity_col)).alias(f"{name}_{k}")
+        for name, lags in acf_lags.items()
+        for k in set(lags)
+    ]
+    if "crossing_points" in needs:
+        is_below = x <= x.median().over(entity_col)
+        lagged.append(
+            (is_below != _lag(is_below, 1, entity_col)).alias("__is_crossing")
+        )
+    if lagged:
+        y = y.with_columns(lagged)
+    if needs & {"trend_strength", "seasonal_strength"}:
+        # Odd window so that the moving average is centered
+        window = width + 1 - width % 2
+        y = y.with_columns(
+            x.rolling_mean(window, center=True, min_periods=1)
+            .over(entity_col)
+            .alias("__trend"),
+            (pl.col("__t") % sp).alias("__phase"),
+        ).with_columns(
+            (x - pl.col("__trend"))
+            .mean()
+            .over([entity_col, "__phase"])
+            .alias("__seasonal")
+            if sp > 1
+            else pl.lit(0.0).alias("__seasonal")
+        )
+    if needs & {"lumpiness", "stability"}:
+        # Statistics over non-overlapping windows of `width` observations,
+        # kept once per complete window
+        tile = [entity_col, "__tile"]
+        y = y.with_columns((pl.col("__t") // width).alias("__tile")).with_columns(
+            x.mean().over(tile).alias("__tile_mean"),
+            x.var().over(tile).alias("__tile_var"),
+            (
+                (pl.col("__t") % width == 0)
+                & (pl.col("__tile") < pl.count().over(entity_col) // width)
+            ).alias("__is_tile"),
+        )
+    return y
+
+
+def _spectral_entropy(values: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Normalized Shannon entropy of the periodogram of each series.
+
+    Series are stacked into one 2D array per distinct length and transformed together.
+    """
+    lengths = lengths.astype(np.int64)
+    offsets = np.cumsum(lengths) - lengths
+    entropy = np.full(len(lengths), np.nan)
+    for length in np.unique(lengths):
+        if length < 4:
+            continue
+        rows = np.flatnonzero(lengths == length)
+        arr = values[offsets[rows, None] + np.arange(length)]
+        arr = arr - arr.mean(axis=1, keepdims=True)
+        # Drop the zero frequency
+        psd = np.abs(np.fft.rfft(arr, axis=1)[:, 1:]) ** 2
+        total = psd.sum(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p = psd / total
+            h = -np.where(p > 0, p * np.log(p), 0.0).sum(axis=1)
+        entropy[rows] = h / np.log(psd.shape[1])
+    return entropy
+
+
+def tsfeatures(
+    y: Union[pl.DataFrame, pl.LazyFrame],
+    sp: int = 1,
+    features: Optional[List[str]] = None,
+    width: Optional[int] = None,
+) -> pl.DataFrame:
+    """Return descriptive features of each time-series in a panel.
+
+    Features follow the definitions of the R [tsfeatures package](https://pkg.robjhyndman.com/tsfeatures/).
+    All features except "entropy" are Polars expressions evaluated in a single groupby over the panel;
+    "entropy" is computed with batched NumPy FFTs over series of the same length.
+
+    Parameters
+    ----------
+    y : Union[pl.DataFrame, pl.LazyFrame]
+        Panel DataFrame with columns (entity, time, target).
+    sp : int
+        Seasonal period. Seasonal features ("seas_acf1", "seasonal_strength") are null if `sp` is 1.
+        Defaults to 1.
+    features : Optional[List[str]]
+        Subset of features to compute:\n
+        - "length": number of observations
+        - "mean", "var": mean and variance
+        - "x_acf1", "x_acf10": first autocorrelation and sum of squares of the first ten autocorrelations
+        - "diff1_acf1", "diff1_acf10": same as above for the differenced series
+        - "seas_acf1": autocorrelation at lag `sp`
+        - "crossing_points": number of times the series crosses its median
+        - "flat_spots": longest run of observations within the same decile interval of the series range
+        - "lumpiness", "stability": variance of the variances and of the means over non-overlapping windows
+        - "trend_strength", "seasonal_strength": strength of trend and seasonality in [0, 1] from a classical
+        decomposition (centered moving average trend, mean seasonal profile by phase of `sp`)
+        - "adi", "cv2": average demand interval and squared coefficient of variation of non-zero demand
+        - "entropy": normalized spectral entropy in [0, 1] (white noise is close to 1)
+
+        Defaults to None (all features).
+    width : Optional[int]
+        Window width for "lumpiness" and "stability", and of the moving average trend.
+        Defaults to `sp` if `sp` > 1 else 10.
+
+    Returns
+    -------
+    features : pl.DataFrame
+        DataFrame with the entity column and one column per feature.
+    """
+    features = features or TSFEATURES
+    unknown = set(features) - set(TSFEATURES)
+    if unknown:
+        raise ValueError(f"Unknown features: {sorted(unknown)}")
+    entity_col, time_col, target_col = y.columns[:3]
+    width = width or (sp if sp > 1 else 10)
+    x = pl.col(target_col).cast(pl.Float64)
+
+    y_new = (
+        y.lazy()
+        .select([entity_col, time_col, x])
+        .sort([entity_col, time_col])
+        .pipe(_prepare, features=features, sp=sp, width=width)
+    )
+    exprs = _feature_exprs(x, sp=sp)
+    aggs = [exprs[name].alias(name) for name in features if name in exprs]
+    if "entropy" in features:
+        aggs.append(x.alias("__values"))
+    result = (
+        y_new.groupby(entity_col, maintain_order=True).agg(aggs).collect(streaming=True)
+    )
+
+    if "entropy" in features:
+        values = result.get_column("__values")
+        entropy = _spectral_entropy(
+            values=values.explode().to_numpy(),
+            lengths=values.list.lengths().to_numpy(),
+        )
+        result = result.drop("__values").with_columns(pl.Series("entropy", entropy))
+    return result.select([entity_col, *features])
@@ -1,11 +1,15 @@
 import logging
-from typing import Any, Callable, List, Mapping, Optional, Union
+import tempfile
+import time
+from typing import Any, Callable, List, Mapping, Optional, Tuple, Union
 
 import numpy as np
 import polars as pl
+from joblib import Parallel, delayed, effective_n_jobs
 from tqdm import tqdm, trange
 from typing_extensions import Literal
 
+from functime.base._ipc import _read_splits, _write_splits
 from functime.cross_validation import expanding_window_split
 from functime.forecasting._evaluate import evaluate
 from functime.forecasting._reduction import (
@@ -19,12 +23,32 @@ try:
 except ImportError:
     pass
 
+logger = logging.getLogger(__name__)
+
+
+def _predict_in_sample(regressor, X: pl.DataFrame) -> np.ndarray:
+    y_pred = regressor.predict(X)
+    # Check if censored model
+    if isinstance(y_pred, tuple):
+        y_pred, _ = y_pred  # forecast, probabilities
+    return y_pred
+
+
+def _residuals(y: pl.DataFrame, y_pred: np.ndarray) -> pl.DataFrame:
+    entity_col, time_col, target_col = y.columns
+    return y.select(
+        entity_col,
+        time_col,
+        (pl.col(target_col) - pl.Series(y_pred)).alias("y_resid"),
+    )
+
 
 def fit_recursive(
     regress: Callable[[pl.LazyFrame, pl.LazyFrame], Any],
     lags: int,
     y: pl.LazyFrame,
     X: Optional[pl.LazyFrame] = None,
+    residualize: bool = False,
 ) -> Mapping[str, Any]:
     # 1. Impose AR structure
     target_col = y.columns[-1]
@@ -43,6 +67,10 @@ def fit_recursive(
         "regressor": fitted_regressor,
         "y_lag": y_lag.collect(streaming=True),
     }
+    if residualize:
+        # In-sample residuals from the lag matrix used to fit
+        y_pred = _predict_in_sample(fitted_regressor, X_final)
+        artifacts["y_resid"] = _residuals(y_final, y_pred)
     return artifacts
 
 
@@ -52,6 +80,7 @@ def fit_direct(
     max_horizons: int,
     y: pl.LazyFrame,
     X: Optional[pl.LazyFrame] = None,
+    residualize: bool = False,
 ) -> Mapping[str, Any]:
     idx_cols = y.columns[:2]
     target_col = y.columns[-1]
@@ -60,19 +89,25 @@ def fit_direct(
     X_y_final = make_direct_reduction(lags=lags, max_horizons=max_horizons, y=y, X=X)
     # 2. Fit
     fitted_regressors = []
+    y_preds = []
+    y_final = X_y_final.select([*idx_cols, target_col])
     for i in trange(1, max_horizons + 1, desc="Fitting direct forecasters:"):
         selected_lags = range(i, lags + i)
         lag_cols = [f"{target_col}__lag_{j}" for j in selected_lags]
         X_final = X_y_final.select([*idx_cols, *lag_cols, *feature_cols])
-        y_final = X_y_final.select([*idx_cols, target_col])
         fitted_regressor = regress(X=X_final, y=y_final)
         fitted_regressors.append(fitted_regressor)
+        if residualize:
+            y_preds.append(_predict_in_sample(fitted_regressor, X_final))
     # 3. Collect artifacts
     y_lag = make_y_lag(X_y_final, target_col=y.columns[-1], lags=lags + max_horizons)
     artifacts = {
         "regressors": fitted_regressors,
         "y_lag": y_lag.collect(streaming=True),
     }
+    if residualize:
+        # NOTE: we just naively take the mean across all direct predictions
+        artifacts["y_resid"] = _residuals(y_final, np.mean(y_preds, axis=0))
     return artifacts
 
 
@@ -83,7 +118,13 @@ def fit_autoreg(
     X: Optional[Union[pl.DataFrame, pl.LazyFrame]] = None,
     max_horizons: Optional[int] = None,
     strategy: Optional[Literal["direct", "recursive", "naive"]] = None,
+    residualize: bool = False,
 ) -> Mapping[str, Any]:
+    """Fit autoregressive forecaster(s) with the `regress` function.
+
+    If `residualize`, the in-sample residuals of the fitted regressor(s) are kept as
+    artifact `y_resid` (entity, time, y_resid), predicted from the same lag matrix used to fit.
+    """
     y = y.lazy()
     X = X.lazy() if X is not None else X
     strategy = strategy or "recursive"
@@ -93,23 +134,135 @@ def fit_autoreg(
             " in the forecaster's kwargs upon initialization."
         )
     if strategy == "recursive":
-        artifacts = fit_recursive(regress=regress, lags=lags, y=y, X=X)
+        artifacts = fit_recursive(
+            regress=regress, lags=lags, y=y, X=X, residualize=residualize
+        )
     elif strategy == "direct":
         artifacts = fit_direct(
-            regress=regress, lags=lags, max_horizons=max_horizons, y=y, X=X
+            regress=regress,
+            lags=lags,
+            max_horizons=max_horizons,
+            y=y,
+            X=X,
+            residualize=residualize,
         )
     elif strategy == "ensemble":
         artifacts = {
-            "recursive": fit_recursive(regress=regress, lags=lags, y=y, X=X),
+            "recursive": fit_recursive(
+                regress=regress, lags=lags, y=y, X=X, residualize=residualize
+            ),
             "direct": fit_direct(
-                regress=regress, lags=lags, max_horizons=max_horizons, y=y, X=X
+                regress=regress,
+                lags=lags,
+                max_horizons=max_horizons,
+                y=y,
+                X=X,
+                residualize=residualize,
             ),
         }
+        if residualize:
+            # Residuals of the mean of recursive and direct forecasts
+            idx_cols = y.columns[:2]
+            artifacts["y_resid"] = (
+                artifacts["recursive"]
+                .pop("y_resid")
+                .join(
+                    artifacts["direct"].pop("y_resid"),
+                    on=idx_cols,
+                    how="inner",
+                    suffix="__direct",
+                )
+                .with_columns((pl.col("y_resid") + pl.col("y_resid__direct")) / 2)
+                .drop("y_resid__direct")
+            )
     else:
         raise ValueError(f"Cannot recognize `strategy` '{strategy}'")
     return artifacts
 
 
+def roll_autoreg(
+    artifacts: Mapping[str, Any],
+    y: pl.LazyFrame,
+    lags: int,
+    max_horizons: Optional[int] = None,
+    strategy: Optional[Literal["direct", "recursive", "ensemble"]] = None,
+) -> Mapping[str, Any]:
+    """Return `artifacts` of `fit_autoreg` with the lag state rolled to the end of `y`.
+
+    Fitted regressors are kept as is: only the most recent lagged values (`y_lag`) are
+    recomputed from `y`, which may hold other cutoffs or entities than the fitted data.
+    """
+    target_col = y.columns[-1]
+
+    def _roll_recursive(artifacts: Mapping[str, Any]) -> Mapping[str, Any]:
+        X_y = make_reduction(lags=lags, y=y)
+        y_lag = make_y_lag(X_y, target_col=target_col, lags=lags)
+        return {**artifacts, "y_lag": y_lag.collect()}
+
+    def _roll_direct(artifacts: Mapping[str, Any]) -> Mapping[str, Any]:
+        X_y = make_direct_reduction(lags=lags, max_horizons=max_horizons, y=y)
+        y_lag = make_y_lag(X_y, target_col=target_col, lags=lags + max_horizons)
+        return {**artifacts, "y_lag": y_lag.collect()}
+
+    strategy = strategy or "recursive"
+    # In-sample residuals belong to the fitted data
+    artifacts = {k: v for k, v in artifacts.items() if k != "y_resid"}
+    if strategy == "recursive":
+        artifacts = _roll_recursive(artifacts)
+    elif strategy == "direct":
+        artifacts = _roll_direct(artifacts)
+    elif strategy == "ensemble":
+        artifacts = {
+            **artifacts,
+            "recursive": _roll_recursive(artifacts["recursive"]),
+            "direct": _roll_direct(artifacts["direct"]),
+        }
+    else:
+        raise ValueError(f"Cannot recognize `strategy` '{strategy}'")
+    return artifacts
+
+
+def _evaluate_lags(
+    lags: int,
+    deadline: float,
+    lags_budget: float,
+    **kwargs,
+) -> Tuple[int, float, Optional[Mapping[str, Any]]]:
+    # Each lag gets its share of the global budget but never runs past the deadline.
+    # At least one trial always runs, even once the deadline has passed.
+    time_budget = max(min(lags_budget, deadline - time.time()), 1e-3)
+    score, params = evaluate(
+        lags=lags, time_budget=time_budget, include_best_params=True, **kwargs
+    )
+    return lags, score, params
+
+
+def _evaluate_lags_ipc(
+    lags: int,
+    deadline: float,
+    lags_budget: float,
+    paths: Mapping[int, Mapping[str, Optional[str]]],
+    **kwargs,
+) -> Tuple[int, float, Optional[Mapping[str, Any]]]:
+    # Runs in a worker process: splits are memory-mapped from Arrow IPC files
+    # written once by the parent and shared by every lag
+    splits = {i: _read_splits(split_paths) for i, split_paths in paths.items()}
+    y_splits = {i: (split["y_train"], split["y_test"]) for i, split in splits.items()}
+    X_splits = None
+    if paths[0]["X_train"] is not None:
+        X_splits = {
+            i: (split["X_train"], split["X_test"]) for i, split in splits.items()
+        }
+    return _evaluate_lags(
+        lags,
+        deadline=deadline,
+        lags_budget=lags_budget,
+        y_splits=y_splits,
+        X_splits=X_splits,
+        **kwargs,
+    )
+
+
 def fit_cv(  # noqa: Ruff too complex
     y: pl.LazyFrame,
     forecaster_cls,
@@ -130,11 +283,20 @@ def fit_cv(  # noqa: Ruff too complex
         Callable[[pl.LazyFrame, bool, bool], Union[pl.LazyFrame, pl.DataFrame]]
     ] = None,
     X: Optional[pl.LazyFrame] = None,
+    residualize: bool = False,
+    n_jobs: int = 1,
+    categorical_features: Optional[List[str]] = None,
     **kwargs,
 ) -> Mapping[str, Any]:
+    """Select lags and hyperparameters by cross-validation, then refit the best forecaster.
 
-    # TODO: Consolidate logging
-    logging.basicConfig(level=logging.INFO)
+    `time_budget` (in seconds) is enforced across the whole search: lags are evaluated by
+    `n_jobs` workers, and each lag gets an equal share of the budget of its worker.
+    If `n_jobs` is not 1, lags are evaluated in worker processes which memory-map the
+    cross-validation splits from Arrow IPC files written once. Workers left over once every
+    lag has one evaluate the splits of each trial concurrently in threads.
+    `categorical_features` are passed to the `fit` of every evaluated and refitted forecaster.
+    """
 
     # Set defaults
     strategy = strategy or "recursive"
@@ -149,37 +311,64 @@ def fit_cv(  # noqa: Ruff too complex
     best_lags = None
     best_score = np.inf
     best_params = None
-    scores_path = []
     lags_path = list(range(min_lags, max_lags + 1))
-    scores_path = []
-    for lags in (pbar := tqdm(lags_path, desc=f"Evaluating n={min(lags_path)} lags")):
-        score, params = evaluate(
-            **{
-                "lags": lags,
-                "n_splits": n_splits,
-                "time_budget": time_budget,
-                "points_to_evaluate": points_to_evaluate,
-                "num_samples": num_samples,
-                "low_cost_partial_config": low_cost_partial_config,
-                "search_space": search_space,
-                "test_size": test_size,
-                "max_horizons": max_horizons,
-                "strategy": strategy,
-                "freq": freq,
-                "forecaster_cls": forecaster_cls,
-                "y_splits": y_splits,
-                "X_splits": X_splits,
-                "include_best_params": True,
-            },
-        )
-        scores_path.append(score)
-        if score < best_score:
-            best_score = score
-            best_lags = lags
-            best_params = params
-        pbar.set_description(
-            f"[Best round: lags={best_lags}, score={best_score:.2f}] Evaluating models with n={lags + 1} lags"
-        )
+    n_workers = min(effective_n_jobs(n_jobs), len(lags_path))
+    # Global budget: lags are evaluated in rounds of `n_workers`
+    deadline = time.time() + time_budget
+    lags_budget = time_budget * n_workers / len(lags_path)
+    evaluate_kwargs = {
+        "deadline": deadline,
+        "lags_budget": lags_budget,
+        "n_splits": n_splits,
+        "points_to_evaluate": points_to_evaluate,
+        "num_samples": num_samples,
+        "low_cost_partial_config": low_cost_partial_config,
+        "search_space": search_space,
+        "test_size": test_size,
+        "max_horizons": max_horizons,
+        "strategy": strategy,
+        "freq": freq,
+        "forecaster_cls": forecaster_cls,
+        "n_jobs": max(effective_n_jobs(n_jobs) // n_workers, 1),
+        "categorical_features": categorical_features,
+    }
+    scores = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if n_workers == 1:
+            tasks = [
+                delayed(_evaluate_lags)(
+                    lags, y_splits=y_splits, X_splits=X_splits, **evaluate_kwargs
+                )
+                for lags in lags_path
+            ]
+        else:
+            paths = {
+                i: _write_splits(
+                    tmp_dir, i, y_splits[i], X_splits[i] if X is not None else None
+                )
+                for i in range(n_splits)
+            }
+            tasks = [
+                delayed(_evaluate_lags_ipc)(lags, paths=paths, **evaluate_kwargs)
+                for lags in lags_path
+            ]
+        results = Parallel(
+            n_jobs=n_workers, prefer="processes", return_as="generator_unordered"
+        )(tasks)
+        pbar = tqdm(results, total=len(lags_path), desc="Evaluating lags")
+        for lags, score, params in pbar:
+            scores[lags] = score
+            # Ties go to fewer lags, as in sequential evaluation
+            if score < best_score or (
+                score == best_score and best_lags is not None and lags < best_lags
+            ):
+                best_score = score
+                best_lags = lags
+                best_params = params
+            pbar.set_description(
+                f"[Best round: lags={best_lags}, score={best_score:.2f}] Evaluating lags"
+            )
+    scores_path = [scores[lags] for lags in lags_path]
 
     # Refit
     best_params = best_params or {}
@@ -191,9 +380,11 @@ def fit_cv(  # noqa: Ruff too complex
         **kwargs,
     }
     best_params["lags"] = best_lags
-    logging.info("✅ Found `best_params` %s", best_params)
+    logger.info("✅ Found `best_params` %s", best_params)
     best_forecaster = forecaster_cls(**best_params)
-    best_forecaster.fit(y=y, X=X)
+    best_forecaster.fit(
+        y=y, X=X, residualize=residualize, categorical_features=categorical_features
+    )
     # Prepare artifacts
     # TODO: Investigate ensembling across hyperparameter sets
     # Ref: https://arxiv.org/abs/2006.13570
@@ -3,6 +3,7 @@ from functools import partial
 from typing import Any, Callable, List, Mapping, Optional, Tuple, Union
 
 import polars as pl
+from joblib import Parallel, delayed
 
 from functime.metrics import mae
 
@@ -13,6 +14,8 @@ try:
 except ImportError:
     pass
 
+logger = logging.getLogger(__name__)
+
 
 def evaluate_window(
     config: Mapping[str, Any],
@@ -26,6 +29,7 @@ def evaluate_window(
     y_test: pl.DataFrame,
     X_train: Optional[pl.DataFrame] = None,
     X_test: Optional[pl.DataFrame] = None,
+    categorical_features: Optional[List[str]] = None,
 ) -> Union[float, pl.DataFrame]:
     # Train test split
     entity_col, time_col = y_train.columns[:2]
@@ -35,7 +39,7 @@ def evaluate_window(
         lags=lags, freq=freq, max_horizons=max_horizons, strategy=strategy, **config
     )
     try:
-        forecaster.fit(y=y_train, X=X_train)
+        forecaster.fit(y=y_train, X=X_train, categorical_features=categorical_features)
         y_pred = forecaster.predict(fh=test_size, X=X_test)
         # NOTE: Defensive match of entity, time indices
         # Need to do this for example if the train set is "1i", but the
@@ -50,7 +54,7 @@ def evaluate_window(
     except ValueError as exc:
         # AttributeError: 'NoneType' object has no attribute 'last_result'
         # Root cause: y_preds are inf hence mae = inf
-        logging.warning(
+        logger.warning(
             "%s fit-predict failed with lags %s and parameters %s",
             forecaster_cls.func,
             lags,
@@ -72,26 +76,31 @@ def evaluate_windows(
     forecaster_cls: Callable,
     y_splits: Mapping[int, Tuple[pl.DataFrame, pl.DataFrame]],
     X_splits: Optional[Mapping[int, Tuple[pl.DataFrame, pl.DataFrame]]],
+    n_jobs: int = 1,
+    categorical_features: Optional[List[str]] = None,
 ):
-    # Get average mae across splits
-    results = []
+    # Get average mae across splits (evaluated concurrently in threads if `n_jobs` is not 1)
+    tasks = []
     for i in range(n_splits):
         y_train, y_test = y_splits[i]
-        X_train, X_test = X_splits[i] if X_splits is not None else None, None
-        result = evaluate_window(
-            y_train=y_train,
-            y_test=y_test,
-            X_train=X_train,
-            X_test=X_test,
-            config=config,
-            lags=lags,
-            test_size=test_size,
-            max_horizons=max_horizons,
-            strategy=strategy,
-            freq=freq,
-            forecaster_cls=forecaster_cls,
+        X_train, X_test = X_splits[i] if X_splits is not None else (None, None)
+        tasks.append(
+            delayed(evaluate_window)(
+                y_train=y_train,
+                y_test=y_test,
+                X_train=X_train,
+                X_test=X_test,
+                config=config,
+                lags=lags,
+                test_size=test_size,
+                max_horizons=max_horizons,
+                strategy=strategy,
+                freq=freq,
+                forecaster_cls=forecaster_cls,
+                categorical_features=categorical_features,
+            )
         )
-        results.append(result)
+    results = Parallel(n_jobs=n_jobs, prefer="threads")(tasks)
     scores = [res["score"] for res in results]
     score = None
     if len(scores) > 0:
@@ -118,6 +127,8 @@ def evaluate(
     X_splits: Optional[Mapping[int, Tuple[pl.DataFrame, pl.DataFrame]]],
     search_space: Optional[Mapping[str, Domain]] = None,
     include_best_params: bool = False,
+    n_jobs: int = 1,
+    categorical_features: Optional[List[str]] = None,
 ):
     params = None
     if search_space is None:
@@ -132,6 +143,8 @@ def evaluate(
             forecaster_cls=forecaster_cls,
             y_splits=y_splits,
             X_splits=X_splits,
+            n_jobs=n_jobs,
+            categorical_features=categorical_features,
         )
         score = result["mae"]
     else:
@@ -147,6 +160,8 @@ def evaluate(
                 forecaster_cls=forecaster_cls,
                 y_splits=y_splits,
                 X_splits=X_splits,
+                n_jobs=n_jobs,
+                categorical_features=categorical_features,
             ),
             config=search_space,
             metric="mae",
@@ -1,6 +1,6 @@
 from abc import abstractmethod
 from functools import partial
-from typing import Any, Mapping, Optional, Union
+from typing import Any, List, Mapping, Optional, Union
 
 import polars as pl
 from flaml import tune
@@ -37,7 +37,7 @@ class AutoForecaster(Forecaster):
     n_splits : int
         Number of backtest splits.
     time_budget : int
-        Maximum time budgeted to train each forecaster per window and set of hyperparameters.
+        Maximum time in seconds budgeted to the whole search across lags and hyperparameters.
     search_space : Optional[dict]
         Equivalent to `config` in [FLAML](https://microsoft.github.io/FLAML/docs/Use-Cases/Tune-User-Defined-Function#search-space)
     points_to_evaluate : Optional[dict]
@@ -48,6 +48,10 @@ class AutoForecaster(Forecaster):
         functime transformer to apply to `y` before fit. The transform is inverted at predict time.
     feature_transform : Optional[Transformer]
         functime transformer to apply to `X` before fit and predict.
+    n_jobs : int
+        Number of lags evaluated concurrently in worker processes. If -1, use all CPUs.
+        Workers left over once every lag has one evaluate backtest splits concurrently.
+        Defaults to 1 (sequential).
     **kwargs : Mapping[str, Any]
         Additional keyword arguments passed into underlying sklearn-compatible regressor.
     """
@@ -68,6 +72,7 @@ class AutoForecaster(Forecaster):
         num_samples: int = -1,
         target_transform: Optional[Transformer] = None,
         feature_transform: Optional[Transformer] = None,
+        n_jobs: int = 1,
         **kwargs,
     ):
 
@@ -88,6 +93,7 @@ class AutoForecaster(Forecaster):
         self.num_samples = num_samples
         self.target_transform = target_transform
         self.feature_transform = feature_transform
+        self.n_jobs = n_jobs
         self.kwargs = kwargs
 
     @property
@@ -115,7 +121,13 @@ class AutoForecaster(Forecaster):
     def low_cost_partial_config(self):
         return None
 
-    def _fit(self, y: pl.LazyFrame, X: Optional[pl.LazyFrame] = None):
+    def _fit(
+        self,
+        y: pl.LazyFrame,
+        X: Optional[pl.LazyFrame] = None,
+        residualize: bool = False,
+        categorical_features: Optional[List[str]] = None,
+    ):
         from functime.forecasting._ar import fit_cv
 
         return fit_cv(
@@ -136,6 +148,9 @@ class AutoForecaster(Forecaster):
             or self.default_points_to_evaluate,
             num_samples=self.num_samples,
             low_cost_partial_config=self.low_cost_partial_config,
+            residualize=residualize,
+            n_jobs=self.n_jobs,
+            categorical_features=categorical_features,
         )
 
     def _predict(self, fh: int, X: Optional[pl.LazyFrame] = None):
@@ -152,6 +167,9 @@ class AutoForecaster(Forecaster):
         n_splits: int = 5,
         window_size: int = 10,
         strategy: Literal["expanding", "sliding"] = "expanding",
+        n_jobs: int = 1,
+        backend: Literal["threads", "processes"] = "threads",
+        refit: Union[bool, int] = True,
     ):
         # Get base forecaster with fixed best params
         forecaster_cls = self.forecaster
@@ -167,6 +185,9 @@ class AutoForecaster(Forecaster):
             n_splits=n_splits,
             window_size=window_size,
             strategy=strategy,
+            n_jobs=n_jobs,
+            backend=backend,
+            refit=refit,
         )
         return y_preds, y_resids
 
@@ -1,4 +1,4 @@
-from typing import Callable, Optional, Union
+from typing import Callable, List, Optional, Union
 
 import numpy as np
 import polars as pl
@@ -57,7 +57,13 @@ class catboost(Forecaster):
     https://catboost.ai/en/docs/concepts/python-reference_catboostregressor
     """
 
-    def _fit(self, y: pl.LazyFrame, X: Optional[pl.LazyFrame] = None):
+    def _fit(
+        self,
+        y: pl.LazyFrame,
+        X: Optional[pl.LazyFrame] = None,
+        residualize: bool = False,
+        categorical_features: Optional[List[str]] = None,
+    ):
         y_new = y.pipe(
             _enforce_label_constraint, loss_function=self.kwargs.get("loss_function")
         )
@@ -69,4 +75,5 @@ class catboost(Forecaster):
             lags=self.lags,
             max_horizons=self.max_horizons,
             strategy=self.strategy,
+            residualize=residualize,
         )
@@ -1,4 +1,4 @@
-from typing import Callable, Optional, Union
+from typing import Callable, List, Optional, Union
 
 import numpy as np
 import polars as pl
@@ -52,7 +52,13 @@ class censored_model(Forecaster):
             freq=freq, lags=lags, max_horizons=max_horizons, strategy=strategy, **kwargs
         )
 
-    def _fit(self, y: pl.LazyFrame, X: Optional[pl.LazyFrame] = None):
+    def _fit(
+        self,
+        y: pl.LazyFrame,
+        X: Optional[pl.LazyFrame] = None,
+        residualize: bool = False,
+        categorical_features: Optional[List[str]] = None,
+    ):
 
         # 1. Fit classifier
         target_col = y.columns[-1]
@@ -86,6 +92,7 @@ class censored_model(Forecaster):
             X=X,
             max_horizons=self.max_horizons,
             strategy=self.strategy,
+            residualize=residualize,
         )
         # 3. Collect artifacts
         artifacts = {"classifier": fitted_classifier, **forecast_artifacts}
@@ -1,5 +1,5 @@
 from functools import partial
-from typing import Any, Mapping, Optional, Union
+from typing import Any, List, Mapping, Optional, Union
 
 import polars as pl
 import polars.selectors as cs
@@ -101,28 +101,31 @@ class elite(Forecaster):
             "lasso_diff": partial(lasso_cv, target_transform=diff(order=1)),
             # AR models with Fourier terms (defaults to K=6)
             "linear_fourier": partial(
-                linear_model, feature_transform=add_fourier_terms(sp=self.sp, K=6)
+                linear_model,
+                feature_transform=add_fourier_terms(sp=self.sp, K=6, freq=freq),
             ),
             "ridge_fourier": partial(
-                ridge_cv, feature_transform=add_fourier_terms(sp=self.sp, K=6)
+                ridge_cv,
+                feature_transform=add_fourier_terms(sp=self.sp, K=6, freq=freq),
             ),
             "lasso_fourier": partial(
-                lasso_cv, feature_transform=add_fourier_terms(sp=self.sp, K=6)
+                lasso_cv,
+                feature_transform=add_fourier_terms(sp=self.sp, K=6, freq=freq),
             ),
             "linear_scaled_fourier": partial(
                 linear_model,
                 target_transform=scale(),
-                feature_transform=add_fourier_terms(sp=self.sp, K=6),
+                feature_transform=add_fourier_terms(sp=self.sp, K=6, freq=freq),
             ),
             "ridge_scaled_fourier": partial(
                 ridge_cv,
                 target_transform=scale(),
-                feature_transform=add_fourier_terms(sp=self.sp, K=6),
+                feature_transform=add_fourier_terms(sp=self.sp, K=6, freq=freq),
             ),
             "lasso_scaled_fourier": partial(
                 lasso_cv,
                 target_transform=scale(),
-                feature_transform=add_fourier_terms(sp=self.sp, K=6),
+                feature_transform=add_fourier_terms(sp=self.sp, K=6, freq=freq),
             ),
             # Linear detrended AR models
             "linear_detrend_linear": partial(
@@ -148,17 +151,17 @@ class elite(Forecaster):
             "linear_detrend_linear_fourier": partial(
                 linear_model,
                 target_transform=detrend(method="linear"),
-                feature_transform=add_fourier_terms(sp=self.sp, K=12),
+                feature_transform=add_fourier_terms(sp=self.sp, K=12, freq=freq),
             ),
             "ridge_detrend_linear_fourier": partial(
                 ridge_cv,
                 target_transform=detrend(method="linear"),
-                feature_transform=add_fourier_terms(sp=self.sp, K=12),
+                feature_transform=add_fourier_terms(sp=self.sp, K=12, freq=freq),
             ),
             "lasso_detrend_linear_fourier": partial(
                 lasso_cv,
                 target_transform=detrend(method="linear"),
-                feature_transform=add_fourier_terms(sp=self.sp, K=12),
+                feature_transform=add_fourier_terms(sp=self.sp, K=12, freq=freq),
             ),
         }
 
@@ -211,7 +214,13 @@ class elite(Forecaster):
         )
         return X_stack
 
-    def _fit(self, y: pl.LazyFrame, X: Optional[pl.LazyFrame] = None):
+    def _fit(
+        self,
+        y: pl.LazyFrame,
+        X: Optional[pl.LazyFrame] = None,
+        residualize: bool = False,
+        categorical_features: Optional[List[str]] = None,
+    ):
         freq = self.freq
         lags = self.lags
         top_k = self.top_k
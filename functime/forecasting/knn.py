@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 import polars as pl
 
@@ -26,7 +26,13 @@ class knn(Forecaster):
     https://scikit-learn.org/stable/modules/generated/sklearn.neighbors.KNeighborsRegressor.html
     """
 
-    def _fit(self, y: pl.LazyFrame, X: Optional[pl.LazyFrame] = None):
+    def _fit(
+        self,
+        y: pl.LazyFrame,
+        X: Optional[pl.LazyFrame] = None,
+        residualize: bool = False,
+        categorical_features: Optional[List[str]] = None,
+    ):
         regress = _knn(**self.kwargs)
         return fit_autoreg(
             regress=regress,
@@ -35,4 +41,5 @@ class knn(Forecaster):
             lags=self.lags,
             max_horizons=self.max_horizons,
             strategy=self.strategy,
+            residualize=residualize,
         )
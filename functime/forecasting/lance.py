@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 import lance
 import numpy as np
@@ -104,7 +104,13 @@ def _ann(**kwargs):
 class ann(Forecaster):
     """Autoregressive approximate nearest neighbors built on Lance."""
 
-    def _fit(self, y: pl.LazyFrame, X: Optional[pl.LazyFrame] = None):
+    def _fit(
+        self,
+        y: pl.LazyFrame,
+        X: Optional[pl.LazyFrame] = None,
+        residualize: bool = False,
+        categorical_features: Optional[List[str]] = None,
+    ):
         regress = _ann(**self.kwargs)
         return fit_autoreg(
             regress=regress,
@@ -113,4 +119,5 @@ class ann(Forecaster):
             lags=self.lags,
             max_horizons=self.max_horizons,
             strategy=self.strategy,
+            residualize=residualize,
         )
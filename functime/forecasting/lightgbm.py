@@ -1,4 +1,4 @@
-from typing import Callable, Optional, Union
+from typing import Callable, List, Optional, Union
 
 import numpy as np
 import polars as pl
@@ -45,12 +45,22 @@ def _enforce_label_constraint(y: pl.DataFrame, objective: Union[str, None]):
     return y
 
 
-def _lightgbm(weight_transform: Optional[Callable] = None, **kwargs):
+def _lightgbm(
+    weight_transform: Optional[Callable] = None,
+    categorical_features: Optional[List[str]] = None,
+    **kwargs,
+):
     def regress(X: pl.DataFrame, y: pl.DataFrame):
 
         idx_cols = X.columns[:2]
         feature_cols = X.columns[2:]
         categorical_cols = X.select(pl.col(pl.Categorical).exclude(idx_cols)).columns
+        # Integer-coded categorical features (e.g. calendar effects)
+        categorical_cols += [
+            col
+            for col in categorical_features or []
+            if col in feature_cols and col not in categorical_cols
+        ]
 
         def train(
             X: np.ndarray, y: np.ndarray, sample_weight: Optional[np.ndarray] = None
@@ -103,11 +113,17 @@ class lightgbm(Forecaster):
     https://lightgbm.readthedocs.io/en/latest/pythonapi/lightgbm.LGBMRegressor.html
     """
 
-    def _fit(self, y: pl.LazyFrame, X: Optional[pl.LazyFrame] = None):
+    def _fit(
+        self,
+        y: pl.LazyFrame,
+        X: Optional[pl.LazyFrame] = None,
+        residualize: bool = False,
+        categorical_features: Optional[List[str]] = None,
+    ):
         y_new = y.pipe(
             _enforce_label_constraint, objective=self.kwargs.get("objective")
         )
-        regress = _lightgbm(**self.kwargs)
+        regress = _lightgbm(categorical_features=categorical_features, **self.kwargs)
         return fit_autoreg(
             regress=regress,
             y=y_new,
@@ -115,6 +131,7 @@ class lightgbm(Forecaster):
             lags=self.lags,
             max_horizons=self.max_horizons,
             strategy=self.strategy,
+            residualize=residualize,
         )
 
 
@@ -125,7 +142,13 @@ class flaml_lightgbm(Forecaster):
     https://microsoft.github.io/FLAML/docs/Examples/AutoML-for-LightGBM/
     """
 
-    def _fit(self, y: pl.LazyFrame, X: Optional[pl.LazyFrame] = None):
+    def _fit(
+        self,
+        y: pl.LazyFrame,
+        X: Optional[pl.LazyFrame] = None,
+        residualize: bool = False,
+        categorical_features: Optional[List[str]] = None,
+    ):
         y_new = y.pipe(
             _enforce_label_constraint, objective=self.kwargs.get("objective")
         )
@@ -137,4 +160,5 @@ class flaml_lightgbm(Forecaster):
             lags=self.lags,
             max_horizons=self.max_horizons,
             strategy=self.strategy,
+            residualize=residualize,
         )
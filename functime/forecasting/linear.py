@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 import polars as pl
 
@@ -94,7 +94,13 @@ class linear_model(Forecaster):
     https://scikit-learn.org/stable/modules/generated/sklearn.linear_model.LinearRegression.html
     """
 
-    def _fit(self, y: pl.LazyFrame, X: Optional[pl.LazyFrame] = None):
+    def _fit(
+        self,
+        y: pl.LazyFrame,
+        X: Optional[pl.LazyFrame] = None,
+        residualize: bool = False,
+        categorical_features: Optional[List[str]] = None,
+    ):
         kwargs = self.kwargs
         # Check dummy variable trap
         if (
@@ -114,6 +120,7 @@ class linear_model(Forecaster):
             lags=self.lags,
             max_horizons=self.max_horizons,
             strategy=self.strategy,
+            residualize=residualize,
         )
 
 
@@ -124,7 +131,13 @@ class lasso(Forecaster):
     https://scikit-learn.org/stable/modules/generated/sklearn.linear_model.Lasso.html#sklearn.linear_model.Lasso
     """
 
-    def _fit(self, y: pl.LazyFrame, X: Optional[pl.LazyFrame] = None):
+    def _fit(
+        self,
+        y: pl.LazyFrame,
+        X: Optional[pl.LazyFrame] = None,
+        residualize: bool = False,
+        categorical_features: Optional[List[str]] = None,
+    ):
         regress = _lasso(**self.kwargs)
         return fit_autoreg(
             regress=regress,
@@ -133,6 +146,7 @@ class lasso(Forecaster):
             lags=self.lags,
             max_horizons=self.max_horizons,
             strategy=self.strategy,
+            residualize=residualize,
         )
 
 
@@ -143,7 +157,13 @@ class ridge(Forecaster):
     https://scikit-learn.org/stable/modules/generated/sklearn.linear_model.Ridge.html#sklearn.linear_model.Ridge
     """
 
-    def _fit(self, y: pl.LazyFrame, X: Optional[pl.LazyFrame] = None):
+    def _fit(
+        self,
+        y: pl.LazyFrame,
+        X: Optional[pl.LazyFrame] = None,
+        residualize: bool = False,
+        categorical_features: Optional[List[str]] = None,
+    ):
         regress = _ridge(**self.kwargs)
         return fit_autoreg(
             regress=regress,
@@ -152,6 +172,7 @@ class ridge(Forecaster):
             lags=self.lags,
             max_horizons=self.max_horizons,
             strategy=self.strategy,
+            residualize=residualize,
         )
 
 
@@ -162,7 +183,13 @@ class elastic_net(Forecaster):
     https://scikit-learn.org/stable/modules/generated/sklearn.linear_model.ElasticNet.html#sklearn.linear_model.ElasticNet
     """
 
-    def _fit(self, y: pl.LazyFrame, X: Optional[pl.LazyFrame] = None):
+    def _fit(
+        self,
+        y: pl.LazyFrame,
+        X: Optional[pl.LazyFrame] = None,
+        residualize: bool = False,
+        categorical_features: Optional[List[str]] = None,
+    ):
         regress = _elastic_net(**self.kwargs)
         return fit_autoreg(
             regress=regress,
@@ -171,6 +198,7 @@ class elastic_net(Forecaster):
             lags=self.lags,
             max_horizons=self.max_horizons,
             strategy=self.strategy,
+            residualize=residualize,
         )
 
 
@@ -181,7 +209,13 @@ class lasso_cv(Forecaster):
     https://scikit-learn.org/stable/modules/generated/sklearn.linear_model.Lasso.html#sklearn.linear_model.LassoCV
     """
 
-    def _fit(self, y: pl.LazyFrame, X: Optional[pl.LazyFrame] = None):
+    def _fit(
+        self,
+        y: pl.LazyFrame,
+        X: Optional[pl.LazyFrame] = None,
+        residualize: bool = False,
+        categorical_features: Optional[List[str]] = None,
+    ):
         regress = _lasso_cv(**self.kwargs)
         return fit_autoreg(
             regress=regress,
@@ -190,6 +224,7 @@ class lasso_cv(Forecaster):
             lags=self.lags,
             max_horizons=self.max_horizons,
             strategy=self.strategy,
+            residualize=residualize,
         )
 
 
@@ -200,7 +235,13 @@ class ridge_cv(Forecaster):
     https://scikit-learn.org/stable/modules/generated/sklearn.linear_model.Ridge.html#sklearn.linear_model.RidgeCV
     """
 
-    def _fit(self, y: pl.LazyFrame, X: Optional[pl.LazyFrame] = None):
+    def _fit(
+        self,
+        y: pl.LazyFrame,
+        X: Optional[pl.LazyFrame] = None,
+        residualize: bool = False,
+        categorical_features: Optional[List[str]] = None,
+    ):
         regress = _ridge_cv(**self.kwargs)
         return fit_autoreg(
             regress=regress,
@@ -209,6 +250,7 @@ class ridge_cv(Forecaster):
             lags=self.lags,
             max_horizons=self.max_horizons,
             strategy=self.strategy,
+            residualize=residualize,
         )
 
 
@@ -219,7 +261,13 @@ class elastic_net_cv(Forecaster):
     https://scikit-learn.org/stable/modules/generated/sklearn.linear_model.ElasticNet.html#sklearn.linear_model.ElasticNetCV
     """
 
-    def _fit(self, y: pl.LazyFrame, X: Optional[pl.LazyFrame] = None):
+    def _fit(
+        self,
+        y: pl.LazyFrame,
+        X: Optional[pl.LazyFrame] = None,
+        residualize: bool = False,
+        categorical_features: Optional[List[str]] = None,
+    ):
         regress = _elastic_net_cv(**self.kwargs)
         return fit_autoreg(
             regress=regress,
@@ -228,4 +276,5 @@ class elastic_net_cv(Forecaster):
             lags=self.lags,
             max_horizons=self.max_horizons,
             strategy=self.strategy,
+            residualize=residualize,
         )
@@ -1,4 +1,4 @@
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 import polars as pl
 
@@ -18,7 +18,13 @@ class naive(Forecaster):
     def __init__(self, freq: str):
         super().__init__(freq=freq, lags=1)
 
-    def _fit(self, y: pl.LazyFrame, X: Optional[pl.LazyFrame] = None):
+    def _fit(
+        self,
+        y: pl.LazyFrame,
+        X: Optional[pl.LazyFrame] = None,
+        residualize: bool = False,
+        categorical_features: Optional[List[str]] = None,
+    ):
         idx_cols = y.columns[:2]
         entity_col = idx_cols[0]
         target_col = y.columns[2]
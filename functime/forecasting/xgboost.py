@@ -1,4 +1,4 @@
-from typing import Callable, Optional, Union
+from typing import Callable, List, Optional, Union
 
 import numpy as np
 import polars as pl
@@ -31,18 +31,30 @@ def _enforce_label_constraint(y: pl.DataFrame, objective: Union[str, None]):
     return y
 
 
-def _xgboost(weight_transform: Optional[Callable] = None, **kwargs):
+def _xgboost(
+    weight_transform: Optional[Callable] = None,
+    categorical_features: Optional[List[str]] = None,
+    **kwargs,
+):
     def regress(X: pl.DataFrame, y: pl.DataFrame):
 
         feature_cols = X.columns[2:]
+        # Integer-coded categorical features (e.g. calendar effects)
+        categorical_cols = set(categorical_features or []) & set(feature_cols)
+        dmatrix_kwargs = {"feature_names": feature_cols}
+        if categorical_cols:
+            dmatrix_kwargs["feature_types"] = [
+                "c" if col in categorical_cols else "q" for col in feature_cols
+            ]
+            dmatrix_kwargs["enable_categorical"] = True
 
         def train(X: pa.Table, y: pa.Table, sample_weight: Optional[np.ndarray] = None):
             dataset = DMatrix(
                 data=X,
                 label=y,
                 weight=sample_weight,
-                feature_names=feature_cols,
                 nthread=-1,
+                **dmatrix_kwargs,
             )
             return xgb_train(params=kwargs, dtrain=dataset)
 
@@ -50,7 +62,7 @@ def _xgboost(weight_transform: Optional[Callable] = None, **kwargs):
             regress=train,
             weight_transform=weight_transform,
             predict_dtype=lambda X: DMatrix(
-                X.select(pl.col(X.columns[2:])), feature_names=feature_cols
+                X.select(pl.col(X.columns[2:])), **dmatrix_kwargs
             ),
         )
         return regressor.fit(X=X, y=y)
@@ -65,11 +77,17 @@ class xgboost(Forecaster):
     https://xgboost.readthedocs.io/en/stable/python/python_api.html#module-xgboost.training
     """
 
-    def _fit(self, y: pl.LazyFrame, X: Optional[pl.LazyFrame] = None):
+    def _fit(
+        self,
+        y: pl.LazyFrame,
+        X: Optional[pl.LazyFrame] = None,
+        residualize: bool = False,
+        categorical_features: Optional[List[str]] = None,
+    ):
         y_new = y.pipe(
             _enforce_label_constraint, objective=self.kwargs.get("objective")
         )
-        regress = _xgboost(**self.kwargs)
+        regress = _xgboost(categorical_features=categorical_features, **self.kwargs)
         return fit_autoreg(
             regress=regress,
             y=y_new,
@@ -77,4 +95,5 @@ class xgboost(Forecaster):
             lags=self.lags,
             max_horizons=self.max_horizons,
             strategy=self.strategy,
+            residualize=residualize,
         )
@@ -14,6 +14,8 @@ except ModuleNotFoundError as e:
     ) from e
 
 
+logger = logging.getLogger(__name__)
+
 openai.api_key = os.getenv("OPENAI_API_KEY")
 if openai.api_key is None:
     raise ValueError(
@@ -49,7 +51,7 @@ _dag: Mapping[MODEL_T, MODEL_T] = {
 @retry(
     wait=wait_random_exponential(min=1, max=60),
     stop=stop_after_attempt(_MAX_RETRIES),
-    retry_error_callback=lambda e: logging.error(f"Retry raised an OpenAI error: {e}"),
+    retry_error_callback=lambda e: logger.error(f"Retry raised an OpenAI error: {e}"),
 )
 def openai_call(
     prompt: str,
@@ -71,7 +73,7 @@ def openai_call(
                 f"Prompt exceeds token limit for model {model}."
                 f" Either no larger model is available or try set auto_adjust_model=True."
             )
-        logging.warning(
+        logger.warning(
             f"Prompt exceeds token limit for model {model}. Checking with larger model..."
         )
         model = next_model
@@ -91,7 +93,7 @@ def _openai_count_tokens(
     try:
         encoding = tiktoken.encoding_for_model(model)
     except KeyError:
-        logging.warning("Model not found. Using cl100k_base encoding.")
+        logger.warning("Model not found. Using cl100k_base encoding.")
         encoding = tiktoken.get_encoding("cl100k_base")
     if model in {
         "gpt-3.5-turbo-0613",
@@ -109,12 +111,12 @@ def _openai_count_tokens(
         )
         tokens_per_name = -1  # if there's a name, the role is omitted
     elif "gpt-3.5-turbo" in model:
-        logging.warning(
+        logger.warning(
             "gpt-3.5-turbo may update over time. Returning num tokens assuming gpt-3.5-turbo-0613."
         )
         return _openai_count_tokens(messages, model="gpt-3.5-turbo-0613")
     elif "gpt-4" in model:
-        logging.warning(
+        logger.warning(
             "gpt-4 may update over time. Returning num tokens assuming gpt-4-0613."
         )
         return _openai_count_tokens(messages, model="gpt-4-0613")
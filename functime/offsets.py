@@ -1,19 +1,22 @@
+import re
 from typing import List, Tuple, Union
 
-OFFSET_ALIASES = {"s", "m", "h", "d", "w", "mo", "y", "i"}
+OFFSET_ALIASES = {"ns", "us", "ms", "s", "m", "h", "d", "w", "mo", "q", "y", "i"}
 
 
 def _strip_freq_alias(freq: str) -> Tuple[int, str]:
     """Return (index count, offset string) given Polars offset alias.
 
     For example, `freq = "3mo"` returns `(3, "mo")`.
+    Raises a ValueError if `freq` is not a supported offset alias.
     """
-    freq = freq.lower()
-    for x in OFFSET_ALIASES:
-        if freq.endswith(x):
-            offset_n = int(freq.rstrip(x))
-            offset_alias = x
-            return offset_n, offset_alias
+    match = re.fullmatch(r"(\d+)([a-z]+)", freq.lower())
+    if match is None or match.group(2) not in OFFSET_ALIASES:
+        raise ValueError(
+            f"Unsupported offset alias: {freq!r}. Expected an integer followed by one of "
+            f"{sorted(OFFSET_ALIASES)} (e.g. '1d', '3mo')."
+        )
+    return int(match.group(1)), match.group(2)
 
 
 def freq_to_sp(freq: str) -> Union[List[int], List[float]]:
@@ -1,31 +1,78 @@
-from typing import List, Mapping, Union
+import warnings
+from datetime import date, datetime
+from typing import Callable, List, Mapping, Optional, Tuple, Union
 
+import bottleneck as bn
+import numpy as np
 import polars as pl
 import polars.selectors as cs
-from scipy import optimize
-from scipy.stats import boxcox_normmax
+from scipy.signal import lfilter
+from scipy.special import ndtri
 from typing_extensions import Literal
 
 from functime.base import transformer
 from functime.base.model import ModelState
-from functime.offsets import _strip_freq_alias
 
 
 def PL_NUMERIC_COLS(*exclude):
     return cs.numeric() - cs.by_name(exclude)
 
 
+def _pad_groups(X: pl.DataFrame, cols: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (n_entities, max_length, n_cols) array of left-aligned series padded
+    with NaN and the length of each series. Assumes `X` is sorted by entity, time.
+    """
+    entity_col = X.columns[0]
+    lengths = (
+        X.groupby(entity_col, maintain_order=True)
+        .agg(pl.count())
+        .get_column("count")
+        .to_numpy()
+        .astype(np.int64)
+    )
+    n_entities, max_length = len(lengths), lengths.max()
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    rows = np.repeat(np.arange(n_entities), lengths)
+    cols_idx = np.arange(lengths.sum()) - offsets
+    values = X.select(pl.col(cols).cast(pl.Float64)).to_numpy()
+    padded = np.full((n_entities, max_length, len(cols)), np.nan)
+    padded[rows, cols_idx] = values
+    return padded, lengths
+
+
 @transformer
-def reindex(drop_duplicates: bool = False):
+def reindex(
+    drop_duplicates: bool = False,
+    freq: Optional[str] = None,
+    start: Optional[Union[int, date, datetime]] = None,
+    end: Optional[Union[int, date, datetime]] = None,
+):
     """Reindexes the entity and time columns to have every possible combination of (entity, time).
 
+    If `freq` is provided, dense time ranges are instead generated only within each entity's
+    own [first, last] span, or within the global window [`start`, `end`] if provided.
+    This avoids materializing the entity x timestamp cross join for panels where time-series
+    start and end at different dates. The reindexed panel is collected with the streaming engine,
+    and gap statistics per entity are stored in the transformer state under `gaps`:
+    `n_obs` (observed timestamps), `n_missing` (inserted timestamps), and `max_gap`
+    (longest run of consecutive inserted timestamps).
+
     Parameters
     ---------
     drop_duplicates : bool
         Defaults to False. If True, duplicates are dropped before reindexing.
+    freq : Optional[str]
+        Offset alias supported by Polars (e.g. "1d", "1h", "1mo") or "Ni" for integer time
+        columns (e.g. "1i"). Defaults to None (cross join of all entities and timestamps).
+    start : Optional[Union[int, date, datetime]]
+        Start of the global window. Defaults to each entity's first timestamp.
+        Only used if `freq` is provided.
+    end : Optional[Union[int, date, datetime]]
+        End of the global window. Defaults to each entity's last timestamp.
+        Only used if `freq` is provided.
     """
 
-    def transform(X: pl.LazyFrame) -> pl.LazyFrame:
+    def _cross_join(X: pl.LazyFrame) -> pl.LazyFrame:
         entity_col, time_col = X.columns[:2]
         if drop_duplicates:
             entities = X.select(pl.col(entity_col).unique())
@@ -35,7 +82,90 @@ def reindex(drop_duplicates: bool = False):
             timestamps = X.select(time_col)
         idx = entities.join(timestamps, how="cross")
         X_new = idx.join(X, how="left", on=[entity_col, time_col])
-        artifacts = {"X_new": X_new}
+        return X_new
+
+    def _span_ranges(X: pl.LazyFrame) -> pl.LazyFrame:
+        entity_col, time_col = X.columns[:2]
+        dtype = X.schema[time_col]
+        spans = X.groupby(entity_col).agg(
+            [
+                pl.col(time_col).min().alias("__start"),
+                pl.col(time_col).max().alias("__end"),
+            ]
+        )
+        if start is not None:
+            spans = spans.with_columns(pl.lit(start).cast(dtype).alias("__start"))
+        if end is not None:
+            spans = spans.with_columns(pl.lit(end).cast(dtype).alias("__end"))
+        if freq.endswith("i"):
+            ranges = pl.arange(
+                pl.col("__start"),
+                pl.col("__end") + 1,
+                step=int(freq[:-1]),
+                eager=False,
+            )
+        else:
+            ranges = pl.date_range(
+                pl.col("__start"),
+                pl.col("__end"),
+                interval=freq,
+                closed="both",
+                time_unit=getattr(dtype, "time_unit", None),
+                eager=False,
+            )
+        idx = spans.select([pl.col(entity_col), ranges.alias(time_col)]).explode(
+            time_col
+        )
+        return idx.select([pl.col(entity_col), pl.col(time_col).cast(dtype)])
+
+    def transform(X: pl.LazyFrame) -> pl.LazyFrame:
+        if freq is None:
+            artifacts = {"X_new": _cross_join(X)}
+            return artifacts
+        entity_col, time_col = X.columns[:2]
+        if drop_duplicates:
+            X = X.unique(subset=[entity_col, time_col], keep="first")
+        X_new = (
+            _span_ranges(X)
+            .join(
+                X.with_columns(pl.lit(True).alias("__observed")),
+                how="left",
+                on=[entity_col, time_col],
+            )
+            .sort([entity_col, time_col])
+            .collect(streaming=True)
+        )
+        is_missing = pl.col("__observed").is_null()
+        gaps = (
+            X_new.select(
+                [
+                    entity_col,
+                    is_missing.alias("__missing"),
+                    # Runs of missing timestamps share the same count of observations so far
+                    pl.col("__observed")
+                    .is_not_null()
+                    .cumsum()
+                    .over(entity_col)
+                    .alias("__run"),
+                ]
+            )
+            .groupby([entity_col, "__run"])
+            .agg(
+                [
+                    pl.col("__missing").sum().alias("n_missing"),
+                    (~pl.col("__missing")).sum().alias("n_obs"),
+                ]
+            )
+            .groupby(entity_col, maintain_order=True)
+            .agg(
+                [
+                    pl.col("n_obs").sum(),
+                    pl.col("n_missing").sum(),
+                    pl.col("n_missing").max().alias("max_gap"),
+                ]
+            )
+        )
+        artifacts = {"X_new": X_new.drop("__observed").lazy(), "gaps": gaps}
         return artifacts
 
     return transform
@@ -86,42 +216,104 @@ def time_to_arange(eager: bool = False):
     return transform
 
 
+_RESAMPLE_AGG_METHODS = (
+    "sum",
+    "mean",
+    "median",
+    "min",
+    "max",
+    "first",
+    "last",
+    "std",
+    "count",
+)
+
+
 @transformer
-def resample(freq: str, agg_method: str, impute_method: Union[str, int, float]):
+def resample(
+    freq: str,
+    agg_method: Union[str, Mapping[str, Union[str, List[str]]]],
+    impute_method: Union[str, int, float, Mapping[str, Union[str, int, float]]] = 0,
+):
     """
     Resamples and transforms a DataFrame using the specified frequency, aggregation method, and imputation method.
 
+    All aggregations are computed in a single `groupby_dynamic` pass.
+    Remaining missing values after imputation (e.g. leading nulls after forward fill) are filled with 0,
+    except in columns left out of an `impute_method` mapping.
+
     Parameters
     ----------
     freq : str
         Offset alias supported by Polars.
-    agg_method : str
-        The aggregation method to use for resampling. Supported values are 'sum', 'mean', and 'median'.
-    impute_method : Union[str, int, float]
+    agg_method : Union[str, Mapping[str, Union[str, List[str]]]]
+        The aggregation method to use for resampling. Supported values are
+        'sum', 'mean', 'median', 'min', 'max', 'first', 'last', 'std', and 'count'.
+        If a string, the aggregation is applied to every column.
+        If a mapping, maps column names to an aggregation method or a list of methods
+        (e.g. `{"volume": "sum", "price": ["last", "max", "min"]}`); columns not in the mapping are dropped.
+        Columns with a list of methods are returned as `{col}__{method}`.
+    impute_method : Union[str, int, float, Mapping[str, Union[str, int, float]]]
         The method used for imputing missing values. If a string, supported values are 'ffill' (forward fill)
         and 'bfill' (backward fill). If an int or float, missing values will be filled with the provided value.
+        If a mapping, maps output column names to an imputation method; columns not in the mapping
+        are not imputed and keep their missing values.
+        See `impute` for all supported methods. Defaults to 0.
     """
 
+    def _agg_exprs(cols: List[str]) -> List[pl.Expr]:
+        if isinstance(agg_method, str):
+            agg_methods = {col: agg_method for col in cols}
+        else:
+            agg_methods = agg_method
+        exprs = []
+        for col, methods in agg_methods.items():
+            if isinstance(methods, str):
+                names = {methods: col}
+            else:
+                names = {method: f"{col}__{method}" for method in methods}
+            for method, name in names.items():
+                if method not in _RESAMPLE_AGG_METHODS:
+                    raise ValueError(
+                        f"Unsupported aggregation method '{method}' for column '{col}'"
+                    )
+                exprs.append(getattr(pl.col(col), method)().alias(name))
+        return exprs
+
     def transform(X: pl.LazyFrame) -> pl.LazyFrame:
-        entity_col, time_col, target_col = X.columns
-        agg_exprs = {
-            "sum": pl.sum(target_col),
-            "mean": pl.mean(target_col),
-            "median": pl.median(target_col),
-        }
+        entity_col, time_col = X.columns[:2]
+        agg_exprs = _agg_exprs(X.columns[2:])
         X_new = (
             # Defensive resampling
             X.lazy()
             .groupby_dynamic(time_col, every=freq, by=entity_col)
-            .agg(agg_exprs[agg_method])
+            .agg(agg_exprs)
             # Must defensive sort columns otherwise time_col and target_col
             # positions are incorrectly swapped in lazy
-            .select([entity_col, time_col, target_col])
-            # Impute gaps after reindex
-            .pipe(impute(impute_method))
-            # Defensive fill null with 0 for impute method `ffill`
-            .fill_null(0)
+            .select(
+                [entity_col, time_col, *[expr.meta.output_name() for expr in agg_exprs]]
+            )
         )
+        # Impute gaps after reindex
+        if isinstance(impute_method, Mapping):
+            impute_methods = {}
+            for col, method in impute_method.items():
+                impute_methods.setdefault(method, []).append(col)
+            X_new = X_new.with_columns(
+                [
+                    expr
+                    for method, cols in impute_methods.items()
+                    for expr in _impute_exprs(method, cs.by_name(cols), entity_col)
+                ]
+            )
+            # Defensive fill null with 0 for impute method `ffill` (imputed columns only)
+            X_new = X_new.with_columns(
+                [pl.col(col).fill_null(0) for col in impute_method]
+            )
+        else:
+            X_new = X_new.pipe(impute(impute_method))
+            # Defensive fill null with 0 for impute method `ffill`
+            X_new = X_new.fill_null(0)
         artifacts = {"X_new": X_new}
         return artifacts
 
@@ -142,25 +334,26 @@ def trim(direction: Literal["both", "left", "right"] = "both"):
 
     def transform(X: pl.LazyFrame) -> pl.LazyFrame:
         entity_col, time_col = X.columns[:2]
-        maxmin = (
+        # Latest start date and earliest end date across time-series
+        bounds = (
             X.groupby(entity_col)
-            .agg(pl.col(time_col).min())
-            .select(pl.col(time_col).max())
-        )
-        minmax = (
-            X.groupby(entity_col)
-            .agg(pl.col(time_col).max())
-            .select(pl.col(time_col).min())
+            .agg(
+                [
+                    pl.col(time_col).min().alias("__start"),
+                    pl.col(time_col).max().alias("__end"),
+                ]
+            )
+            .select([pl.col("__start").max(), pl.col("__end").min()])
         )
-        start, end = pl.collect_all([minmax, maxmin])
-        start, end = start.item(), end.item()
         if direction == "both":
-            expr = (pl.col(time_col) >= start) & (pl.col(time_col) <= end)
+            expr = (pl.col(time_col) >= pl.col("__start")) & (
+                pl.col(time_col) <= pl.col("__end")
+            )
         elif direction == "left":
-            expr = pl.col(time_col) >= start
+            expr = pl.col(time_col) >= pl.col("__start")
         else:
-            expr = pl.col(time_col) <= start
-        X_new = X.filter(expr)
+            expr = pl.col(time_col) <= pl.col("__end")
+        X_new = X.join(bounds, how="cross").filter(expr).select(X.columns)
         artifacts = {"X_new": X_new}
         return artifacts
 
@@ -209,30 +402,98 @@ def lag(lags: List[int]):
     return transform
 
 
+def _fit_vocabulary(X: pl.LazyFrame, cols: List[str]) -> Mapping[str, List[str]]:
+    """Sorted unique non-null categories (as strings) of each column in one scan."""
+    if not cols:
+        return {}
+    uniques = X.select(
+        [
+            pl.col(col).cast(pl.Utf8).drop_nulls().unique().sort().implode()
+            for col in cols
+        ]
+    ).collect()
+    return {col: uniques.get_column(col)[0].to_list() for col in cols}
+
+
+def _dummy_exprs(
+    col: str, categories: List[str], separator: str = "__"
+) -> List[pl.Expr]:
+    # Unseen categories and nulls are encoded as all zeros
+    return [
+        (pl.col(col).cast(pl.Utf8) == category)
+        .fill_null(False)
+        .cast(pl.UInt8)
+        .alias(f"{col}{separator}{category}")
+        for category in categories
+    ]
+
+
+def _check_unknown(X: pl.LazyFrame, vocabulary: Mapping[str, List[str]]):
+    unknown = (
+        X.select(
+            [
+                pl.col(col)
+                .cast(pl.Utf8)
+                .filter(~pl.col(col).cast(pl.Utf8).is_in(categories))
+                .drop_nulls()
+                .unique()
+                .implode()
+                for col, categories in vocabulary.items()
+            ]
+        )
+        .collect()
+        .to_dicts()[0]
+    )
+    unknown = {col: values for col, values in unknown.items() if len(values) > 0}
+    if unknown:
+        raise ValueError(f"Unknown categories: {unknown}")
+
+
 @transformer
-def one_hot_encode(drop_first: bool = False):
+def one_hot_encode(
+    drop_first: bool = False,
+    handle_unknown: Literal["ignore", "error"] = "ignore",
+):
     """Encode categorical features as a one-hot numeric array.
 
+    The vocabulary of each categorical column is learnt once at fit. Dummy columns
+    (`{col}__{category}`, UInt8) are then emitted as lazy expressions, which keeps the
+    transform inside lazy query plans and the streaming engine.
+
     Parameters
     ----------
     drop_first : bool
         Drop the first one hot feature.
+    handle_unknown : str
+        Policy for categories in `transform_new` that were not seen at fit.
+        If "ignore", unknown categories are encoded as all zeros.
+        If "error", raises a ValueError (requires one scan over the new data).
+        Defaults to "ignore".
 
     Raises
     ------
     ValueError
-        if X passed into `transform_new` contains unknown categories.
+        if X passed into `transform_new` contains unknown categories and `handle_unknown` is "error".
     """
 
+    def _encode(X: pl.LazyFrame, vocabulary: Mapping[str, List[str]]) -> pl.LazyFrame:
+        # Dummies replace the categorical column in place
+        exprs = []
+        for col in X.columns:
+            if col in vocabulary:
+                categories = vocabulary[col][int(drop_first) :]
+                exprs.extend(_dummy_exprs(col, categories))
+            else:
+                exprs.append(pl.col(col))
+        return X.select(exprs)
+
     def transform(X: pl.LazyFrame) -> pl.LazyFrame:
-        # NOTE: You can't do lazy one hot encoding because
-        # polars needs to know the unique values in the selected columns
         cat_cols = X.select(pl.col(pl.Categorical)).columns
-        X_new = X.collect().to_dummies(
-            columns=cat_cols, drop_first=drop_first, separator="__"
-        )
+        vocabulary = _fit_vocabulary(X, cat_cols)
+        X_new = _encode(X, vocabulary)
         artifacts = {
             "X_new": X_new,
+            "vocabulary": vocabulary,
             "dummy_cols": X_new.columns,
         }
         return artifacts
@@ -241,27 +502,193 @@ def one_hot_encode(drop_first: bool = False):
         return NotImplemented
 
     def transform_new(state: ModelState, X: pl.LazyFrame) -> pl.LazyFrame:
+        vocabulary = state.artifacts["vocabulary"]
+        if handle_unknown == "error":
+            _check_unknown(X, vocabulary)
+        return _encode(X, vocabulary)
+
+    return transform, invert, transform_new
+
+
+@transformer
+def ordinal_encode(
+    handle_unknown: Literal["ignore", "error"] = "ignore", unknown_value: int = -1
+):
+    """Encode categorical features as integer codes.
+
+    The vocabulary of each categorical column is learnt once at fit. Categories are
+    encoded by their sorted position in the vocabulary (Int32) with lazy expressions.
+
+    Parameters
+    ----------
+    handle_unknown : str
+        Policy for categories in `transform_new` that were not seen at fit.
+        If "ignore", unknown categories are encoded as `unknown_value`.
+        If "error", raises a ValueError (requires one scan over the new data).
+        Defaults to "ignore".
+    unknown_value : int
+        Code for unknown categories. Defaults to -1.
+    """
+
+    def _encode(X: pl.LazyFrame, vocabulary: Mapping[str, List[str]]) -> pl.LazyFrame:
+        return X.with_columns(
+            [
+                pl.col(col)
+                .cast(pl.Utf8)
+                .map_dict(
+                    {category: i for i, category in enumerate(categories)},
+                    default=pl.when(pl.col(col).is_null())
+                    .then(None)
+                    .otherwise(unknown_value),
+                    return_dtype=pl.Int32,
+                )
+                for col, categories in vocabulary.items()
+            ]
+        )
+
+    def transform(X: pl.LazyFrame) -> pl.LazyFrame:
         cat_cols = X.select(pl.col(pl.Categorical)).columns
-        dummy_cols = state.artifacts["dummy_cols"]
-        X_new = X.collect().to_dummies(columns=cat_cols, separator="__")
-        if len(set(dummy_cols) & set(X_new.columns)) < len(dummy_cols):
-            raise ValueError(
-                f"Missing categories: {set(dummy_cols) & set(X_new.columns)}"
-            )
-        return X_new
+        vocabulary = _fit_vocabulary(X, cat_cols)
+        artifacts = {"X_new": _encode(X, vocabulary), "vocabulary": vocabulary}
+        return artifacts
+
+    def invert(state: ModelState, X: pl.LazyFrame) -> pl.LazyFrame:
+        vocabulary = state.artifacts["vocabulary"]
+        return X.with_columns(
+            [
+                pl.col(col)
+                .map_dict(dict(enumerate(categories)), return_dtype=pl.Utf8)
+                .cast(pl.Categorical)
+                for col, categories in vocabulary.items()
+            ]
+        )
+
+    def transform_new(state: ModelState, X: pl.LazyFrame) -> pl.LazyFrame:
+        vocabulary = state.artifacts["vocabulary"]
+        if handle_unknown == "error":
+            _check_unknown(X, vocabulary)
+        return _encode(X, vocabulary)
 
     return transform, invert, transform_new
 
 
+def _expanding_std(x: np.ndarray) -> np.ndarray:
+    # Welford's running variance, vectorized over entities:
+    # M2_t = M2_{t-1} + (x_t - mean_{t-1}) * (x_t - mean_t).
+    # Series are first centered on their first value so that running sums of
+    # series with a large mean and small variance do not cancel catastrophically.
+    x = x - np.nan_to_num(x[:, :1])
+    n = np.cumsum(~np.isnan(x), axis=1)
+    mean = np.nancumsum(x, axis=1) / n
+    mean_prev = np.full_like(mean, np.nan)
+    mean_prev[:, 1:] = mean[:, :-1]
+    m2 = np.nancumsum((x - mean_prev) * (x - mean), axis=1)
+    return np.sqrt(m2 / (n - 1))
+
+
+def _moving_std(x: np.ndarray, window: int) -> np.ndarray:
+    # Two-pass variance of every window, vectorized over entities and time by looping
+    # over the lags in the window. Running sums (or sliding Welford updates) of series
+    # with level shifts far above their variance cancel catastrophically.
+    # Like `bottleneck.move_std`, windows with missing values are NaN.
+    def _lag(k: int) -> np.ndarray:
+        x_lagged = np.full_like(x, np.nan)
+        if k < x.shape[1]:
+            x_lagged[:, k:] = x[:, : x.shape[1] - k]
+        return x_lagged
+
+    mean = sum(_lag(k) for k in range(window)) / window
+    m2 = sum((_lag(k) - mean) ** 2 for k in range(window))
+    return np.sqrt(m2 / (window - 1))
+
+
+def _roll_kernel(
+    values: np.ndarray,
+    window_sizes: List[int],
+    stats: List[str],
+    alphas: Optional[List[float]] = None,
+    expanding: bool = False,
+) -> Mapping[str, np.ndarray]:
+    """Compute rolling, expanding, and exponentially weighted statistics
+    over a (n_entities, max_length) array of left-aligned, NaN-padded series.
+
+    Rolling sums and means are computed with running sums, and rolling min / max with
+    monotonic deques (`bottleneck.move_*`). Rolling standard deviations are computed
+    in two passes over each window, and expanding standard deviations with Welford's
+    running variance. Every statistic is shifted forward by one period to avoid data leakage.
+    """
+    moving = {
+        "mean": bn.move_mean,
+        "min": bn.move_min,
+        "max": bn.move_max,
+        "sum": bn.move_sum,
+        "std": lambda x, window, axis: _moving_std(x, window),
+    }
+    cumulative = {
+        "sum": lambda x: np.nancumsum(x, axis=1),
+        "min": lambda x: np.fmin.accumulate(x, axis=1),
+        "max": lambda x: np.fmax.accumulate(x, axis=1),
+        "count": lambda x: np.cumsum(~np.isnan(x), axis=1),
+        "std": _expanding_std,
+    }
+
+    def _reduce(reducers, x, stat, **kwargs):
+        # Derived statistics
+        if stat == "mlm":
+            return _reduce(reducers, x, "max", **kwargs) - _reduce(
+                reducers, x, "min", **kwargs
+            )
+        if stat == "cv":
+            return _reduce(reducers, x, "std", **kwargs) / _reduce(
+                reducers, x, "mean", **kwargs
+            )
+        if reducers is cumulative and stat == "mean":
+            return reducers["sum"](x) / reducers["count"](x)
+        return reducers[stat](x, **kwargs)
+
+    def _shift(x):
+        x_shifted = np.full_like(x, np.nan)
+        x_shifted[:, 1:] = x[:, :-1]
+        return x_shifted
+
+    results = {}
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for w in window_sizes:
+            for stat in stats:
+                results[f"rolling_{stat}_{w}"] = _shift(
+                    _reduce(moving, values, stat, window=w, axis=1)
+                )
+        if expanding:
+            for stat in stats:
+                results[f"expanding_{stat}"] = _shift(_reduce(cumulative, values, stat))
+        for alpha in alphas or []:
+            ewm, _ = lfilter(
+                [alpha],
+                [1, alpha - 1],
+                values,
+                axis=1,
+                zi=(1 - alpha) * values[:, :1],
+            )
+            results[f"ewm_mean_{alpha}"] = _shift(ewm)
+    return results
+
+
 @transformer
 def roll(
     window_sizes: List[int],
     stats: List[Literal["mean", "min", "max", "mlm", "sum", "std", "cv"]],
-    freq: str,
+    freq: Optional[str] = None,
+    alphas: Optional[List[float]] = None,
+    expanding: bool = False,
 ):
     """
     Performs rolling window calculations on specified columns of a DataFrame.
 
+    Every (window size, statistic) pair is computed in one batch over the panel sorted
+    by entity and time, when the query is collected. Rolling statistics are lagged by
+    one period to avoid data leakage.
+
     Parameters
     ----------
     window_sizes : List[int]
@@ -276,48 +703,66 @@ def roll(
         - 'sum' for sum
         - 'std' for standard deviation
         - 'cv' for coefficient of variation
-    freq : str
-        Offset alias supported by Polars.
+    freq : Optional[str]
+        Deprecated and ignored. Windows are counted in periods,
+        hence each time-series is expected to be regularly spaced (e.g. via `reindex`).
+    alphas : Optional[List[float]]
+        Smoothing factors of exponentially weighted moving averages to compute.
+        Expects time-series without missing values.
+    expanding : bool
+        If True, also computes each statistic over an expanding window.
     """
 
-    def transform(X: pl.LazyFrame) -> pl.LazyFrame:
-        entity_col, time_col = X.columns[:2]
-        offset_n, offset_alias = _strip_freq_alias(freq)
-        values = pl.all().exclude([entity_col, time_col])
-        stat_exprs = {
-            "mean": lambda w: values.mean().suffix(f"__rolling_mean_{w}"),
-            "min": lambda w: values.min().suffix(f"__rolling_min_{w}"),
-            "max": lambda w: values.max().suffix(f"__rolling_max_{w}"),
-            "mlm": lambda w: (values.max() - values.min()).suffix(f"__rolling_mlm_{w}"),
-            "sum": lambda w: values.sum().suffix(f"__rolling_sum_{w}"),
-            "std": lambda w: values.std().suffix(f"__rolling_std_{w}"),
-            "cv": lambda w: (values.std() / values.mean()).suffix(f"__rolling_cv_{w}"),
-        }
-        # Degrees of freedom
-        X_all = [
-            (
-                X.sort([entity_col, time_col])
-                .groupby_dynamic(
-                    index_column=time_col,
-                    by=entity_col,
-                    every=freq,
-                    period=f"{offset_n * w}{offset_alias}",
-                )
-                .agg([stat_exprs[stat](w) for stat in stats])
-                # NOTE: Must lag by 1 to avoid data leakage
-                .select([entity_col, time_col, values.shift(w).over(entity_col)])
-            )
-            for w in window_sizes
+    if freq is not None:
+        warnings.warn(
+            "`freq` is deprecated and ignored by `roll`: windows are counted in periods",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+
+    suffixes = [f"rolling_{stat}_{w}" for w in window_sizes for stat in stats]
+    if expanding:
+        suffixes += [f"expanding_{stat}" for stat in stats]
+    suffixes += [f"ewm_mean_{alpha}" for alpha in alphas or []]
+
+    def _roll(X: pl.DataFrame) -> pl.DataFrame:
+        idx_cols = X.columns[:2]
+        value_cols = X.columns[2:]
+        values, lengths = _pad_groups(X, value_cols)
+        # Unpad by selecting observed (entity, time) positions in row-major order
+        mask = np.arange(values.shape[1])[None, :] < lengths[:, None]
+        rolled = [
+            (col, _roll_kernel(values[:, :, i], window_sizes, stats, alphas, expanding))
+            for i, col in enumerate(value_cols)
         ]
-        # Join all window lazy operations
-        X_rolling = X_all[0]
-        for X_window in X_all[1:]:
-            X_rolling = X_rolling.join(X_window, on=[entity_col, time_col], how="outer")
-        # Defensive join to match original X index
-        X_new = X.join(X_rolling, on=[entity_col, time_col], how="left").select(
-            X_rolling.columns
+        return X.select(idx_cols).with_columns(
+            [
+                pl.Series(f"{col}__{suffix}", results[suffix][mask], nan_to_null=True)
+                for suffix in suffixes
+                for col, results in rolled
+            ]
         )
 
+    def transform(X: pl.LazyFrame) -> pl.LazyFrame:
+        idx_cols = X.columns[:2]
+        value_cols = X.columns[2:]
+        schema = {
+            **{col: X.schema[col] for col in idx_cols},
+            **{
+                f"{col}__{suffix}": pl.Float64
+                for suffix in suffixes
+                for col in value_cols
+            },
+        }
+        # The kernel runs once over the sorted panel when the query is collected.
+        # Filters and slices must not be pushed below it: they would change the windows.
+        X_new = X.sort(idx_cols).map(
+            _roll,
+            predicate_pushdown=False,
+            projection_pushdown=False,
+            slice_pushdown=False,
+            schema=schema,
+        )
         artifacts = {"X_new": X_new}
         return artifacts
 
@@ -397,15 +842,16 @@ def scale(use_mean: bool = True, use_std: bool = True, rescale_bool: bool = Fals
     def transform_new(state: ModelState, X: pl.LazyFrame) -> pl.LazyFrame:
         artifacts = state.artifacts
         idx_cols = X.columns[:2]
+        entity_col = idx_cols[0]
         numeric_cols = state.artifacts["numeric_cols"]
         _mean = artifacts["_mean"]
         _std = artifacts["_std"]
         if use_mean:
-            X = X.join(_mean, on=idx_cols, how="left").select(
+            X = X.join(_mean, on=entity_col, how="left").select(
                 idx_cols + [pl.col(col) - pl.col(f"{col}_mean") for col in numeric_cols]
             )
         if use_std:
-            X = X.join(_std, on=idx_cols, how="left").select(
+            X = X.join(_std, on=entity_col, how="left").select(
                 idx_cols + [pl.col(col) / pl.col(f"{col}_std") for col in numeric_cols]
             )
         if rescale_bool:
@@ -415,6 +861,29 @@ def scale(use_mean: bool = True, use_std: bool = True, rescale_bool: bool = Fals
     return transform, invert, transform_new
 
 
+def _impute_exprs(
+    method: Union[str, int, float], cols: pl.Expr, entity_col: str
+) -> List[pl.Expr]:
+    """Fill-in expressions for the columns selected by `cols`."""
+    if isinstance(method, int) or isinstance(method, float):
+        return [cols.fill_null(pl.lit(method))]
+    method_to_expr = {
+        "mean": cols.fill_null(cols.mean().over(entity_col)),
+        "median": cols.fill_null(cols.median().over(entity_col)),
+        "fill": [
+            (cs.float() & cols).fill_null((cs.float() & cols).mean().over(entity_col)),
+            (cs.integer() & cols).fill_null(
+                (cs.integer() & cols).median().over(entity_col)
+            ),
+        ],
+        "ffill": cols.fill_null(strategy="forward").over(entity_col),
+        "bfill": cols.fill_null(strategy="backward").over(entity_col),
+        "interpolate": cols.interpolate().over(entity_col),
+    }
+    expr = method_to_expr[method]
+    return expr if isinstance(expr, list) else [expr]
+
+
 @transformer
 def impute(
     method: Union[
@@ -440,36 +909,9 @@ def impute(
         - int or float: Replace missing values with the specified constant.
     """
 
-    def method_to_expr(entity_col, time_col):
-        """Fill-in methods."""
-        return {
-            "mean": PL_NUMERIC_COLS(entity_col, time_col).fill_null(
-                PL_NUMERIC_COLS(entity_col, time_col).mean().over(entity_col)
-            ),
-            "median": PL_NUMERIC_COLS(entity_col, time_col).fill_null(
-                PL_NUMERIC_COLS(entity_col, time_col).median().over(entity_col)
-            ),
-            "fill": [
-                cs.float().fill_null(cs.float().mean().over(entity_col)),
-                cs.integer().fill_null(cs.integer().median().over(entity_col)),
-            ],
-            "ffill": PL_NUMERIC_COLS(entity_col, time_col)
-            .fill_null(strategy="forward")
-            .over(entity_col),
-            "bfill": PL_NUMERIC_COLS(entity_col, time_col)
-            .fill_null(strategy="backward")
-            .over(entity_col),
-            "interpolate": PL_NUMERIC_COLS(entity_col, time_col)
-            .interpolate()
-            .over(entity_col),
-        }
-
     def transform(X: pl.LazyFrame) -> pl.LazyFrame:
         entity_col, time_col = X.columns[:2]
-        if isinstance(method, int) or isinstance(method, float):
-            expr = PL_NUMERIC_COLS(entity_col, time_col).fill_null(pl.lit(method))
-        else:
-            expr = method_to_expr(entity_col, time_col)[method]
+        expr = _impute_exprs(method, PL_NUMERIC_COLS(entity_col, time_col), entity_col)
         X_new = X.with_columns(expr)
         return {"X_new": X_new}
 
@@ -480,6 +922,11 @@ def impute(
 def diff(order: int, sp: int = 1):
     """Difference time-series in panel data given order and seasonal period.
 
+    The first `order * sp` observations of each time-series are dropped.
+    The first and last `order * sp` levels of each time-series are kept as anchors:
+    `invert` reconstructs levels from the anchors with a cumulative sum per seasonal phase,
+    so its cost is proportional to the size of the frame to invert, not the history.
+
     Parameters
     ----------
     order : int
@@ -488,71 +935,266 @@ def diff(order: int, sp: int = 1):
         Seasonal periodicity.
     """
 
-    def transform(X: pl.LazyFrame) -> pl.LazyFrame:
+    n_anchors = order * sp
+
+    def _anchors(X: pl.LazyFrame, is_tail: bool) -> pl.LazyFrame:
+        # Last `sp` values of each order of difference (0 to order - 1)
+        entity_col, time_col = X.columns[:2]
+        cols = X.select(cs.float()).columns
+        levels = [pl.col(col).alias(f"{col}__level_0") for col in cols]
+        X_levels = X.select([entity_col, time_col, *levels])
+        for k in range(1, order):
+            X_levels = X_levels.with_columns(
+                [
+                    pl.col(f"{col}__level_{k - 1}")
+                    .diff(n=sp)
+                    .over(entity_col)
+                    .alias(f"{col}__level_{k}")
+                    for col in cols
+                ]
+            )
+        anchors = (
+            X_levels.groupby(entity_col)
+            .tail(sp)
+            .with_columns(
+                [
+                    pl.col(time_col).cumcount().over(entity_col).alias("__phase"),
+                    pl.lit(is_tail).alias("__is_tail"),
+                ]
+            )
+        )
+        return anchors
 
+    def transform(X: pl.LazyFrame) -> pl.LazyFrame:
         idx_cols = X.columns[:2]
         entity_col = idx_cols[0]
         time_col = idx_cols[1]
+        X = X.select([entity_col, time_col, cs.float()])
 
-        X_first, X_last = pl.collect_all(
-            [
-                X.groupby(entity_col).head(1),
-                X.groupby(entity_col).tail(1),
-            ]
+        X_head = X.groupby(entity_col).head(n_anchors)
+        # Last `order * sp` levels are enough to difference new observations
+        X_tail = X.groupby(entity_col).tail(n_anchors)
+        anchors = pl.concat(
+            [_anchors(X_head, is_tail=False), _anchors(X_tail, is_tail=True)]
+        )
+        cutoffs = X_tail.groupby(entity_col).agg(
+            pl.col(time_col).max().alias("__cutoff")
         )
+        X_new = X
         for _ in range(order):
-            X = X.select([entity_col, time_col, cs.float().diff(n=sp).over(entity_col)])
-
-        # Drop null
+            X_new = X_new.with_columns(cs.float().diff(n=sp).over(entity_col))
+        X_new = X_new.filter(pl.col(time_col).cumcount().over(entity_col) >= n_anchors)
         artifacts = {
-            "X_new": X.fill_null(strategy="backward"),
-            "X_first": X_first.lazy(),
-            "X_last": X_last.lazy(),
+            "X_new": X_new,
+            "X_tail": X_tail,
+            "anchors": anchors,
+            "cutoffs": cutoffs,
         }
         return artifacts
 
-    def invert(
-        state: ModelState, X: pl.LazyFrame, from_last: bool = False
-    ) -> pl.LazyFrame:
+    def invert(state: ModelState, X: pl.LazyFrame) -> pl.LazyFrame:
         artifacts = state.artifacts
-        entity_col = X.columns[0]
-        time_col = X.columns[1]
-        idx_cols = entity_col, time_col
+        entity_col, time_col = X.columns[:2]
+        cols = X.select(cs.float()).columns
+        # Anchor on the last levels if X continues after the fitted time-series,
+        # otherwise on the first levels (i.e. in-sample inversion)
+        X_new = (
+            X.sort([entity_col, time_col])
+            .join(artifacts["cutoffs"], on=entity_col, how="left")
+            .with_columns(
+                [
+                    (pl.col(time_col).min().over(entity_col) > pl.col("__cutoff"))
+                    .fill_null(True)
+                    .alias("__is_tail"),
+                    (pl.col(time_col).cumcount().over(entity_col) % sp)
+                    .cast(pl.UInt32)
+                    .alias("__phase"),
+                ]
+            )
+            .join(
+                artifacts["anchors"].drop(time_col),
+                on=[entity_col, "__is_tail", "__phase"],
+                how="left",
+            )
+        )
+        for k in reversed(range(order)):
+            X_new = X_new.with_columns(
+                [
+                    pl.col(col).cumsum().over([entity_col, "__phase"])
+                    + pl.col(f"{col}__level_{k}")
+                    for col in cols
+                ]
+            )
+        return X_new.select(X.columns)
 
-        X_cutoff = artifacts["X_last"] if from_last else artifacts["X_first"]
+    def transform_new(state: ModelState, X: pl.LazyFrame) -> pl.LazyFrame:
+        entity_col, time_col = X.columns[:2]
+        X_tail = state.artifacts["X_tail"]
         X_new = pl.concat(
             [
-                X,
-                X_cutoff.select(
+                X_tail.select(
                     pl.col(col).cast(dtype) for col, dtype in X.schema.items()
-                ),
+                ).with_columns(pl.lit(True).alias("__is_tail")),
+                X.with_columns(pl.lit(False).alias("__is_tail")),
             ],
             how="diagonal",
-        ).sort(idx_cols)
+        ).sort([entity_col, time_col])
         for _ in range(order):
-            X_new = X_new.select(
-                [entity_col, time_col, cs.float().cumsum().over(entity_col)]
-            )
-
-        X_new = (
-            X.select(idx_cols)
-            # Must drop duplicates to deal with case where
-            # X to be inverted starts with timestamp == cutoff
-            .join(
-                X_new.unique(subset=[entity_col, time_col], keep="last"),
-                on=idx_cols,
-                how="left",
-            )
-        )
+            X_new = X_new.with_columns(cs.float().diff(n=sp).over(entity_col))
+        X_new = X_new.filter(~pl.col("__is_tail")).select(X.columns)
         return X_new
 
-    return transform, invert
+    return transform, invert, transform_new
+
+
+def _boxcox(x: np.ndarray, lmbd: np.ndarray) -> np.ndarray:
+    """Box-Cox transform with (broadcastable) lambdas, stable around `lmbd = 0`."""
+    log_x = np.log(x)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y = np.expm1(lmbd * log_x) / lmbd
+    return np.where(np.abs(lmbd) < 1e-12, log_x, y)
+
+
+def _boxcox_mle_loss(x: np.ndarray, lmbd: np.ndarray) -> np.ndarray:
+    """Negative profile log-likelihood of every row in `x` (NaN-padded)."""
+    n = np.sum(~np.isnan(x), axis=1)
+    y = _boxcox(x, lmbd[:, None])
+    llf = (lmbd - 1) * np.nansum(np.log(x), axis=1) - n / 2 * np.log(
+        np.nanvar(y, axis=1)
+    )
+    return -llf
+
+
+def _boxcox_pearsonr_loss(
+    x: np.ndarray, lmbd: np.ndarray, osm: np.ndarray
+) -> np.ndarray:
+    """One minus the probability plot correlation of every row in `x`.
+
+    Expects each row of `x` to be sorted ascending with NaN padding at the end
+    and `osm` to hold the matching normal order statistic medians.
+    """
+    y = _boxcox(x, lmbd[:, None])
+    y_centered = y - np.nanmean(y, axis=1, keepdims=True)
+    r = np.nansum(y_centered * osm, axis=1) / np.sqrt(
+        np.nansum(y_centered**2, axis=1) * np.nansum(osm**2, axis=1)
+    )
+    return 1 - r
+
+
+def _boxcox_guerrero_loss(
+    means: np.ndarray, stds: np.ndarray, lmbd: np.ndarray
+) -> np.ndarray:
+    """Coefficient of variation of the seasonal block ratios `std / mean^(1 - lmbd)`."""
+    ratios = stds / means ** (1 - lmbd[:, None])
+    return np.nanstd(ratios, axis=1, ddof=1) / np.nanmean(ratios, axis=1)
+
+
+def _golden_section(
+    loss: Callable[[np.ndarray], np.ndarray],
+    low: np.ndarray,
+    high: np.ndarray,
+    xtol: float = 1e-10,
+) -> np.ndarray:
+    """Vectorized golden-section search for the minimum of `loss` within [low, high]."""
+    inv_phi = (np.sqrt(5) - 1) / 2
+    n_iters = int(np.ceil(np.log(xtol / np.max(high - low)) / np.log(inv_phi)))
+    x1 = high - inv_phi * (high - low)
+    x2 = low + inv_phi * (high - low)
+    f1, f2 = loss(x1), loss(x2)
+    for _ in range(max(n_iters, 0)):
+        move_left = f1 < f2
+        high = np.where(move_left, x2, high)
+        low = np.where(move_left, low, x1)
+        # Reuse the surviving interior point
+        x2_new = np.where(move_left, x1, low + inv_phi * (high - low))
+        x1_new = np.where(move_left, high - inv_phi * (high - low), x2)
+        f_new = loss(np.where(move_left, x1_new, x2_new))
+        f1, f2 = np.where(move_left, f_new, f2), np.where(move_left, f1, f_new)
+        x1, x2 = x1_new, x2_new
+    return (low + high) / 2
+
+
+def _boxcox_normmax(
+    x: np.ndarray,
+    lengths: np.ndarray,
+    method: Literal["mle", "pearsonr", "guerrero"] = "mle",
+    sp: Optional[int] = None,
+    bounds: Tuple[float, float] = (-2.0, 2.0),
+    n_grid: int = 41,
+) -> np.ndarray:
+    """Estimate the optimal Box-Cox lambda for every row of a NaN-padded array.
+
+    The loss is first evaluated over a coarse lambda grid for all rows at once,
+    then refined by a vectorized golden-section search around each row's best
+    grid point.
+    """
+    if method == "mle":
+
+        def loss(lmbd):
+            return _boxcox_mle_loss(x, lmbd)
+
+    elif method == "pearsonr":
+        # Sort each row ascending (NaN padding remains at the end)
+        x = np.sort(x, axis=1)
+        n = lengths[:, None].astype(np.float64)
+        i = np.arange(1, x.shape[1] + 1)[None, :]
+        osm = (i - 0.3175) / (n + 0.365)
+        osm = np.where(i == n, 0.5 ** (1 / n), osm)
+        osm = np.where(i == 1, 1 - 0.5 ** (1 / n), osm)
+        osm = np.where(i > n, np.nan, ndtri(osm))
+
+        def loss(lmbd):
+            return _boxcox_pearsonr_loss(x, lmbd, osm)
+
+    elif method == "guerrero":
+        sp = max(sp or 2, 2)
+        n_blocks = -(-x.shape[1] // sp)
+        # Right-align series so that blocks are counted back from the last observation
+        shifts = x.shape[1] - lengths
+        idx = (np.arange(x.shape[1])[None, :] - shifts[:, None]) % x.shape[1]
+        x_right = np.take_along_axis(x, idx, axis=1)
+        x_right = np.concatenate(
+            [np.full((len(x), n_blocks * sp - x.shape[1]), np.nan), x_right], axis=1
+        )
+        blocks = x_right.reshape(len(x), n_blocks, sp)
+        complete = ~np.isnan(blocks).any(axis=2)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            means = np.where(complete, np.nanmean(blocks, axis=2), np.nan)
+            stds = np.where(complete, np.nanstd(blocks, axis=2, ddof=1), np.nan)
+
+        def loss(lmbd):
+            return _boxcox_guerrero_loss(means, stds, lmbd)
+
+    else:
+        raise ValueError(f"Method {method!r} not recognized.")
+
+    def safe_loss(lmbd):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return np.nan_to_num(loss(lmbd), nan=np.inf, posinf=np.inf)
+
+    # Step 1. Coarse grid search
+    grid = np.linspace(*bounds, n_grid)
+    grid_losses = np.stack([safe_loss(np.full(len(x), lmbd)) for lmbd in grid], axis=1)
+    best = np.argmin(grid_losses, axis=1)
+    # Step 2. Refine within neighbouring grid points
+    step = grid[1] - grid[0]
+    low = np.maximum(grid[best] - step, bounds[0])
+    high = np.minimum(grid[best] + step, bounds[1])
+    return _golden_section(safe_loss, low=low, high=high)
 
 
 @transformer
-def boxcox(method: str = "mle"):
+def boxcox(
+    method: Literal["mle", "pearsonr", "guerrero"] = "mle", sp: Optional[int] = None
+):
     """Applies the Box-Cox transformation to numeric columns in a panel DataFrame.
 
+    Lambdas are estimated for all entities at once: the objective is evaluated over
+    a grid of lambdas in [-2, 2] across a padded array of every time-series, then
+    refined with a vectorized golden-section search.
+
     Parameters
     ----------
     method : str
@@ -561,33 +1203,46 @@ def boxcox(method: str = "mle"):
         Supported methods:\n
         - `mle`: maximum likelihood estimation
         - `pearsonr`: Pearson correlation coefficient
+        - `guerrero`: Guerrero's method, which minimises the coefficient of variation
+        of seasonal subseries
+    sp : Optional[int]
+        Seasonal period used to form subseries for the `guerrero` method.
+        Defaults to 2.
     """
 
     def transform(X: pl.LazyFrame) -> pl.LazyFrame:
-        def optimizer(fun):
-            return optimize.minimize_scalar(
-                fun,
-                bounds=(-2.0, 2.0),
-                method="bounded",
-                options={"maxiter": 200, "xatol": 1e-12},
-            )
-
         idx_cols = X.columns[:2]
         entity_col, time_col = idx_cols
-        gb = X.groupby(X.columns[0])
+        cols = X.select(PL_NUMERIC_COLS(entity_col, time_col)).columns
         # Step 1. Compute optimal lambdas
-        lmbds = gb.agg(
-            PL_NUMERIC_COLS(entity_col, time_col)
-            .apply(lambda x: boxcox_normmax(x, method=method, optimizer=optimizer))
-            .cast(pl.Float64())
-            .suffix("__lmbd")
+        X_sorted = X.sort(idx_cols).collect()
+        values, lengths = _pad_groups(X_sorted, cols)
+        lmbds = (
+            X_sorted.groupby(entity_col, maintain_order=True)
+            .agg([])
+            .with_columns(
+                [
+                    pl.Series(
+                        f"{col}__lmbd",
+                        _boxcox_normmax(values[:, :, i], lengths, method=method, sp=sp),
+                    )
+                    for i, col in enumerate(cols)
+                ]
+            )
+            .lazy()
         )
         # Step 2. Transform
-        cols = X.select(PL_NUMERIC_COLS(entity_col, time_col)).columns
+        X_new = _transform(X, lmbds=lmbds, cols=cols)
+        artifacts = {"X_new": X_new, "lmbds": lmbds, "cols": cols}
+        return artifacts
+
+    def _transform(X: pl.LazyFrame, lmbds: pl.LazyFrame, cols: List[str]):
+        idx_cols = X.columns[:2]
+        entity_col = idx_cols[0]
         X_new = X.join(lmbds, on=entity_col, how="left").select(
             idx_cols
             + [
-                pl.when(pl.col(f"{col}__lmbd") == 0)
+                pl.when(pl.col(f"{col}__lmbd").abs() < 1e-8)
                 .then(pl.col(col).log())
                 .otherwise(
                     (pl.col(col) ** pl.col(f"{col}__lmbd") - 1) / pl.col(f"{col}__lmbd")
@@ -595,8 +1250,7 @@ def boxcox(method: str = "mle"):
                 for col in cols
             ]
         )
-        artifacts = {"X_new": X_new, "lmbds": lmbds}
-        return artifacts
+        return X_new
 
     def invert(state: ModelState, X: pl.LazyFrame) -> pl.LazyFrame:
         entity_col, time_col = X.columns[:2]
@@ -606,7 +1260,7 @@ def boxcox(method: str = "mle"):
             X.join(lmbds, on=entity_col, how="left", suffix="__lmbd")
             .with_columns(
                 [
-                    pl.when(pl.col(f"{col}__lmbd") == 0)
+                    pl.when(pl.col(f"{col}__lmbd").abs() < 1e-8)
                     .then(pl.col(col).exp())
                     .otherwise(
                         (pl.col(col) * pl.col(f"{col}__lmbd") + 1)
@@ -619,87 +1273,183 @@ def boxcox(method: str = "mle"):
         )
         return X_new
 
-    return transform, invert
+    def transform_new(state: ModelState, X: pl.LazyFrame) -> pl.LazyFrame:
+        artifacts = state.artifacts
+        X_new = _transform(X, lmbds=artifacts["lmbds"], cols=artifacts["cols"])
+        return X_new
+
+    return transform, invert, transform_new
 
 
 @transformer
-def detrend(method: Literal["linear", "mean"] = "linear"):
-    """Removes mean or linear trend from numeric columns in a panel DataFrame.
+def detrend(
+    method: Literal["linear", "mean", "polynomial", "piecewise"] = "linear",
+    degree: int = 2,
+    knots: Union[int, List[float]] = 1,
+):
+    """Removes mean, linear, polynomial, or piecewise-linear trend from numeric columns in a panel DataFrame.
+
+    Trends are fitted by OLS from per-entity sufficient statistics (sums of products of the
+    trend basis and the target) computed in a single groupby. Time is rescaled to [0, 1]
+    over each entity's span for numerical stability. The fitted coefficients are stored as
+    one table and joined once to transform, invert, or transform new data.
+    Fitting stays lazy (the per-entity systems are solved in the query plan), so that
+    `detrend` is collected together with the rest of a `pipeline`.
 
     Parameters
     ----------
     method : str
         If `mean`, subtracts mean from each time-series.
         If `linear`, subtracts line of best-fit (via OLS) from each time-series.
+        If `polynomial`, subtracts polynomial of best-fit of order `degree`.
+        If `piecewise`, subtracts continuous piecewise-linear line of best-fit with `knots`.
         Defaults to `linear`.
+    degree : int
+        Degree of the polynomial trend. Only used if `method` is `polynomial`. Defaults to 2.
+    knots : Union[int, List[float]]
+        Knots of the piecewise-linear trend. If an int, the number of knots evenly spaced over
+        each entity's span. If a list, the knot positions as fractions of each entity's span
+        (e.g. `[0.5]` for one knot halfway). Only used if `method` is `piecewise`. Defaults to 1.
     """
 
-    def transform(X: pl.LazyFrame) -> pl.LazyFrame:
-        entity_col, time_col = X.columns[:2]
+    if method == "piecewise":
+        if isinstance(knots, int):
+            knots = [(i + 1) / (knots + 1) for i in range(knots)]
+        if any(knot <= 0 or knot >= 1 for knot in knots):
+            raise ValueError("`knots` must be fractions of the time span in (0, 1)")
+
+    def _basis(t: pl.Expr) -> List[pl.Expr]:
+        # Trend basis functions of time rescaled to [0, 1]
+        # NOTE: Intercept is `t ** 0` (not a literal) to be summed per group
+        if method == "mean":
+            return [t**0]
         if method == "linear":
-            x = pl.col(time_col).to_physical()
-            betas = [
-                (pl.cov(col, x) / x.var()).over(entity_col).alias(f"{col}__beta")
-                for col in X.columns[2:]
-            ]
-            alphas = [
+            return [t**0, t]
+        if method == "polynomial":
+            return [t**d for d in range(0, degree + 1)]
+        return [t**0, t] + [(t - knot).clip_min(0.0) for knot in knots]
+
+    def _solve(
+        stats: pl.LazyFrame, cols: List[str], n_basis: int, eps: float = 1e-10
+    ) -> pl.LazyFrame:
+        # Solve B'B c = B'y per entity with an LDL' decomposition written as expressions,
+        # one small `with_columns` per step so that the query stays lazy.
+        # Directions with a vanishing pivot (e.g. too few observations to identify the trend)
+        # are dropped, which gives a least-squares solution like a pseudo-inverse.
+        def btb(i: int, j: int) -> pl.Expr:
+            return pl.col(f"__btb_{min(i, j)}_{max(i, j)}")
+
+        def inv_d(j: int) -> pl.Expr:
+            d = pl.col(f"__d_{j}")
+            return pl.when(d > eps * btb(j, j)).then(1 / d).otherwise(0.0)
+
+        for j in range(n_basis):
+            stats = stats.with_columns(
                 (
-                    pl.col(col).mean().over(entity_col)
-                    - pl.col(f"{col}__beta") * x.mean()
-                ).alias(f"{col}__alpha")
-                for col in X.columns[2:]
-            ]
-            residuals = [
-                pl.col(col) - pl.col(f"{col}__alpha") - pl.col(f"{col}__beta") * x
-                for col in X.columns[2:]
-            ]
-            X_new = X.with_columns(betas).with_columns(alphas).with_columns(residuals)
-            artifacts = {
-                "_beta": X_new.select([entity_col, cs.ends_with("__beta")])
-                .unique()
-                .collect(streaming=True),
-                "_alpha": X_new.select([entity_col, cs.ends_with("__alpha")])
-                .unique()
-                .collect(streaming=True),
-                "X_new": X_new.select(X.columns),
-            }
-        if method == "mean":
-            _mean = X.groupby(entity_col).agg(
-                pl.col(X.columns[2:]).mean().suffix("__mean")
+                    btb(j, j)
+                    - pl.sum_horizontal(
+                        [
+                            pl.col(f"__l_{j}_{k}") ** 2 * pl.col(f"__d_{k}")
+                            for k in range(j)
+                        ]
+                        or [pl.lit(0.0)]
+                    )
+                ).alias(f"__d_{j}")
             )
-            X_new = X.with_columns(
-                pl.col(X.columns[2:]) - pl.col(X.columns[2:]).mean().over(entity_col)
+            stats = stats.with_columns(
+                [
+                    (
+                        (
+                            btb(i, j)
+                            - pl.sum_horizontal(
+                                [
+                                    pl.col(f"__l_{i}_{k}")
+                                    * pl.col(f"__l_{j}_{k}")
+                                    * pl.col(f"__d_{k}")
+                                    for k in range(j)
+                                ]
+                                or [pl.lit(0.0)]
+                            )
+                        )
+                        * inv_d(j)
+                    ).alias(f"__l_{i}_{j}")
+                    for i in range(j + 1, n_basis)
+                ]
             )
-            _mean, X_new = pl.collect_all([_mean, X_new])
-            artifacts = {"_mean": _mean, "X_new": X_new.lazy()}
-        return artifacts
-
-    def invert(state: ModelState, X: pl.LazyFrame) -> pl.LazyFrame:
-        entity_col, time_col = X.columns[:2]
-        if method == "linear":
-            _beta = state.artifacts["_beta"]
-            _alpha = state.artifacts["_alpha"]
-            X_new = (
-                X.join(_beta.lazy(), on=entity_col, how="left")
-                .join(_alpha.lazy(), on=entity_col, how="left")
-                .with_columns(
+        for col in cols:
+            # Forward substitution L z = B'y, then scale by D^-1
+            for i in range(n_basis):
+                z = pl.col(f"{col}__bty_{i}") - pl.sum_horizontal(
+                    [pl.col(f"__l_{i}_{k}") * pl.col(f"{col}__z_{k}") for k in range(i)]
+                    or [pl.lit(0.0)]
+                )
+                stats = stats.with_columns(z.alias(f"{col}__z_{i}"))
+            # Back substitution L' c = D^-1 z
+            for i in reversed(range(n_basis)):
+                coef = pl.col(f"{col}__z_{i}") * inv_d(i) - pl.sum_horizontal(
                     [
-                        pl.col(col)
-                        + pl.col(f"{col}__alpha")
-                        + pl.col(f"{col}__beta") * pl.col(time_col).to_physical()
-                        for col in X.columns[2:]
+                        pl.col(f"__l_{k}_{i}") * pl.col(f"{col}__coef_{k}")
+                        for k in range(i + 1, n_basis)
                     ]
+                    or [pl.lit(0.0)]
                 )
-                .select(X.columns)
-            )
-        else:
-            X_new = (
-                X.join(state.artifacts["_mean"].lazy(), on=entity_col, how="left")
-                .with_columns(
-                    [pl.col(col) + pl.col(f"{col}__mean") for col in X.columns[2:]]
-                )
-                .select(X.columns)
+                stats = stats.with_columns(coef.alias(f"{col}__coef_{i}"))
+        return stats
+
+    def _fit(X: pl.LazyFrame) -> pl.LazyFrame:
+        entity_col, time_col = X.columns[:2]
+        cols = X.columns[2:]
+        x = pl.col(time_col).to_physical().cast(pl.Float64)
+        x0 = x.min()
+        xs = pl.when(x.max() > x0).then(x.max() - x0).otherwise(1.0)
+        basis = _basis((x - x0) / xs)
+        n_basis = len(basis)
+        # Sufficient statistics: B'B and B'y per entity in one groupby
+        stats = X.groupby(entity_col).agg(
+            [x0.alias("__x0"), xs.alias("__xs")]
+            + [
+                (basis[i] * basis[j]).sum().alias(f"__btb_{i}_{j}")
+                for i in range(n_basis)
+                for j in range(i, n_basis)
+            ]
+            + [
+                (basis[i] * pl.col(col)).sum().alias(f"{col}__bty_{i}")
+                for col in cols
+                for i in range(n_basis)
+            ]
+        )
+        coefs = _solve(stats, cols=cols, n_basis=n_basis).select(
+            [entity_col, "__x0", "__xs"]
+            + [f"{col}__coef_{i}" for col in cols for i in range(n_basis)]
+        )
+        return coefs
+
+    def _apply(X: pl.LazyFrame, coefs: pl.LazyFrame, sign: int) -> pl.LazyFrame:
+        entity_col, time_col = X.columns[:2]
+        x = pl.col(time_col).to_physical().cast(pl.Float64)
+        basis = _basis((x - pl.col("__x0")) / pl.col("__xs"))
+        trend = {
+            col: pl.sum_horizontal(
+                [pl.col(f"{col}__coef_{i}") * b for i, b in enumerate(basis)]
             )
+            for col in X.columns[2:]
+        }
+        X_new = (
+            X.join(coefs.lazy(), on=entity_col, how="left")
+            .with_columns([pl.col(col) + sign * expr for col, expr in trend.items()])
+            .select(X.columns)
+        )
         return X_new
 
-    return transform, invert
+    def transform(X: pl.LazyFrame) -> pl.LazyFrame:
+        coefs = _fit(X)
+        artifacts = {"coefs": coefs, "X_new": _apply(X, coefs, sign=-1)}
+        return artifacts
+
+    def invert(state: ModelState, X: pl.LazyFrame) -> pl.LazyFrame:
+        return _apply(X, state.artifacts["coefs"], sign=1)
+
+    def transform_new(state: ModelState, X: pl.LazyFrame) -> pl.LazyFrame:
+        return _apply(X, state.artifacts["coefs"], sign=-1)
+
+    return transform, invert, transform_new
@@ -11,6 +11,7 @@ from sklearn.linear_model import LinearRegression
 from sklearn.pipeline import Pipeline
 from sklearnex import patch_sklearn
 
+from functime.feature_extraction import tsfeatures
 from functime.forecasting import linear_model
 from functime.metrics import mae, mase, mse, rmse, rmsse, smape
 from functime.preprocessing import scale
@@ -317,3 +318,24 @@ def test_functime_on_m4_long_fh(forecaster, m4_dataset_no_missing_long_fh, bench
             y=y_train, fh=fh
         )
     )
+
+
+@pytest.fixture
+def y_100k():
+    """Panel of 100k random walks with 100 periods each."""
+    n_entities, n_periods = 100_000, 100
+    rng = np.random.default_rng(42)
+    values = rng.normal(size=(n_entities, n_periods)).cumsum(axis=1)
+    return pl.DataFrame(
+        {
+            "series_id": np.repeat(np.arange(n_entities), n_periods),
+            "time": np.tile(np.arange(n_periods), n_entities),
+            "value": values.ravel(),
+        }
+    )
+
+
+@pytest.mark.benchmark
+def test_tsfeatures_100k(y_100k, benchmark):
+    result = benchmark(lambda: tsfeatures(y_100k, sp=7))
+    assert result.height == 100_000
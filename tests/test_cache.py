@@ -0,0 +1,100 @@
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from functime.base import pipeline, transformer
+from functime.base.cache import TransformCache, _transformer_key, get_transform_cache
+from functime.preprocessing import detrend, diff, scale
+
+
+@pytest.fixture
+def X(pd_X):
+    return pl.from_pandas(pd_X.reset_index())
+
+
+@pytest.mark.parametrize("cache_dir", [False, True], ids=["memory", "disk"])
+def test_transform_cache_hit(X, cache_dir, tmp_path):
+    cache = TransformCache(cache_dir=str(tmp_path) if cache_dir else None)
+    expected = cache.transform(scale(), X)
+    if cache_dir:
+        # Only the disk cache is left
+        cache = TransformCache(cache_dir=str(tmp_path))
+    transformer = scale()
+    X_new = cache.transform(transformer, X)
+    assert cache.hits == 1
+    assert_frame_equal(X_new, expected)
+    # Fitted state is restored on cache hit
+    assert_frame_equal(X_new.pipe(transformer.invert).collect(), X, check_dtype=False)
+
+
+def test_transform_cache_miss(X):
+    cache = TransformCache()
+    cache.transform(scale(), X)
+    cache.transform(scale(use_std=False), X)
+    cache.transform(scale(), X.head(100))
+    assert cache.misses == 3
+    assert cache.hits == 0
+
+
+def test_transform_cache_lru(X):
+    cache = TransformCache(maxsize=1)
+    cache.transform(scale(), X)
+    cache.transform(detrend(), X)
+    assert len(cache) == 1
+    cache.transform(scale(), X)
+    assert cache.hits == 0
+
+
+def test_transform_cache_pipeline(X):
+    cache = TransformCache()
+    cache.transform(pipeline([scale(), diff(order=1)]), X)
+    transformer = pipeline([scale(), diff(order=1)])
+    X_new = cache.transform(transformer, X)
+    assert cache.hits == 1
+    # Steps' states are restored too
+    X_original = X_new.pipe(transformer.invert).collect()
+    assert_frame_equal(
+        X_original,
+        X_new.select(X.columns[:2]).join(X, on=X.columns[:2]),
+        check_dtype=False,
+    )
+
+
+@transformer
+def _add_constant(value):
+    def transform(X: pl.LazyFrame) -> pl.LazyFrame:
+        artifacts = {"X_new": X.with_columns(pl.col(X.columns[2]) + value.value)}
+        return artifacts
+
+    return transform
+
+
+class _Constant:
+    def __init__(self, value):
+        self.value = value
+
+
+def test_transform_cache_unstable_params(X):
+    cache = TransformCache()
+    # Objects with identity-based reprs are applied without caching
+    cache.transform(_add_constant(_Constant(1.0)), X)
+    cache.transform(_add_constant(_Constant(1.0)), X)
+    assert len(cache) == 0
+    assert cache.hits == 0
+
+
+def test_transformer_key_canonical():
+    # Keys of large arrays are not truncated like their reprs
+    a, b = np.zeros(10_000), np.zeros(10_000)
+    b[5_000] = 1.0
+    assert repr(a) == repr(b)
+    assert _transformer_key(_add_constant(a)) != _transformer_key(_add_constant(b))
+    # Mapping parameters are keyed independently of insertion order
+    assert _transformer_key(_add_constant({"x": 1, "y": 2})) == _transformer_key(
+        _add_constant({"y": 2, "x": 1})
+    )
+
+
+def test_default_transform_cache_disabled():
+    assert get_transform_cache().maxsize == 0
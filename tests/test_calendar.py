@@ -1,11 +1,15 @@
-from datetime import datetime
+from datetime import date, datetime
 
 import polars as pl
+import pytest
 from polars.testing import assert_frame_equal
 
+from functime.feature_extraction import add_fourier_terms, make_future_features
 from functime.feature_extraction.calendar import (
     add_calendar_effects,
+    add_holiday_distances,
     add_holiday_effects,
+    holiday_calendar,
 )
 
 
@@ -97,3 +101,166 @@ def test_add_holiday_effects():
             }
         ).with_columns(pl.all().exclude("datetime").cast(pl.Utf8).cast(pl.Categorical))
         assert_frame_equal(result.collect(), expected, check_dtype=False)
+
+
+def test_add_calendar_effects_dummies():
+    data = pl.DataFrame(
+        {
+            "country": ["US", "US"],
+            "datetime": [datetime(2023, 1, 2), datetime(2023, 2, 1)],
+        }
+    ).lazy()
+    result = add_calendar_effects(["month", "weekday"], as_dummies=True)(data)
+    # Dummies cover every month and weekday regardless of the data
+    assert result.columns == [
+        "country",
+        "datetime",
+        *[f"month_{i}" for i in range(1, 13)],
+        *[f"weekday_{i}" for i in range(1, 8)],
+    ]
+    result = result.collect()
+    assert result.select(
+        pl.sum_horizontal(pl.col("^month_.*$"))
+    ).to_series().to_list() == [1, 1]
+    assert result.get_column("month_2").to_list() == [0, 1]
+    assert result.get_column("weekday_1").to_list() == [1, 0]
+
+
+def test_add_calendar_effects_transform_new():
+    transformer = add_calendar_effects(["month", "year"], as_dummies=True)
+    X = pl.DataFrame(
+        {
+            "country": ["US", "US"],
+            "datetime": [datetime(2020, 1, 1), datetime(2021, 6, 1)],
+        }
+    ).lazy()
+    X_new = X.pipe(transformer).collect()
+    # Future frame in a year unseen at fit: same columns, year encoded as all zeros
+    X_future = pl.DataFrame(
+        {"country": ["US"], "datetime": [datetime(2022, 6, 1)]}
+    ).lazy()
+    result = X_future.pipe(transformer.transform_new).collect()
+    assert result.columns == X_new.columns
+    assert result.select(pl.col("^year_.*$")).row(0) == (0, 0)
+    assert result.get_column("month_6").to_list() == [1]
+
+
+def test_add_holiday_effects_transform_new():
+    transformer = add_holiday_effects(["US"], as_dummies=True)
+    X = pl.DataFrame(
+        {
+            "country": ["US", "US"],
+            "datetime": [datetime(2020, 7, 3), datetime(2020, 12, 25)],
+        }
+    ).lazy()
+    X_new = X.pipe(transformer).collect()
+    # Every holiday of the fitted years is a column, not only those in the data
+    assert "holiday__US_thanksgiving_day" in X_new.columns
+    # Juneteenth is a federal holiday from 2021 on: unseen at fit, hence all zeros
+    X_future = pl.DataFrame(
+        {
+            "country": ["US", "US"],
+            "datetime": [datetime(2021, 6, 18), datetime(2021, 11, 25)],
+        }
+    ).lazy()
+    result = X_future.pipe(transformer.transform_new).collect()
+    assert result.columns == X_new.columns
+    holidays = result.select(pl.sum_horizontal(pl.all().exclude(X.columns)))
+    assert holidays.to_series().to_list() == [0, 1]
+
+
+def test_add_calendar_effects_encoding():
+    data = pl.DataFrame(
+        {
+            "country": ["US", "US"],
+            "datetime": [datetime(2023, 1, 2), datetime(2023, 7, 1)],
+        }
+    ).lazy()
+    transformer = add_calendar_effects(["month", "year"], encoding="integer")
+    result = data.pipe(transformer).collect()
+    assert result.schema["month"] == pl.Int32
+    assert result.get_column("month").to_list() == [1, 7]
+    assert transformer.state.artifacts["categorical_cols"] == ["month"]
+
+    # Native categoricals are opt-in: string-cast categoricals are not reported
+    transformer = add_calendar_effects(["month"])
+    data.pipe(transformer).collect()
+    assert transformer.state.artifacts["categorical_cols"] == []
+
+    transformer = add_calendar_effects(["month"], encoding="cyclical")
+    result = data.pipe(transformer).collect()
+    assert result.columns == ["country", "datetime", "month_sin", "month_cos"]
+    assert result.get_column("month_sin").to_list() == pytest.approx(
+        [0.0, 0.0], abs=1e-9
+    )
+    assert result.get_column("month_cos").to_list() == pytest.approx([1.0, -1.0])
+    assert transformer.state.artifacts["categorical_cols"] == []
+
+
+def test_add_holiday_distances():
+    data = pl.DataFrame(
+        {
+            "country": ["US", "US", "US", "CA"],
+            "datetime": [
+                datetime(2020, 12, 20),
+                datetime(2020, 12, 25),
+                datetime(2020, 1, 2),
+                datetime(2020, 12, 20),
+            ],
+        }
+    ).lazy()
+    result = add_holiday_distances(["US"])(data).collect()
+    # Thanksgiving on 2020-11-26, Christmas on 2020-12-25, New Year on 2020-01-01
+    assert result.get_column("holiday__US__days_to_next").to_list() == [5, 0, 18, 5]
+    assert result.get_column("holiday__US__days_since_last").to_list() == [
+        24,
+        0,
+        1,
+        24,
+    ]
+
+
+def test_holiday_calendar_cached():
+    calendar = holiday_calendar("US", 2020, 2021)
+    assert calendar is holiday_calendar("US", 2020, 2021)
+    assert calendar.get_column("date").is_sorted()
+    assert calendar.get_column("date").dt.year().unique().sort().to_list() == [
+        2020,
+        2021,
+    ]
+
+
+def test_make_future_features():
+    cutoffs = pl.DataFrame(
+        {"country": ["US", "CA"], "date": [date(2020, 12, 23), date(2020, 12, 30)]}
+    )
+    spec = [
+        add_calendar_effects(["weekday"], as_dummies=True),
+        add_holiday_effects(["US"]),
+        add_fourier_terms(sp=7, K=1, freq="1d"),
+    ]
+    result = make_future_features(cutoffs, fh=3, freq="1d", spec=spec).collect()
+    assert result.columns == [
+        "country",
+        "date",
+        *[f"weekday_{i}" for i in range(1, 8)],
+        "holiday__US",
+        "cos_7_1",
+        "sin_7_1",
+    ]
+    assert result.select(["country", "date"]).rows() == [
+        ("US", date(2020, 12, 24)),
+        ("US", date(2020, 12, 25)),
+        ("US", date(2020, 12, 26)),
+        ("CA", date(2020, 12, 31)),
+        ("CA", date(2021, 1, 1)),
+        ("CA", date(2021, 1, 2)),
+    ]
+    assert result.get_column("holiday__US").is_null().to_list() == [
+        True,
+        False,
+        True,
+        True,
+        False,
+        True,
+    ]
@@ -0,0 +1,138 @@
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from functime.conformal import (
+    conformalize,
+    enbpi,
+    enbpi_sketch,
+    make_sketch,
+    merge_sketches,
+    sketch_quantiles,
+)
+
+
+@pytest.fixture
+def y_pred():
+    return pl.DataFrame(
+        {
+            "entity": ["a"] * 3 + ["b"] * 3,
+            "time": [10, 11, 12] * 2,
+            "target": [1.0, 2.0, 3.0, 10.0, 20.0, 30.0],
+        }
+    )
+
+
+@pytest.fixture
+def y_resids():
+    rng = np.random.default_rng(42)
+    n_splits, test_size = 20, 2
+    # Errors of the second step are twice as large as the first
+    scale = np.tile([1.0, 2.0], n_splits * 2)
+    return pl.DataFrame(
+        {
+            "entity": np.repeat(["a", "b"], n_splits * test_size),
+            "time": np.tile(np.arange(n_splits * test_size), 2),
+            "y_resid": rng.normal(size=n_splits * test_size * 2) * scale,
+            "split": np.tile(np.repeat(np.arange(n_splits), test_size), 2),
+        }
+    )
+
+
+def test_enbpi(y_pred, y_resids):
+    alphas = [0.1, 0.5, 0.9]
+    y_resid = y_resids.drop("split")
+    y_pred_quantiles = enbpi(y_pred.lazy(), y_resid.lazy(), alphas=alphas)
+    expected = pl.concat(
+        [
+            y_pred.join(
+                y_resid.groupby("entity")
+                .quantile(alpha, interpolation="linear")
+                .drop("time"),
+                on="entity",
+            ).select(
+                [
+                    "entity",
+                    "time",
+                    pl.col("target") + pl.col("y_resid"),
+                    pl.lit(alpha).alias("quantile"),
+                ]
+            )
+            for alpha in alphas
+        ]
+    ).sort(["entity", "time", "quantile"])
+    assert_frame_equal(y_pred_quantiles, expected)
+
+
+def test_conformalize_by_horizon(y_pred, y_resids):
+    y_pred_quantiles = conformalize(
+        y_pred, y_resids, alphas=[0.1, 0.9], by_horizon=True
+    )
+    widths = (
+        y_pred_quantiles.groupby(["entity", "time"], maintain_order=True)
+        .agg((pl.col("target").max() - pl.col("target").min()).alias("width"))
+        .groupby("entity", maintain_order=True)
+        .agg(pl.col("width"))
+        .get_column("width")
+        .to_list()
+    )
+    for width in widths:
+        # Intervals widen with the horizon, then stay at the last residual step
+        assert width[1] > width[0]
+        assert width[2] == width[1]
+
+
+@pytest.fixture
+def y_resid_long():
+    rng = np.random.default_rng(42)
+    n = 20_000
+    return pl.DataFrame(
+        {
+            "entity": np.repeat(["a", "b"], n // 2),
+            "time": np.tile(np.arange(n // 2), 2),
+            "y_resid": rng.standard_t(df=4, size=n),
+        }
+    )
+
+
+def _rank_errors(y_resid: pl.DataFrame, quantiles: pl.DataFrame, alphas) -> pl.Series:
+    # Distance between alpha and the fraction of residuals below the estimated quantile
+    ranks = (
+        y_resid.join(quantiles, on="entity")
+        .groupby("entity")
+        .agg(
+            [
+                ((pl.col("y_resid") < pl.col(str(alpha))).mean() - alpha).alias(
+                    str(alpha)
+                )
+                for alpha in alphas
+            ]
+        )
+    )
+    return pl.concat([ranks.get_column(str(alpha)).abs() for alpha in alphas])
+
+
+@pytest.mark.parametrize("merged", [False, True], ids=["single", "merged"])
+def test_sketch_quantiles(y_resid_long, merged):
+    alphas = [0.01, 0.1, 0.5, 0.9, 0.99]
+    if merged:
+        sketch = merge_sketches(
+            [
+                make_sketch(y_resid_long.filter(pl.col("time") % 3 == i))
+                for i in range(3)
+            ]
+        )
+    else:
+        sketch = make_sketch(y_resid_long)
+    # Compressed to a bounded number of centroids per entity
+    assert sketch.groupby("entity").count().get_column("count").max() <= 51
+    quantiles = sketch_quantiles(sketch, alphas)
+    assert _rank_errors(y_resid_long, quantiles, alphas).max() < 0.005
+
+
+def test_enbpi_sketch(y_pred, y_resid_long):
+    alphas = [0.1, 0.9]
+    y_pred_quantiles = enbpi_sketch(y_pred, make_sketch(y_resid_long), alphas=alphas)
+    expected = enbpi(y_pred.lazy(), y_resid_long.lazy(), alphas=alphas)
+    assert_frame_equal(y_pred_quantiles, expected, check_exact=False, atol=0.05)
@@ -1,5 +1,6 @@
 import polars as pl
 import pytest
+from polars.testing import assert_frame_equal
 
 from functime.cross_validation import (
     expanding_window_split,
@@ -92,3 +93,58 @@ def test_sliding_window_split(test_size, n_splits, step_size, pl_y, benchmark):
             pl.col(time_col).count()
         )
         assert (test_lengths.select("time") == test_size).select(pl.all().all())[0, 0]
+
+
+@pytest.mark.parametrize("window_size", [None, 4])
+def test_window_split_folds(window_size):
+    y = pl.DataFrame(
+        {
+            "series_id": ["a"] * 12 + ["b"] * 10,
+            "time": list(range(12)) + list(range(10)),
+            "value": list(range(22)),
+        }
+    )
+    if window_size:
+        cv = sliding_window_split(
+            test_size=2, n_splits=3, step_size=2, window_size=window_size, eager=True
+        )
+    else:
+        cv = expanding_window_split(test_size=2, n_splits=3, step_size=2, eager=True)
+    splits = cv(y)
+    assert len(splits) == 3
+    for i, (y_train, y_test) in splits.items():
+        assert y_train.columns == y.columns
+        cutoff = 2 + 2 * (2 - i)
+        for entity, n_rows in [("a", 12), ("b", 10)]:
+            train_time = y_train.filter(pl.col("series_id") == entity)["time"]
+            test_time = y_test.filter(pl.col("series_id") == entity)["time"]
+            start = n_rows - cutoff - window_size if window_size else 0
+            assert train_time.to_list() == list(range(start, n_rows - cutoff))
+            assert test_time.to_list() == list(
+                range(n_rows - cutoff, n_rows - cutoff + 2)
+            )
+
+
+@pytest.mark.parametrize("window_size", [None, 4])
+def test_window_split_eager_matches_lazy(window_size):
+    y = pl.DataFrame(
+        {
+            "series_id": ["a"] * 12 + ["b"] * 10,
+            "time": list(range(12)) + list(range(10)),
+            "value": list(range(22)),
+        }
+    )
+    kwargs = {"test_size": 2, "n_splits": 3, "step_size": 2}
+    if window_size:
+        kwargs["window_size"] = window_size
+    splitter = sliding_window_split if window_size else expanding_window_split
+    eager_splits = splitter(**kwargs, eager=True)(y)
+    lazy_splits = splitter(**kwargs)(y.lazy())
+    for i, (y_train, y_test) in eager_splits.items():
+        # Eager folds are time-major slices: rows of each entity stay in time order
+        assert y_train.filter(pl.col("series_id") == "a")["time"].is_sorted()
+        for eager, lazy in zip((y_train, y_test), lazy_splits[i]):
+            assert_frame_equal(
+                eager.sort(["series_id", "time"]),
+                lazy.collect().sort(["series_id", "time"]),
+            )
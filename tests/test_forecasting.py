@@ -1,11 +1,16 @@
 import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 
 import cloudpickle
 import numpy as np
 import polars as pl
 import pytest
-from sklearnex import patch_sklearn
+from polars.testing import assert_frame_equal
 
+from functime.base import pipeline
+from functime.feature_extraction import add_calendar_effects
 from functime.forecasting import (  # ann,
     auto_elastic_net,
     auto_lightgbm,
@@ -21,9 +26,15 @@ from functime.forecasting import (  # ann,
     zero_inflated_model,
 )
 from functime.metrics import rmsse, smape, smape_original
-from functime.preprocessing import detrend
+from functime.preprocessing import detrend, diff, scale
 
-patch_sklearn()
+try:
+    # Optional `performance` extra
+    from sklearnex import patch_sklearn
+
+    patch_sklearn()
+except ImportError:
+    pass
 
 
 DEFAULT_LAGS = 12
@@ -109,6 +120,293 @@ def test_auto_cloudpickle():
     )
 
 
+@pytest.mark.parametrize("kwargs", [{}, ENSEMBLE_KWARGS], ids=["recursive", "ensemble"])
+def test_fit_residualize(kwargs):
+    y = pl.DataFrame(
+        {
+            "entity": ["a"] * 40 + ["b"] * 40,
+            "time": list(range(40)) + list(range(40)),
+            "target": [i + np.random.normal() for i in range(80)],
+        }
+    )
+    kwargs = {**kwargs, "max_horizons": 3} if kwargs else kwargs
+    forecaster = linear_model(freq="1i", lags=3, **kwargs).fit(y=y)
+    assert "y_resid" not in forecaster.state.artifacts
+    forecaster = forecaster.fit(y=y, residualize=True)
+    y_resid = forecaster.state.artifacts["y_resid"]
+    assert y_resid.columns == ["entity", "time", "y_resid"]
+    assert y_resid.get_column("y_resid").abs().mean() < 5
+
+
+@pytest.mark.parametrize(
+    "target_transform,expected_transform",
+    [(scale(), None), (pipeline([diff(order=1), scale()]), diff(order=1))],
+    ids=["scale", "diff_scale"],
+)
+def test_fit_residualize_target_transform(target_transform, expected_transform):
+    y = pl.DataFrame(
+        {
+            "entity": ["a"] * 40,
+            "time": list(range(40)),
+            "target": [10 + i + np.random.normal() for i in range(40)],
+        }
+    )
+
+    def _residuals(target_transform):
+        forecaster = linear_model(freq="1i", lags=3, target_transform=target_transform)
+        return forecaster.fit(y=y, residualize=True).state.artifacts["y_resid"]
+
+    # Least squares is equivariant to scaling a single series:
+    # residuals in the scale of the forecasts do not depend on `scale`
+    assert_frame_equal(
+        _residuals(target_transform), _residuals(expected_transform), atol=1e-4
+    )
+
+
+@pytest.mark.parametrize(
+    "n_jobs,backend", [(2, "threads"), (2, "processes")], ids=["threads", "processes"]
+)
+def test_backtest_n_jobs(n_jobs, backend):
+    y = pl.DataFrame(
+        {
+            "entity": ["a"] * 24 + ["b"] * 24,
+            "time": list(range(24)) + list(range(24)),
+            "target": [i + np.random.normal() for i in range(48)],
+        }
+    )
+    kwargs = {"test_size": 2, "step_size": 2, "n_splits": 3}
+    forecaster = linear_model(freq="1i", lags=3, target_transform=detrend())
+    expected_preds, expected_resids = forecaster.backtest(y=y, **kwargs)
+    y_preds, y_resids = forecaster.backtest(
+        y=y, n_jobs=n_jobs, backend=backend, **kwargs
+    )
+    # Splits are concatenated in split order
+    assert y_preds.get_column("split").is_sorted()
+    assert_frame_equal(y_preds, expected_preds)
+    assert_frame_equal(y_resids, expected_resids)
+
+
+@pytest.mark.parametrize("refit", [False, 2])
+def test_backtest_refit(refit):
+    y = pl.DataFrame(
+        {
+            "entity": ["a"] * 24 + ["b"] * 24,
+            "time": list(range(24)) + list(range(24)),
+            "target": [i + np.random.normal() for i in range(48)],
+        }
+    )
+    kwargs = {"test_size": 2, "step_size": 2, "n_splits": 3}
+    forecaster = linear_model(freq="1i", lags=3, target_transform=detrend())
+    expected_preds, _ = forecaster.backtest(y=y, **kwargs)
+    y_preds, y_resids = forecaster.backtest(y=y, refit=refit, **kwargs)
+    # Same forecast index; refitted splits are unchanged
+    idx_cols = ["entity", "time", "split"]
+    assert_frame_equal(y_preds.select(idx_cols), expected_preds.select(idx_cols))
+    assert_frame_equal(
+        y_preds.filter(pl.col("split") == 0),
+        expected_preds.filter(pl.col("split") == 0),
+    )
+    refit_splits = [0, 3] if refit is False else [0, 2, 3]
+    assert y_resids.get_column("split").unique().sort().to_list() == refit_splits
+    # Residual distribution is summarized in the state of the full refit
+    sketch = forecaster.state.artifacts["y_resid_sketch"]
+    assert sketch.columns == ["entity", "mean", "weight"]
+    # Sketch holds the residuals bootstrapped across splits: one per entity and timestamp
+    n_resids = y_resids.select(["entity", "time"]).unique().height
+    assert sketch.get_column("weight").sum() == n_resids
+
+
+def test_backtest_concurrent():
+    def _backtest(entities):
+        y = pl.DataFrame(
+            {
+                "entity": np.repeat(entities, 24),
+                "time": np.tile(np.arange(24), len(entities)),
+                "target": np.random.normal(size=24 * len(entities)),
+            }
+        ).with_columns(pl.col("entity").cast(pl.Categorical))
+        forecaster = linear_model(freq="1i", lags=3, target_transform=detrend())
+        y_preds, _ = forecaster.backtest(y=y, test_size=2, step_size=2, n_splits=3)
+        return y_preds.get_column("entity").cast(pl.Utf8).unique().sort().to_list()
+
+    panels = [["a", "b"], ["c", "b", "d"], ["e", "a"]] * 2
+    with ThreadPoolExecutor(max_workers=len(panels)) as executor:
+        entities = list(executor.map(_backtest, panels))
+    assert entities == [sorted(panel) for panel in panels]
+    # The global string cache is left untouched
+    assert not pl.using_string_cache()
+
+
+def test_fit_concurrent():
+    forecaster = linear_model(freq="1i", lags=3, target_transform=detrend())
+    panels = [["a", "b"], ["c", "b", "d"], ["e", "a"], ["f", "g", "h"]] * 2
+
+    def _fit(entities):
+        y = pl.DataFrame(
+            {
+                "entity": np.repeat(entities, 24),
+                "time": np.tile(np.arange(24), len(entities)),
+                "target": np.random.normal(size=24 * len(entities)),
+            }
+        )
+        # Options differ per call on the shared instance
+        forecaster.fit(y=y, residualize=len(entities) > 2)
+
+    with ThreadPoolExecutor(max_workers=len(panels)) as executor:
+        list(executor.map(_fit, panels))
+    # The state is that of a single call, with its own options
+    entities = sorted(forecaster.state.string_cache)
+    assert entities in [sorted(panel) for panel in panels]
+    assert ("y_resid" in forecaster.state.artifacts) == (len(entities) > 2)
+    y_pred = forecaster.predict(fh=2)
+    assert y_pred.get_column("entity").unique().sort().to_list() == entities
+    # Per-call options are not kept on the instance
+    assert not hasattr(forecaster, "residualize")
+    assert not hasattr(forecaster, "categorical_features")
+
+
+def test_predict_feature_transform_new():
+    times = pl.date_range(date(2020, 1, 1), date(2021, 12, 1), "1mo", eager=True)
+    y = pl.DataFrame(
+        {
+            "entity": np.repeat(["a", "b"], len(times)),
+            "time": pl.concat([times, times]),
+            "target": np.random.normal(size=2 * len(times)),
+        }
+    )
+    forecaster = linear_model(
+        freq="1mo",
+        lags=3,
+        feature_transform=add_calendar_effects(["month", "year"], as_dummies=True),
+    )
+    # Forecasts in a year unseen at fit reuse the fitted year dummies
+    y_pred = forecaster(y=y, fh=3)
+    assert "year_2020" in forecaster.state.features
+    assert y_pred.height == 6
+    assert y_pred.get_column("target").null_count() == 0
+
+
+def test_update():
+    y = pl.DataFrame(
+        {
+            "entity": ["a"] * 24 + ["b"] * 24,
+            "time": list(range(24)) + list(range(24)),
+            "target": [i + np.random.normal() for i in range(48)],
+        }
+    )
+    forecaster = linear_model(freq="1i", lags=3).fit(y=y)
+    assert_frame_equal(forecaster.update(y).predict(fh=3), forecaster.predict(fh=3))
+    y_pred = forecaster.update(y.filter(pl.col("time") < 20)).predict(fh=3)
+    assert y_pred.get_column("time").unique().sort().to_list() == [20, 21, 22]
+    # Forecaster itself is left unchanged
+    assert forecaster.predict(fh=1).get_column("time").unique().to_list() == [24]
+
+
+def test_conformalize_cache(monkeypatch):
+    y = pl.DataFrame(
+        {
+            "entity": ["a"] * 24 + ["b"] * 24,
+            "time": list(range(24)) + list(range(24)),
+            "target": [i + np.random.normal() for i in range(48)],
+        }
+    )
+    kwargs = {"test_size": 2, "step_size": 2, "n_splits": 3}
+    forecaster = linear_model(freq="1i", lags=3).fit(y=y)
+    with pytest.raises(ValueError):
+        forecaster.predict_interval(fh=3)
+    y_pred_qnts = forecaster.conformalize(fh=3, y=y, alphas=[0.1, 0.9], **kwargs)
+    # Repeated interval queries reuse the cached residuals without backtesting
+    backtest = forecaster.backtest
+    monkeypatch.setattr(forecaster, "backtest", None)
+    assert_frame_equal(
+        forecaster.conformalize(fh=3, y=y, alphas=[0.1, 0.9], **kwargs), y_pred_qnts
+    )
+    y_pred_median = forecaster.conformalize(fh=3, y=y, alphas=[0.5], **kwargs)
+    assert y_pred_median.get_column("quantile").unique().to_list() == [50]
+    assert_frame_equal(
+        forecaster.predict_interval(fh=3, alphas=[0.1, 0.9]),
+        y_pred_qnts.filter(pl.col("time") >= 24),
+    )
+    monkeypatch.setattr(forecaster, "backtest", backtest)
+    # Cache is dropped on update and replaced on refit
+    updated = forecaster.update(y)
+    assert "__conformal" not in updated.state.artifacts
+    with pytest.raises(ValueError):
+        updated.predict_interval(fh=3)
+    forecaster.fit(y=y)
+    assert "__conformal" not in forecaster.state.artifacts
+    # Falls back to the residual sketch kept by backtest
+    forecaster.backtest(y=y, **kwargs)
+    y_pred_qnts = forecaster.predict_interval(fh=3)
+    assert y_pred_qnts.get_column("quantile").unique().sort().to_list() == [10, 90]
+    assert y_pred_qnts.height == 2 * 3 * 2
+    # Sketch intervals match the future rows of `conformalize` with the same residuals
+    alphas = [0.1, 0.5, 0.9]
+    expected = (
+        linear_model(freq="1i", lags=3)
+        .fit(y=y)
+        .conformalize(fh=3, y=y, alphas=alphas, **kwargs)
+        .filter(pl.col("time") >= 24)
+    )
+    assert_frame_equal(forecaster.predict_interval(fh=3, alphas=alphas), expected)
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_auto_n_jobs(n_jobs):
+    y = pl.DataFrame(
+        {
+            "entity": np.repeat(["a", "b"], 40),
+            "time": np.tile(np.arange(40), 2),
+            "target": np.random.normal(size=80).cumsum(),
+        }
+    ).with_columns(pl.col("entity").cast(pl.Categorical))
+    forecaster = auto_lightgbm(
+        freq="1i", min_lags=2, max_lags=5, test_size=2, time_budget=2, n_jobs=n_jobs
+    ).fit(y=y)
+    artifacts = forecaster.state.artifacts
+    # Every lag is evaluated; scores are reported in lags order
+    assert artifacts["lags_path"] == [2, 3, 4, 5]
+    assert len(artifacts["scores_path"]) == 4
+    assert artifacts["best_score"] == min(artifacts["scores_path"])
+    assert artifacts["best_params"]["lags"] in artifacts["lags_path"]
+    assert forecaster.predict(fh=2).height == 4
+
+
+def test_auto_categorical_features(monkeypatch):
+    # The module is shadowed by the `lightgbm` forecaster in `functime.forecasting`
+    lgb_module = sys.modules["functime.forecasting.lightgbm"]
+    calls = []
+    _lightgbm = lgb_module._lightgbm
+
+    def _spy(categorical_features=None, **kwargs):
+        calls.append(categorical_features)
+        return _lightgbm(categorical_features=categorical_features, **kwargs)
+
+    monkeypatch.setattr(lgb_module, "_lightgbm", _spy)
+    y = pl.DataFrame(
+        {
+            "entity": np.repeat(["a", "b"], 36),
+            "time": pl.date_range(
+                date(2020, 1, 1), date(2022, 12, 1), "1mo", eager=True
+            ).to_list()
+            * 2,
+            "target": np.random.normal(size=72).cumsum(),
+        }
+    )
+    forecaster = auto_lightgbm(
+        freq="1mo",
+        min_lags=2,
+        max_lags=3,
+        test_size=2,
+        time_budget=2,
+        feature_transform=add_calendar_effects(["month"], encoding="integer"),
+    ).fit(y=y, X=y.select(["entity", "time"]))
+    # Integer-coded calendar effects are categorical in every evaluated and refitted forecaster
+    assert len(calls) > 1
+    assert all(features == ["month"] for features in calls)
+    assert forecaster.state.artifacts["best_params"]["lags"] in [2, 3]
+
+
 def _check_missing_values(df_x: pl.LazyFrame, df_y: pl.LazyFrame, col: str):
     pl.testing.assert_series_equal(
         df_x.select(pl.col(col).unique()).collect().get_column(col).sort(),
@@ -1,5 +1,6 @@
-from datetime import date
+from datetime import date, datetime
 
+import numpy as np
 import polars as pl
 import pytest
 from aeon.transformations.series.fourier import FourierFeatures
@@ -7,6 +8,7 @@ from polars.testing import assert_frame_equal
 
 from functime.cross_validation import train_test_split
 from functime.feature_extraction import add_fourier_terms
+from functime.feature_extraction.fourier import make_future_fourier_terms
 
 
 @pytest.mark.parametrize("freq,sp", [("1h", 24), ("1d", 365), ("1w", 52)])
@@ -15,45 +17,89 @@ def test_fourier_with_dates(freq: str, sp: int):
         date(2020, 1, 1), date(2021, 1, 1), interval=freq, eager=True
     )
     n_timestamps = len(timestamps)
-    idx_timestamps = timestamps.arg_sort() + 1
     entities = pl.concat(
         [
             pl.repeat("a", n_timestamps, eager=True),
             pl.repeat("b", n_timestamps, eager=True),
         ]
     )
-    X0 = pl.DataFrame(
+    X = pl.DataFrame(
         {
             "entity": entities,
             "time": pl.concat([timestamps, timestamps]),
         }
     )
-    X1 = pl.DataFrame(
-        {
-            "entity": entities,
-            "time": pl.concat([idx_timestamps, idx_timestamps]),
-        }
-    )
     idx_cols = ["entity", "time"]
+    X_train, X_test = X.pipe(train_test_split(test_size=6))
+    transformer = add_fourier_terms(sp=sp, K=4, freq=freq)
+    X_fourier = X.pipe(transformer).collect()
 
-    # Train test split
-    X0_train, X0_test = X0.pipe(train_test_split(test_size=6))
-    X1_train, X1_test = X1.pipe(train_test_split(test_size=6))
-
-    # Test train
-    X0_train_fourier = X0_train.pipe(add_fourier_terms(sp=sp, K=4)).collect()
-    X1_train_fourier = X1_train.pipe(add_fourier_terms(sp=sp, K=4)).collect()
+    # Phases are absolute: terms of the test split continue the terms of the history
+    X_test_fourier = X_test.pipe(transformer).collect()
     assert_frame_equal(
-        X0_train_fourier.sort(idx_cols).drop(idx_cols),
-        X1_train_fourier.sort(idx_cols).drop(idx_cols),
+        X_test_fourier.sort(idx_cols),
+        X_fourier.join(X_test.collect(), on=idx_cols).sort(idx_cols),
     )
-
-    # Test test
-    X0_test_fourier = X0_test.pipe(add_fourier_terms(sp=sp, K=4)).collect()
-    X1_test_fourier = X1_test.pipe(add_fourier_terms(sp=sp, K=4)).collect()
+    X_future_fourier = make_future_fourier_terms(
+        X_train.collect(), sp=sp, K=4, fh=6, freq=freq
+    ).collect()
+    assert_frame_equal(
+        X_future_fourier.sort(idx_cols),
+        X_test_fourier.sort(idx_cols),
+        check_dtype=False,
+    )
+    # Entities with the same timestamps have the same terms
     assert_frame_equal(
-        X0_test_fourier.sort(idx_cols).drop(idx_cols),
-        X1_test_fourier.sort(idx_cols).drop(idx_cols),
+        X_fourier.filter(pl.col("entity") == "a").drop("entity"),
+        X_fourier.filter(pl.col("entity") == "b").drop("entity"),
+    )
+
+
+@pytest.mark.parametrize("freq", ["1q", "2mo", "1ms", "1us", "1ns"])
+def test_fourier_offset_aliases(freq: str):
+    start = pl.lit(datetime(2020, 1, 1), dtype=pl.Datetime("ns"))
+    offset_n, offset_alias = int(freq[0]), freq[1:]
+    # Kept in Polars: Python datetimes drop nanoseconds
+    timestamps = pl.concat(
+        [
+            pl.select(start.dt.offset_by(f"{i * offset_n}{offset_alias}").alias("time"))
+            for i in range(8)
+        ]
+    )
+    X = timestamps.select(pl.lit("a").alias("entity"), "time")
+    X_new = X.lazy().pipe(add_fourier_terms(sp=4, K=1, freq=freq)).collect()
+    # Phases advance by one period per timestamp
+    phase = np.arctan2(X_new.get_column("sin_4_1"), X_new.get_column("cos_4_1"))
+    steps = np.round(np.diff(phase) / (np.pi / 2)) % 4
+    np.testing.assert_array_equal(steps, np.ones(7))
+
+
+@pytest.mark.parametrize("freq", ["1i", "1fortnight"])
+def test_fourier_unsupported_alias(freq: str):
+    X = pl.DataFrame({"entity": ["a"], "time": [date(2020, 1, 1)]}).lazy()
+    with pytest.raises(ValueError, match=freq):
+        X.pipe(add_fourier_terms(sp=4, K=1, freq=freq))
+
+
+def test_fourier_multiple_seasonalities():
+    X = pl.DataFrame({"entity": ["a"] * 400, "time": list(range(400))})
+    X_new = X.pipe(add_fourier_terms(sp=[7, 365.25], K=[2, 3])).collect()
+    assert X_new.columns == [
+        "entity",
+        "time",
+        "cos_7_1",
+        "cos_7_2",
+        "sin_7_1",
+        "sin_7_2",
+        "cos_365.25_1",
+        "cos_365.25_2",
+        "cos_365.25_3",
+        "sin_365.25_1",
+        "sin_365.25_2",
+        "sin_365.25_3",
+    ]
+    np.testing.assert_allclose(
+        X_new.get_column("sin_7_1"), np.sin(2 * np.pi * np.arange(400) / 7), atol=1e-12
     )
 
 
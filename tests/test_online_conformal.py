@@ -0,0 +1,69 @@
+import io
+
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from functime.online_conformal import aci_coverage, aci_init, aci_predict, aci_update
+
+ENTITIES = ["a", "b"]
+
+
+@pytest.fixture
+def state():
+    rng = np.random.default_rng(42)
+    y_resids = pl.DataFrame(
+        {
+            "entity": np.repeat(ENTITIES, 50),
+            "time": np.tile(np.arange(50), 2),
+            "y_resid": rng.normal(size=100),
+        }
+    )
+    return aci_init(y_resids, alphas=[0.1, 0.9])
+
+
+def _panel(time: int, values) -> pl.DataFrame:
+    return pl.DataFrame(
+        {"entity": ENTITIES, "time": [time] * len(ENTITIES), "target": values}
+    )
+
+
+def test_aci_update_adapts(state):
+    rng = np.random.default_rng(42)
+    # Noise of entity "a" triples after the residuals used to initialize the state
+    for time in range(50, 1050):
+        y_true = _panel(time, rng.normal(size=2) * np.array([3.0, 1.0]))
+        state = aci_update(state, y_true=y_true, y_pred=_panel(time, [0.0, 0.0]))
+    coverage = aci_coverage(state)
+    assert coverage.get_column("n").to_list() == [1000] * 4
+    errors = (
+        coverage.get_column("empirical_quantile") - coverage.get_column("quantile")
+    ).abs()
+    assert errors.max() < 0.05
+    y_pred_quantiles = aci_predict(state, _panel(1050, [0.0, 0.0]))
+    widths = y_pred_quantiles.groupby("entity", maintain_order=True).agg(
+        pl.col("target").max() - pl.col("target").min()
+    )
+    assert widths.get_column("target")[0] > 2 * widths.get_column("target")[1]
+
+
+def test_aci_update_batched(state):
+    y_true = pl.DataFrame(
+        {"entity": ["a", "a", "b"], "time": [2, 1, 1], "target": [1.0, -2.0, 0.5]}
+    )
+    y_pred = y_true.with_columns(pl.lit(0.0).alias("target"))
+    batched = aci_update(state, y_true=y_true, y_pred=y_pred)
+    sequential = state
+    for time in [1, 2]:
+        sequential = aci_update(
+            sequential,
+            y_true=y_true.filter(pl.col("time") == time),
+            y_pred=y_pred.filter(pl.col("time") == time),
+        )
+    assert_frame_equal(batched, sequential)
+    # State survives a round trip through Arrow IPC
+    buffer = io.BytesIO()
+    batched.write_ipc(buffer)
+    buffer.seek(0)
+    assert_frame_equal(pl.read_ipc(buffer), batched)
@@ -1,3 +1,4 @@
+from datetime import date, datetime
 from typing import List, Tuple
 
 import numpy as np
@@ -7,11 +8,25 @@ import pytest
 
 # AttributeError: module 'polars' has no attribute 'testing'
 from polars.testing import assert_frame_equal
-from scipy import signal
+from scipy import optimize, signal
+from scipy.stats import boxcox_normmax
 from sklearn.impute import SimpleImputer
 from sklearn.preprocessing import PowerTransformer
 
-from functime.preprocessing import boxcox, detrend, diff, lag, roll, scale
+from functime.base import pipeline
+from functime.preprocessing import (
+    boxcox,
+    detrend,
+    diff,
+    lag,
+    one_hot_encode,
+    ordinal_encode,
+    reindex,
+    resample,
+    roll,
+    scale,
+    trim,
+)
 
 
 @pytest.fixture
@@ -174,12 +189,77 @@ def test_roll(pd_X, rolling_pd_dataframe, benchmark):
     X = pl.from_pandas(pd_X.reset_index()).lazy()
     window_sizes, stats, df = rolling_pd_dataframe
     result = benchmark(
-        lambda: roll(window_sizes=window_sizes, stats=stats, freq="1d")(X=X).collect()
+        lambda: roll(window_sizes=window_sizes, stats=stats)(X=X).collect()
     )
     expected = df.reset_index().loc[:, result.columns]
     assert_frame_equal(result, pl.DataFrame(expected), check_exact=False, rtol=0.01)
 
 
+def test_roll_expanding_ewm(pd_X):
+    entity_col = pd_X.index.names[0]
+    gb = pd_X.groupby(level=0)
+    expected = pd.concat(
+        [
+            gb.transform(lambda x: x.expanding().mean().shift(1)).add_suffix(
+                "__expanding_mean"
+            ),
+            gb.transform(lambda x: x.expanding().max().shift(1)).add_suffix(
+                "__expanding_max"
+            ),
+            gb.transform(
+                lambda x: x.ewm(alpha=0.5, adjust=False).mean().shift(1)
+            ).add_suffix("__ewm_mean_0.5"),
+        ],
+        axis=1,
+    )
+    X = pl.from_pandas(pd_X.reset_index()).lazy()
+    result = (
+        X.pipe(
+            roll(window_sizes=[], stats=["mean", "max"], alphas=[0.5], expanding=True)
+        )
+        .collect()
+        .sort(entity_col)
+    )
+    expected = expected.reset_index().loc[:, result.columns]
+    assert_frame_equal(result, pl.DataFrame(expected), check_exact=False, rtol=0.01)
+
+
+def test_roll_expanding_std_large_mean():
+    # Large mean and small variance: naive running sums of squares cancel
+    rng = np.random.default_rng(42)
+    values = 1e9 + rng.normal(scale=1e-3, size=100)
+    X = pl.DataFrame({"entity": ["a"] * 100, "time": range(100), "value": values})
+    result = roll(window_sizes=[], stats=["std"], expanding=True)(X=X.lazy()).collect()
+    expected = pd.Series(values).expanding().std().shift(1).to_numpy()
+    np.testing.assert_allclose(
+        result.get_column("value__expanding_std").to_numpy()[2:],
+        expected[2:],
+        rtol=1e-4,
+    )
+
+
+def test_roll_std_large_mean():
+    # Level shifts far above the variance: windowed running sums of squares cancel
+    rng = np.random.default_rng(42)
+    values = 1e9 * np.repeat([1, 2], 50) + rng.normal(scale=1e-3, size=100)
+    X = pl.DataFrame({"entity": ["a"] * 100, "time": range(100), "value": values})
+    X_new = X.lazy().pipe(roll(window_sizes=[5], stats=["std"]))
+    # Rolling runs when the query is collected
+    assert isinstance(X_new, pl.LazyFrame)
+    result = X_new.collect().get_column("value__rolling_std_5").to_numpy()
+    # Two-pass standard deviation of the previous 5 values
+    windows = np.lib.stride_tricks.sliding_window_view(values, 5)
+    expected = np.std(windows, axis=1, ddof=1)[:-1]
+    np.testing.assert_allclose(result[5:55], expected[:50], rtol=1e-4)
+    np.testing.assert_allclose(result[60:], expected[55:], rtol=1e-4)
+
+
+def test_roll_freq_deprecated():
+    X = pl.DataFrame({"entity": ["a"] * 5, "time": range(5), "value": [1.0] * 5})
+    with pytest.warns(DeprecationWarning):
+        roll(window_sizes=[3], stats=["mean"], freq="1d")(X=X.lazy())
+
+
 def test_scale(pd_X):
     entity_col = pd_X.index.names[0]
     numeric_cols = pd_X.select_dtypes(include=["float"]).columns
@@ -195,7 +275,7 @@ def test_scale(pd_X):
     assert_frame_equal(X_original, X, check_dtype=False)
 
 
-@pytest.mark.parametrize("sp", [1])
+@pytest.mark.parametrize("sp", [1, 4])
 def test_diff(pd_X, sp):
     entity_col, time_col = pd_X.index.names
     idx_cols = (entity_col, time_col)
@@ -241,6 +321,57 @@ def test_boxcox(pd_X):
     assert_frame_equal(X_original, X, check_dtype=False)
 
 
+@pytest.mark.parametrize("method", ["mle", "pearsonr"])
+def test_boxcox_lambdas(pd_X, method):
+    entity_col = pd_X.index.names[0]
+    pd_X = pd_X.abs().replace(0, 1)
+
+    def optimizer(fun):
+        return optimize.minimize_scalar(
+            fun, bounds=(-2.0, 2.0), method="bounded", options={"xatol": 1e-12}
+        )
+
+    expected = (
+        pd_X.groupby(entity_col)["close"]
+        .apply(lambda x: boxcox_normmax(x.values, method=method, optimizer=optimizer))
+        .values
+    )
+    X = pl.from_pandas(pd_X.reset_index()).lazy()
+    transformer = boxcox(method=method)
+    X.pipe(transformer).collect()
+    result = (
+        transformer.state.artifacts["lmbds"]
+        .sort(entity_col)
+        .collect()
+        .get_column("close__lmbd")
+        .to_numpy()
+    )
+    np.testing.assert_allclose(result, expected, atol=1e-5)
+
+
+def test_boxcox_guerrero():
+    sp = 4
+    n_periods = 48
+    level = np.repeat(np.linspace(10, 100, n_periods // sp), sp)
+    # Seasonal amplitude grows with the level, i.e. lambda ~ 0
+    seasonality = np.tile([1.2, 0.9, 1.1, 0.8], n_periods // sp)
+    X = pl.DataFrame(
+        {
+            "entity": ["a"] * n_periods + ["b"] * n_periods,
+            "time": list(range(n_periods)) * 2,
+            "value": np.concatenate([level * seasonality, level + seasonality]),
+        }
+    ).lazy()
+    transformer = boxcox(method="guerrero", sp=sp)
+    X_new = X.pipe(transformer)
+    lmbds = transformer.state.artifacts["lmbds"].sort("entity").collect()
+    # Multiplicative seasonality is log transformed, additive is left as is
+    assert abs(lmbds.get_column("value__lmbd")[0]) < 0.1
+    assert lmbds.get_column("value__lmbd")[1] > 0.9
+    X_original = X_new.pipe(transformer.invert).collect()
+    assert_frame_equal(X_original, X.collect(), check_dtype=False)
+
+
 @pytest.mark.parametrize("method", ["linear", "mean"])
 def test_detrend(method, pd_X):
     entity_col = pd_X.index.names[0]
@@ -253,3 +384,261 @@ def test_detrend(method, pd_X):
     assert_frame_equal(X_new, pl.DataFrame(expected.reset_index()))
     X_original = X_new.pipe(transformer.invert)
     assert_frame_equal(X_original, X, check_dtype=False)
+
+
+@pytest.mark.parametrize("direction", ["both", "left", "right"])
+def test_trim(direction):
+    X = pl.DataFrame(
+        {
+            "series_id": ["a"] * 5 + ["b"] * 5,
+            "time": list(range(0, 5)) + list(range(2, 7)),
+            "value": np.arange(10, dtype=float),
+        }
+    )
+    start = 2 if direction in ["both", "left"] else 0
+    end = 4 if direction in ["both", "right"] else 6
+    expected = X.filter(pl.col("time").is_between(start, end))
+    X_new = X.lazy().pipe(trim(direction=direction)).collect()
+    assert_frame_equal(X_new.sort(["series_id", "time"]), expected)
+
+
+def test_pipeline(pd_X):
+    X = pl.from_pandas(pd_X.reset_index()).lazy()
+    transformer = pipeline([scale(), detrend(method="linear")])
+    X_new = X.pipe(transformer)
+    # Applying the pipeline evaluates nothing: fitted states are collected on first use
+    assert isinstance(X_new, pl.LazyFrame)
+    steps = transformer.params["steps"]
+    assert not any(step._collected for step in steps)
+    X_new = X_new.collect()
+    expected = X.pipe(scale()).pipe(detrend(method="linear")).collect()
+    assert_frame_equal(X_new, expected)
+    X_original = X_new.pipe(transformer.invert)
+    assert all(step._collected for step in steps)
+    assert_frame_equal(X_original, X, check_dtype=False)
+    assert_frame_equal(X.pipe(transformer.transform_new).collect(), expected)
+
+
+@pytest.mark.parametrize(
+    "transformer",
+    [scale(), boxcox(), detrend(method="linear"), detrend(method="mean")],
+    ids=["scale", "boxcox", "detrend_linear", "detrend_mean"],
+)
+def test_transform_new(transformer, pd_X):
+    entity_col = pd_X.index.names[0]
+    numeric_cols = pd_X.select_dtypes(include=["float"]).columns
+    pd_X = pd_X.assign(**{col: pd_X[col].abs() + 1 for col in numeric_cols})
+    X = pl.from_pandas(pd_X.reset_index()).lazy()
+    X_new = X.pipe(transformer).collect()
+    X_test = X.groupby(entity_col).tail(10)
+    expected = X_test.select(X.columns[:2]).join(
+        X_new.lazy(), on=X.columns[:2], how="left"
+    )
+    assert_frame_equal(
+        X_test.pipe(transformer.transform_new).sort(X.columns[:2]).collect(),
+        expected.sort(X.columns[:2]).collect(),
+    )
+
+
+def test_diff_transform_new(pd_X):
+    entity_col, time_col = pd_X.index.names
+    X = pl.from_pandas(pd_X.reset_index()).lazy()
+    X_train = X.groupby(entity_col).head(100)
+    X_test = X.join(X_train, on=[entity_col, time_col], how="anti")
+    transformer = diff(order=2, sp=2)
+    X_train.pipe(transformer).collect()
+    expected = (
+        X.pipe(diff(order=2, sp=2))
+        .join(X_test.select([entity_col, time_col]), on=[entity_col, time_col])
+        .sort([entity_col, time_col])
+    )
+    assert_frame_equal(
+        X_test.pipe(transformer.transform_new).sort([entity_col, time_col]).collect(),
+        expected.collect(),
+    )
+
+
+@pytest.mark.parametrize("order,sp", [(1, 1), (2, 1), (1, 12), (2, 3)])
+def test_diff_invert_forecast(pd_X, order, sp):
+    entity_col, time_col = pd_X.index.names
+    idx_cols = [entity_col, time_col]
+    X = pl.from_pandas(pd_X.reset_index()).lazy()
+    X_train = X.groupby(entity_col).head(100)
+    X_test = X.join(X_train, on=idx_cols, how="anti")
+    transformer = diff(order=order, sp=sp)
+    X_train.pipe(transformer).collect()
+    # Differenced future values as if returned by a forecaster
+    y_pred = X.pipe(diff(order=order, sp=sp)).join(X_test.select(idx_cols), on=idx_cols)
+    assert_frame_equal(
+        y_pred.pipe(transformer.invert).sort(idx_cols).collect(),
+        X_test.sort(idx_cols).collect(),
+        check_dtype=False,
+    )
+
+
+@pytest.mark.parametrize(
+    "freq,time",
+    [
+        ("1i", [0, 3, 4, 2, 5]),
+        ("1d", [datetime(2020, 1, d) for d in [1, 4, 5, 3, 6]]),
+        ("1mo", [date(2020, m, 1) for m in [1, 4, 5, 3, 6]]),
+    ],
+)
+def test_reindex_span(freq, time):
+    X = pl.DataFrame(
+        {
+            "series_id": ["a", "a", "a", "b", "b"],
+            "time": time,
+            "value": [1.0, 2.0, 3.0, 4.0, 5.0],
+        }
+    )
+    transformer = reindex(freq=freq)
+    X_new = X.lazy().pipe(transformer).collect()
+    # Entity "a" spans 5 periods, "b" spans 4 periods
+    assert X_new.shape == (9, 3)
+    assert X_new.get_column("time").dtype == X.get_column("time").dtype
+    assert_frame_equal(
+        X_new.drop_nulls(), X.sort(["series_id", "time"]), check_dtype=False
+    )
+    gaps = transformer.state.artifacts["gaps"]
+    assert gaps.sort("series_id").rows() == [("a", 3, 2, 2), ("b", 2, 2, 2)]
+    # Global window
+    transformer = reindex(freq=freq, start=X["time"].min(), end=X["time"].max())
+    X_new = X.lazy().pipe(transformer).collect()
+    assert X_new.shape == (12, 3)
+
+
+def test_resample_multi_agg():
+    n_periods = 180
+    timestamps = pd.date_range("2020-01-01", periods=n_periods, freq="1min")
+    X = pl.DataFrame(
+        {
+            "series_id": np.repeat(["a", "b"], n_periods),
+            "time": np.tile(timestamps, 2),
+            "price": np.arange(2 * n_periods, dtype=float),
+            "volume": np.ones(2 * n_periods),
+            "flag": [None if i % 60 == 0 else 1.0 for i in range(2 * n_periods)],
+        }
+    )
+    agg_method = {"volume": "sum", "price": ["last", "max", "min"], "flag": "first"}
+    transformer = resample("1h", agg_method, impute_method={"flag": -1.0})
+    X_new = X.lazy().pipe(transformer).collect()
+    expected = (
+        X.to_pandas()
+        .set_index("time")
+        .groupby("series_id")
+        .resample("1h")
+        .agg(
+            {
+                "volume": "sum",
+                "price": ["last", "max", "min"],
+                "flag": lambda x: x.iloc[0],
+            }
+        )
+    )
+    assert X_new.columns == [
+        "series_id",
+        "time",
+        "volume",
+        "price__last",
+        "price__max",
+        "price__min",
+        "flag",
+    ]
+    np.testing.assert_allclose(
+        X_new.select(pl.all().exclude(["series_id", "time"])).to_numpy(),
+        expected.fillna(-1.0).to_numpy(),
+    )
+    # Columns not in the impute mapping keep their missing values
+    transformer = resample(
+        "1h", {"volume": "sum", "flag": "first"}, impute_method={"volume": 0}
+    )
+    X_new = X.lazy().pipe(transformer).collect()
+    assert X_new.get_column("flag").null_count() == 6
+
+
+@pytest.mark.parametrize(
+    "method,kwargs",
+    [("polynomial", {"degree": 3}), ("piecewise", {"knots": [0.25, 0.5]})],
+)
+def test_detrend_basis(method, kwargs):
+    t = np.arange(100)
+    s = t / 99
+    trend = {
+        "polynomial": 1 + 2 * s - 3 * s**2 + 0.5 * s**3,
+        "piecewise": 1 + 2 * s - 4 * np.maximum(s - 0.25, 0) + np.maximum(s - 0.5, 0),
+    }[method]
+    noise = np.sin(t)
+    X = pl.DataFrame(
+        {
+            "series_id": np.repeat(["a", "b"], 100),
+            "time": np.tile(t, 2),
+            "value": np.concatenate([trend + noise, 10 * trend]),
+        }
+    ).lazy()
+    transformer = detrend(method=method, **kwargs)
+    X_new = X.pipe(transformer).collect()
+    # Trend is removed exactly from the noise-free series
+    np.testing.assert_allclose(
+        X_new.filter(pl.col("series_id") == "b").get_column("value"), 0, atol=1e-8
+    )
+    # Residuals are orthogonal to the trend
+    assert abs(np.corrcoef(X_new.get_column("value")[:100], trend)[0, 1]) < 1e-8
+    X_original = X_new.pipe(transformer.invert).collect()
+    assert_frame_equal(X_original, X.collect(), check_dtype=False)
+    # Coefficients are fitted lazily, then materialized once with the output
+    artifacts = transformer._fit(X)
+    assert isinstance(artifacts["coefs"], pl.LazyFrame)
+    assert isinstance(artifacts["X_new"], pl.LazyFrame)
+
+
+@pytest.fixture
+def categorical_X():
+    X = pl.DataFrame(
+        {
+            "series_id": ["a", "a", "b", "b"],
+            "time": [1, 2, 1, 2],
+            "color": ["red", "blue", None, "red"],
+            "value": [1.0, 2.0, 3.0, 4.0],
+        }
+    ).with_columns(pl.col("color").cast(pl.Categorical))
+    X_new = pl.DataFrame(
+        {
+            "series_id": ["a", "b"],
+            "time": [3, 3],
+            "color": ["green", "blue"],
+            "value": [5.0, 6.0],
+        }
+    ).with_columns(pl.col("color").cast(pl.Categorical))
+    return X.lazy(), X_new.lazy()
+
+
+def test_one_hot_encode(categorical_X):
+    X, X_future = categorical_X
+    transformer = one_hot_encode()
+    X_new = X.pipe(transformer).collect()
+    assert X_new.columns == ["series_id", "time", "color__blue", "color__red", "value"]
+    assert X_new.get_column("color__red").to_list() == [1, 0, 0, 1]
+    # Unknown categories are encoded as zeros
+    X_future_new = transformer.transform_new(X_future).collect()
+    assert X_future_new.columns == X_new.columns
+    assert X_future_new.get_column("color__blue").to_list() == [0, 1]
+    assert X_future_new.get_column("color__red").to_list() == [0, 0]
+    transformer = one_hot_encode(handle_unknown="error")
+    X.pipe(transformer).collect()
+    with pytest.raises(ValueError, match="green"):
+        transformer.transform_new(X_future)
+
+
+def test_ordinal_encode(categorical_X):
+    X, X_future = categorical_X
+    transformer = ordinal_encode()
+    X_new = X.pipe(transformer).collect()
+    assert X_new.get_column("color").to_list() == [1, 0, None, 1]
+    X_future_new = transformer.transform_new(X_future).collect()
+    assert X_future_new.get_column("color").to_list() == [-1, 0]
+    X_original = X_new.pipe(transformer.invert).collect()
+    assert_frame_equal(
+        X_original.with_columns(pl.col("color").cast(pl.Utf8)),
+        X.with_columns(pl.col("color").cast(pl.Utf8)).collect(),
+    )
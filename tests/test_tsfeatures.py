@@ -0,0 +1,76 @@
+import numpy as np
+import polars as pl
+import pytest
+
+from functime.feature_extraction import tsfeatures
+
+N_PERIODS = 60
+
+
+@pytest.fixture
+def y():
+    rng = np.random.default_rng(42)
+    t = np.arange(N_PERIODS)
+    series = {
+        "noise": rng.normal(size=N_PERIODS),
+        "seasonal": np.sin(2 * np.pi * t / 12) + 0.1 * rng.normal(size=N_PERIODS),
+        "trend": 0.5 * t + rng.normal(size=N_PERIODS),
+        "intermittent": rng.poisson(0.3, size=N_PERIODS).astype(float),
+    }
+    y = pl.DataFrame(
+        {
+            "series_id": np.repeat(list(series.keys()), N_PERIODS),
+            "time": np.tile(t, len(series)),
+            "value": np.concatenate(list(series.values())),
+        }
+    )
+    # Features must not depend on row order
+    return y.sample(fraction=1.0, shuffle=True, seed=0)
+
+
+def _acf(x: np.ndarray, k: int) -> float:
+    d = x - x.mean()
+    return (d[k:] * d[:-k]).sum() / (d**2).sum()
+
+
+def test_tsfeatures(y):
+    result = tsfeatures(y, sp=12)
+    assert result.columns[0] == "series_id"
+    assert result.height == 4
+    features = {row["series_id"]: row for row in result.to_dicts()}
+    for entity, x in y.sort("time").partition_by("series_id", as_dict=True).items():
+        x = x.get_column("value").to_numpy()
+        f = features[entity]
+        assert f["length"] == N_PERIODS
+        assert f["x_acf1"] == pytest.approx(_acf(x, 1))
+        assert f["x_acf10"] == pytest.approx(sum(_acf(x, k) ** 2 for k in range(1, 11)))
+        assert f["diff1_acf1"] == pytest.approx(_acf(np.diff(x), 1))
+        assert f["seas_acf1"] == pytest.approx(_acf(x, 12))
+        below = x <= np.median(x)
+        assert f["crossing_points"] == (below[1:] != below[:-1]).sum()
+        nonzero = x[x != 0]
+        assert f["adi"] == pytest.approx(N_PERIODS / len(nonzero))
+        assert f["cv2"] == pytest.approx((nonzero.std(ddof=1) / nonzero.mean()) ** 2)
+        tiles = x.reshape(-1, 12)
+        assert f["lumpiness"] == pytest.approx(tiles.var(axis=1, ddof=1).var(ddof=1))
+        assert f["stability"] == pytest.approx(tiles.mean(axis=1).var(ddof=1))
+
+    assert features["seasonal"]["seasonal_strength"] > 0.9
+    assert features["noise"]["seasonal_strength"] < 0.5
+    assert features["trend"]["trend_strength"] > 0.9
+    assert features["noise"]["trend_strength"] < 0.5
+    assert features["noise"]["entropy"] > features["seasonal"]["entropy"]
+    assert features["intermittent"]["adi"] > 1
+
+
+def test_tsfeatures_subset(y):
+    result = tsfeatures(y.lazy(), features=["entropy", "x_acf1"])
+    assert result.columns == ["series_id", "entropy", "x_acf1"]
+    assert result.get_column("entropy").is_between(0, 1).all()
+    expected = tsfeatures(y).select(result.columns)
+    assert result.sort("series_id").frame_equal(expected.sort("series_id"))
+
+
+def test_tsfeatures_unknown_feature(y):
+    with pytest.raises(ValueError):
+        tsfeatures(y, features=["hurst"])